@@ -0,0 +1,23 @@
+import { Loader2 } from "lucide-react";
+import { Button } from "@/components/ui/button";
+
+interface LoadMoreProps {
+  hasMore: boolean;
+  loading: boolean;
+  onLoadMore: () => void;
+}
+
+// "Load more" footer for paginated tables; renders nothing on the last page.
+const LoadMore = ({ hasMore, loading, onLoadMore }: LoadMoreProps) => {
+  if (!hasMore) return null;
+  return (
+    <div className="flex justify-center py-4 border-t">
+      <Button variant="outline" onClick={onLoadMore} disabled={loading}>
+        {loading && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+        Load more
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMore;
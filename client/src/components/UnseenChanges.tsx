@@ -0,0 +1,22 @@
+import { RefreshCw } from "lucide-react";
+import { Button } from "@/components/ui/button";
+
+interface UnseenChangesProps {
+  count: number;
+  label: string;
+  onShow: () => void;
+}
+
+// Prompt for live changes a page can't patch in place (rows it never loaded);
+// renders nothing while there are none.
+const UnseenChanges = ({ count, label, onShow }: UnseenChangesProps) => {
+  if (count === 0) return null;
+  return (
+    <Button variant="outline" size="sm" onClick={onShow} className="gap-2">
+      <RefreshCw className="h-3 w-3" />
+      {count} {label}
+    </Button>
+  );
+};
+
+export default UnseenChanges;
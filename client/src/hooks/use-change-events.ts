@@ -0,0 +1,44 @@
+import { useEffect, useRef } from "react";
+import { EVENTS_URL } from "@/lib/api";
+
+// Live changes from GET /api/events. Pages patch the rows they already hold from
+// 'stock' / 'order' events and only refetch on '<type>_bulk' / 'resync' (too much
+// changed, or events were missed), or when the stream reconnects after a drop.
+export type StockChange = [productId: string, quantity: number, previous: number | null];
+export type OrderChange = [orderId: string, status: string, previous: string | null];
+
+export interface ChangeEventHandlers {
+  stock?: (changes: StockChange[]) => void;
+  order?: (changes: OrderChange[]) => void;
+  resync: () => void;
+}
+
+export function useChangeEvents(handlers: ChangeEventHandlers) {
+  // Handlers may close over fresh state on every render; the stream stays open
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+  const wantsStock = handlers.stock !== undefined;
+  const wantsOrder = handlers.order !== undefined;
+
+  useEffect(() => {
+    const types = [wantsStock && "stock", wantsOrder && "order"].filter(Boolean) as string[];
+    const source = new EventSource(`${EVENTS_URL}?types=${types.join(",")}`);
+    const resync = () => handlersRef.current.resync();
+
+    let opened = false;
+    source.onopen = () => {
+      if (opened) resync(); // EventSource reconnected by itself: events in between are lost
+      opened = true;
+    };
+    source.addEventListener("stock", (e) => {
+      handlersRef.current.stock?.(JSON.parse((e as MessageEvent).data));
+    });
+    source.addEventListener("order", (e) => {
+      handlersRef.current.order?.(JSON.parse((e as MessageEvent).data));
+    });
+    for (const type of types) source.addEventListener(`${type}_bulk`, resync);
+    source.addEventListener("resync", resync);
+
+    return () => source.close();
+  }, [wantsStock, wantsOrder]);
+}
@@ -0,0 +1,51 @@
+import { useCallback, useRef, useState } from "react";
+import type { Page } from "@/lib/api";
+
+// A keyset-paginated list held one page at a time: reload() fetches the first page,
+// loadMore() appends the next one. Responses that arrive after a newer reload()
+// (e.g. a changed filter) are dropped.
+export function usePagedList<T>(
+  fetchPage: (cursor?: string) => Promise<Page<T>>,
+  onError: (error: unknown) => void,
+) {
+  const [items, setItems] = useState<T[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const generation = useRef(0);
+  const onErrorRef = useRef(onError);
+  onErrorRef.current = onError;
+
+  const reload = useCallback(async () => {
+    const current = ++generation.current;
+    setLoading(true);
+    try {
+      const page = await fetchPage();
+      if (current !== generation.current) return;
+      setItems(page.items);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      if (current === generation.current) onErrorRef.current(error);
+    } finally {
+      if (current === generation.current) setLoading(false);
+    }
+  }, [fetchPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    const current = generation.current;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      if (current !== generation.current) return;
+      setItems(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      onErrorRef.current(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [fetchPage, nextCursor]);
+
+  return { items, setItems, loading, loadingMore, hasMore: nextCursor !== null, reload, loadMore };
+}
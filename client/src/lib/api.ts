@@ -2,11 +2,32 @@ import axios from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api';
 
+// Server-Sent Events stream of stock and order changes (see hooks/use-change-events.ts)
+export const EVENTS_URL = `${API_BASE_URL}/events`;
+
 const api = axios.create({
   baseURL: API_BASE_URL,
   headers: { 'Content-Type': 'application/json' },
 });
 
+// List endpoints are keyset-paginated: the next page's cursor comes back in the
+// X-Next-Cursor header. Pages fetch one page at a time and ask for the next one on
+// "Load more", so load time and memory follow the page size, not the table size.
+const NEXT_CURSOR_HEADER = 'x-next-cursor';
+const PAGE_SIZE = 100;
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null; // null on the last page
+}
+
+async function getPage<T>(url: string, params: Record<string, string> = {}, cursor?: string): Promise<Page<T>> {
+  const response = await api.get<T[]>(url, {
+    params: { ...params, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+  });
+  return { items: response.data, nextCursor: response.headers[NEXT_CURSOR_HEADER] ?? null };
+}
+
 export interface ShipmentRequestPayload {
   customer_name?: string | null;
   product_id: string;
@@ -43,7 +64,7 @@ export interface InvoiceData {
 export interface OrderUpdatePayload { customer_name?: string; }
 
 export const shipmentsApi = {
-  getAll: () => api.get('/shipments'),
+  getPage: <T>(cursor?: string) => getPage<T>('/shipments', {}, cursor),
   create: (data: { name: string }) => api.post('/shipments', data),
   getById: (id: string) => api.get(`/shipments/${id}`),
   addRequest: (id: string, data: ShipmentRequestPayload) => api.post(`/shipments/${id}/requests`, data),
@@ -58,7 +79,7 @@ export const shipmentsApi = {
 };
 
 export const ordersApi = {
-  getAll: (status?: string) => api.get('/orders', { params: status ? { status } : {} }),
+  getPage: <T>(status?: string, cursor?: string) => getPage<T>('/orders', status ? { status } : {}, cursor),
   create: (data: OrderPayload) => api.post('/orders', data),
   update: (id: string, data: OrderUpdatePayload) => api.put(`/orders/${id}`, data),
   complete: (id: string) => api.post(`/orders/${id}/complete`),
@@ -69,11 +90,12 @@ export const ordersApi = {
 };
 
 export const inventoryApi = {
-  getAll: (search?: string) => api.get('/inventory', { params: search ? { search } : {} }),
+  getPage: <T>(search?: string, cursor?: string) => getPage<T>('/inventory', search ? { search } : {}, cursor),
   clearStock: () => api.post('/inventory/reset'),
 };
 export const productsApi = { 
-  search: (query: string) => api.get('/products', { params: { search: query } }),
+  // Dropdown search: prefix matches answered from the server's in-memory catalog
+  search: (query: string) => api.get('/products/autocomplete', { params: { q: query, limit: 20 } }),
   create: (data: { name: string; sku: string }) => api.post('/products', data)
 };
 export const dashboardApi = {
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
 import { 
   Box, 
@@ -19,6 +19,7 @@ import { Card, CardContent, CardHeader, CardTitle, CardDescription } from "@/com
 import { Button } from "@/components/ui/button";
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
 import { dashboardApi } from "@/lib/api";
+import { useChangeEvents } from "@/hooks/use-change-events";
 import { Skeleton } from "@/components/ui/skeleton";
 
 interface DashboardStats {
@@ -37,6 +38,11 @@ interface LowStockItem {
   quantity: number;
 }
 
+// Same bound as the server's low_stock_threshold(): 0 < quantity <= 5
+const LOW_STOCK_THRESHOLD = 5;
+const isLowStock = (quantity: number) => quantity > 0 && quantity <= LOW_STOCK_THRESHOLD;
+const LOW_STOCK_ROWS = 5; // /dashboard/low-stock returns the 5 lowest
+
 // [UPDATED] Interface to accept specific color themes
 interface StatCardProps {
   title: string;
@@ -54,24 +60,84 @@ const Dashboard = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(false);
 
+  const fetchData = useCallback(async () => {
+    try {
+      const [statsRes, lowStockRes] = await Promise.all([
+        dashboardApi.getStats(),
+        dashboardApi.getLowStock()
+      ]);
+      setStats(statsRes.data);
+      setLowStockItems(lowStockRes.data);
+      setError(false);
+    } catch (error) {
+      console.error("Failed to load dashboard data", error);
+      setError(true);
+    } finally {
+      setLoading(false);
+    }
+  }, []);
+
+  const fetchLowStock = useCallback(async () => {
+    try {
+      setLowStockItems((await dashboardApi.getLowStock()).data);
+    } catch (error) {
+      console.error("Failed to load low stock items", error);
+    }
+  }, []);
+
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const [statsRes, lowStockRes] = await Promise.all([
-          dashboardApi.getStats(),
-          dashboardApi.getLowStock()
-        ]);
-        setStats(statsRes.data);
-        setLowStockItems(lowStockRes.data);
-      } catch (error) {
-        console.error("Failed to load dashboard data", error);
-        setError(true);
-      } finally {
-        setLoading(false);
-      }
-    };
     fetchData();
-  }, []);
+  }, [fetchData]);
+
+  // Live updates: every event carries the previous value, so the counters move by the
+  // difference and nothing is refetched, except the 5-row low-stock list when a product
+  // it doesn't hold (only an id in the event) may now belong in it.
+  useChangeEvents({
+    stock: (changes) => {
+      setStats(prev => {
+        if (!prev) return prev;
+        const next = { ...prev };
+        for (const [, quantity, previous] of changes) {
+          const before = previous ?? 0;
+          next.total_units += quantity - before;
+          next.total_skus += Number(quantity > 0) - Number(before > 0);
+          next.low_stock_count += Number(isLowStock(quantity)) - Number(isLowStock(before));
+        }
+        return next;
+      });
+
+      const shown = new Map(lowStockItems.map(item => [item.id, item.quantity]));
+      const full = lowStockItems.length === LOW_STOCK_ROWS;
+      const highest = Math.max(0, ...shown.values());
+      const entering = changes.some(([id, quantity]) =>
+        !shown.has(id) && isLowStock(quantity) && (!full || quantity < highest)
+      );
+      // A full list whose rows go up may now be missing a lower product
+      const rising = full && changes.some(([id, quantity]) => shown.has(id) && quantity > shown.get(id)!);
+      if (entering || rising) {
+        fetchLowStock();
+        return;
+      }
+      const quantities = new Map(changes.map(([id, quantity]) => [id, quantity]));
+      setLowStockItems(prev => prev
+        .map(item => quantities.has(item.id) ? { ...item, quantity: quantities.get(item.id)! } : item)
+        .filter(item => isLowStock(item.quantity))
+        .sort((a, b) => a.quantity - b.quantity)
+      );
+    },
+    order: (changes) => {
+      setStats(prev => {
+        if (!prev) return prev;
+        const next = { ...prev };
+        for (const [, status, previous] of changes) {
+          next.orders_ready += Number(status === "READY_TO_SHIP") - Number(previous === "READY_TO_SHIP");
+          next.orders_waiting += Number(status === "AWAITING_STOCK") - Number(previous === "AWAITING_STOCK");
+        }
+        return next;
+      });
+    },
+    resync: fetchData,
+  });
 
   // [UPDATED] StatCard now handles dynamic coloring based on the theme
   const StatCard = ({ title, value, icon: Icon, description, onClick, colorTheme }: StatCardProps) => {
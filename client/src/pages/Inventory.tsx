@@ -38,12 +38,17 @@ import {
   AlertDialogHeader, 
   AlertDialogTitle 
 } from "@/components/ui/alert-dialog";
+import LoadMore from "@/components/LoadMore";
+import UnseenChanges from "@/components/UnseenChanges";
 import { inventoryApi, productsApi } from "@/lib/api";
 import { useToast } from "@/hooks/use-toast";
+import { usePagedList } from "@/hooks/use-paged-list";
+import { useChangeEvents } from "@/hooks/use-change-events";
 import { cn } from "@/lib/utils";
 import { AxiosError } from "axios";
 
 interface InventoryItem {
+  id: string;
   sku: string;
   name: string;
   quantityInStock: number;
@@ -53,9 +58,8 @@ type SortOrder = 'asc' | 'desc' | null;
 
 const Inventory = () => {
   const { toast } = useToast();
-  const [inventory, setInventory] = useState<InventoryItem[]>([]);
-  const [loading, setLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState("");
+  const [activeQuery, setActiveQuery] = useState("");
   const [sortOrder, setSortOrder] = useState<SortOrder>(null);
 
   const [isClearOpen, setIsClearOpen] = useState(false);
@@ -67,32 +71,65 @@ const Inventory = () => {
   const [newName, setNewName] = useState("");
   const [isCreating, setIsCreating] = useState(false);
 
-  // Fetch Inventory (Search Aware)
-  const fetchInventory = useCallback(async (query: string = "") => {
-    setLoading(true);
-    try {
-      const response = await inventoryApi.getAll(query);
-      setInventory(response.data);
-    } catch (error) {
-      console.error("Failed to fetch inventory:", error);
-      toast({
-        title: "Error",
-        description: "Failed to fetch inventory.",
-        variant: "destructive",
-      });
-    } finally {
-      setLoading(false);
-    }
+  // Fetch Inventory (Search Aware), one page at a time
+  const fetchPage = useCallback(
+    (cursor?: string) => inventoryApi.getPage<InventoryItem>(activeQuery, cursor),
+    [activeQuery]
+  );
+  const onFetchError = useCallback((error: unknown) => {
+    console.error("Failed to fetch inventory:", error);
+    toast({
+      title: "Error",
+      description: "Failed to fetch inventory.",
+      variant: "destructive",
+    });
   }, [toast]);
+  const {
+    items: inventory,
+    setItems: setInventory,
+    loading,
+    loadingMore,
+    hasMore,
+    reload,
+    loadMore,
+  } = usePagedList(fetchPage, onFetchError);
+  const [unseenInStock, setUnseenInStock] = useState(0);
+
+  const refresh = useCallback(() => {
+    setUnseenInStock(0);
+    reload();
+  }, [reload]);
+
+  useEffect(() => {
+    refresh();
+  }, [refresh]);
+
+  // Live stock levels: loaded rows are patched in place. Without a search the list only
+  // holds in-stock products, so ones coming back into stock are counted for a refresh.
+  useChangeEvents({
+    stock: (changes) => {
+      const loaded = new Set(inventory.map(item => item.id));
+      const unseen = activeQuery ? 0 : changes.filter(
+        ([id, quantity, previous]) => !loaded.has(id) && quantity > 0 && !previous
+      ).length;
+      if (unseen) setUnseenInStock(n => n + unseen);
+
+      const quantities = new Map(changes.map(([id, quantity]) => [id, quantity]));
+      setInventory(prev => prev.map(item =>
+        quantities.has(item.id) ? { ...item, quantityInStock: quantities.get(item.id)! } : item
+      ));
+    },
+    resync: refresh,
+  });
 
   // Debounced Search
   useEffect(() => {
     const timer = setTimeout(() => {
-      fetchInventory(searchQuery);
+      setActiveQuery(searchQuery);
     }, 400);
 
     return () => clearTimeout(timer);
-  }, [searchQuery, fetchInventory]);
+  }, [searchQuery]);
 
   const handleClearStock = async () => {
     setIsClearing(true);
@@ -102,7 +139,6 @@ const Inventory = () => {
         title: "Inventory Cleared",
         description: "All product quantities have been reset to 0.",
       });
-      fetchInventory();
     } catch (error) {
       console.error(error);
       toast({
@@ -132,7 +168,8 @@ const Inventory = () => {
       
       // Auto-search for the new item so the user sees it immediately
       setSearchQuery(newSku);
-      fetchInventory(newSku);
+      if (newSku === activeQuery) refresh();
+      else setActiveQuery(newSku);
     } catch (error: unknown) {
         let msg = "Failed to create product";
         if (error instanceof AxiosError && error.response?.data?.detail) {
@@ -156,7 +193,7 @@ const Inventory = () => {
     return <ArrowUpDown className="h-4 w-4" />;
   };
 
-  // Client-side sorting for the current result set
+  // Client-side sorting for the pages loaded so far
   const sortedInventory = [...inventory].sort((a, b) => {
     if (!sortOrder) return 0;
     return sortOrder === 'asc' 
@@ -189,6 +226,12 @@ const Inventory = () => {
               </div>
               
               <div className="flex gap-2 items-center">
+                <UnseenChanges
+                  count={unseenInStock}
+                  label={unseenInStock === 1 ? "product back in stock" : "products back in stock"}
+                  onShow={refresh}
+                />
+
                 {/* [NEW] Create Product Dialog */}
                 <Dialog open={isCreateOpen} onOpenChange={setIsCreateOpen}>
                     <DialogTrigger asChild>
@@ -319,6 +362,7 @@ const Inventory = () => {
                     ))}
                   </TableBody>
                 </Table>
+                <LoadMore hasMore={hasMore} loading={loadingMore} onLoadMore={loadMore} />
               </div>
             )}
           </CardContent>
@@ -28,8 +28,12 @@ import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, Di
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
+import LoadMore from "@/components/LoadMore";
+import UnseenChanges from "@/components/UnseenChanges";
 import { ordersApi, productsApi } from "@/lib/api";
 import { useToast } from "@/hooks/use-toast";
+import { usePagedList } from "@/hooks/use-paged-list";
+import { useChangeEvents } from "@/hooks/use-change-events";
 import { cn } from "@/lib/utils";
 import { AxiosError } from "axios";
 import { 
@@ -79,8 +83,6 @@ interface OrderRow {
 
 const Orders = () => {
   const { toast } = useToast();
-  const [orders, setOrders] = useState<Order[]>([]);
-  const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState("all");
   
   // -- Expanded Rows State --
@@ -103,28 +105,58 @@ const Orders = () => {
   const [isCancelOpen, setIsCancelOpen] = useState(false);
   const [orderToCancel, setOrderToCancel] = useState<string | null>(null);
 
-  const fetchOrders = useCallback(async () => {
-    setLoading(true);
-    try {
-      const status = activeTab === "all" ? undefined : activeTab;
-      const response = await ordersApi.getAll(status);
-      setOrders(response.data);
-    } catch (error) {
-      console.error(error);
-      toast({
-        title: "Error",
-        description: "Failed to fetch orders",
-        variant: "destructive",
-      });
-    } finally {
-      setLoading(false);
-    }
-  }, [activeTab, toast]);
+  const fetchPage = useCallback((cursor?: string) => {
+    const status = activeTab === "all" ? undefined : activeTab;
+    return ordersApi.getPage<Order>(status, cursor);
+  }, [activeTab]);
+  const onFetchError = useCallback((error: unknown) => {
+    console.error(error);
+    toast({
+      title: "Error",
+      description: "Failed to fetch orders",
+      variant: "destructive",
+    });
+  }, [toast]);
+  const {
+    items: orders,
+    setItems: setOrders,
+    loading,
+    loadingMore,
+    hasMore,
+    reload,
+    loadMore,
+  } = usePagedList(fetchPage, onFetchError);
+  const [unseenOrders, setUnseenOrders] = useState(0);
+
+  const fetchOrders = useCallback(() => {
+    setUnseenOrders(0);
+    reload();
+  }, [reload]);
 
   useEffect(() => {
     fetchOrders();
   }, [fetchOrders]);
 
+  // Live status changes (including this user's own actions): loaded orders are patched
+  // in place and leave a status tab they no longer match. New orders, and orders beyond
+  // the loaded pages, only carry an id, so they are counted for a refresh instead.
+  useChangeEvents({
+    order: (changes) => {
+      const loaded = new Set(orders.map(order => order.id));
+      const unseen = changes.filter(
+        ([id, status]) => !loaded.has(id) && (activeTab === "all" || status === activeTab)
+      ).length;
+      if (unseen) setUnseenOrders(n => n + unseen);
+
+      const statuses = new Map(changes.map(([id, status]) => [id, status]));
+      setOrders(prev => prev
+        .map(order => statuses.has(order.id) ? { ...order, status: statuses.get(order.id)! } : order)
+        .filter(order => activeTab === "all" || order.status === activeTab)
+      );
+    },
+    resync: fetchOrders,
+  });
+
   // -- Toggle Row Logic --
   const toggleOrder = (orderId: string) => {
     const newExpanded = new Set(expandedOrderIds);
@@ -245,7 +277,6 @@ const Orders = () => {
     try {
       await ordersApi.complete(orderId);
       toast({ title: "Success", description: "Order marked as completed" });
-      fetchOrders();
     } catch (error) {
       toast({ title: "Error", description: "Failed to complete order (Check stock levels)", variant: "destructive" });
     }
@@ -262,7 +293,6 @@ const Orders = () => {
     try {
       await ordersApi.cancel(orderToCancel);
       toast({ title: "Success", description: "Order cancelled successfully." });
-      fetchOrders();
     } catch (error) {
       toast({ title: "Error", description: "Failed to cancel order", variant: "destructive" });
     } finally {
@@ -276,7 +306,6 @@ const Orders = () => {
     try {
       await ordersApi.hold(orderId);
       toast({ title: "On Hold", description: "Order paused and stock released" });
-      fetchOrders();
     } catch (error) {
       toast({ title: "Error", description: "Failed to put order on hold", variant: "destructive" });
     }
@@ -287,7 +316,6 @@ const Orders = () => {
     try {
       await ordersApi.resume(orderId);
       toast({ title: "Resumed", description: "Order active and stock reserved" });
-      fetchOrders();
     } catch (error: unknown) {
         let errorMessage = "Failed to resume order";
         if (error instanceof AxiosError && error.response?.data?.detail) {
@@ -303,7 +331,6 @@ const Orders = () => {
     try {
       await ordersApi.allocate(orderId);
       toast({ title: "Allocated", description: "Stock reserved. Order is ready to ship." });
-      fetchOrders();
     } catch (error: unknown) { // [FIXED] Changed 'any' to 'unknown' and added type check
       let msg = "Failed to allocate stock";
       if (error instanceof AxiosError && error.response?.data?.detail) {
@@ -487,9 +514,16 @@ const Orders = () => {
         {/* Orders Table */}
         <Card className="border-none shadow-md">
           <CardHeader className="bg-card rounded-t-lg border-b py-4">
-             <div className="flex items-center gap-2">
-                <ShoppingCart className="h-5 w-5 text-muted-foreground" />
-                <span className="font-semibold">Order History</span>
+             <div className="flex items-center justify-between gap-2">
+                <div className="flex items-center gap-2">
+                   <ShoppingCart className="h-5 w-5 text-muted-foreground" />
+                   <span className="font-semibold">Order History</span>
+                </div>
+                <UnseenChanges
+                  count={unseenOrders}
+                  label={unseenOrders === 1 ? "new or updated order" : "new or updated orders"}
+                  onShow={fetchOrders}
+                />
              </div>
           </CardHeader>
           <CardContent className="p-0">
@@ -618,6 +652,7 @@ const Orders = () => {
                 </TableBody>
               </Table>
             )}
+            {!loading && <LoadMore hasMore={hasMore} loading={loadingMore} onLoadMore={loadMore} />}
           </CardContent>
         </Card>
 
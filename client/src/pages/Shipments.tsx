@@ -19,8 +19,10 @@ import {
 } from "@/components/ui/alert-dialog";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
+import LoadMore from "@/components/LoadMore";
 import { shipmentsApi } from "@/lib/api";
 import { useToast } from "@/hooks/use-toast";
+import { usePagedList } from "@/hooks/use-paged-list";
 
 interface Shipment {
   id: string;
@@ -32,8 +34,6 @@ interface Shipment {
 const Shipments = () => {
   const navigate = useNavigate();
   const { toast } = useToast();
-  const [shipments, setShipments] = useState<Shipment[]>([]);
-  const [loading, setLoading] = useState(true);
   
   // Create Modal State
   const [isCreateOpen, setIsCreateOpen] = useState(false);
@@ -44,22 +44,24 @@ const Shipments = () => {
   const [shipmentToDelete, setShipmentToDelete] = useState<string | null>(null);
   const [isDeleteOpen, setIsDeleteOpen] = useState(false);
 
-  // FIX: Wrapped in useCallback
-  const fetchShipments = useCallback(async () => {
-    try {
-      const response = await shipmentsApi.getAll();
-      setShipments(response.data);
-    } catch (error) {
-      console.error(error);
-      toast({
-        title: "Error",
-        description: "Failed to fetch shipments",
-        variant: "destructive",
-      });
-    } finally {
-      setLoading(false);
-    }
+  const fetchPage = useCallback((cursor?: string) => shipmentsApi.getPage<Shipment>(cursor), []);
+  const onFetchError = useCallback((error: unknown) => {
+    console.error(error);
+    toast({
+      title: "Error",
+      description: "Failed to fetch shipments",
+      variant: "destructive",
+    });
   }, [toast]);
+  const {
+    items: shipments,
+    setItems: setShipments,
+    loading,
+    loadingMore,
+    hasMore,
+    reload: fetchShipments,
+    loadMore,
+  } = usePagedList(fetchPage, onFetchError);
 
   // FIX: Added fetchShipments dependency
   useEffect(() => {
@@ -121,7 +123,7 @@ const Shipments = () => {
         description: "Shipment deleted successfully",
       });
       // Refresh list locally
-      setShipments(shipments.filter(s => s.id !== shipmentToDelete));
+      setShipments(prev => prev.filter(s => s.id !== shipmentToDelete));
     } catch (error) {
       console.error(error);
       toast({
@@ -274,6 +276,7 @@ const Shipments = () => {
                 </TableBody>
               </Table>
             )}
+            {!loading && <LoadMore hasMore={hasMore} loading={loadingMore} onLoadMore={loadMore} />}
           </CardContent>
         </Card>
 
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query
+from typing import List, Literal, Optional
 from prisma import Prisma
+from app.api.conditional import ORDERS, PRODUCTS, SHIPMENTS, conditional_get
 from app.db.session import db_client
 from . import service
 from .schemas import DashboardStats, LowStockItem
 
 router = APIRouter()
 
-@router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats(db: Prisma = Depends(lambda: db_client)):
-    return await service.get_stats(db)
+@router.get("/stats", response_model=DashboardStats, dependencies=[Depends(conditional_get(PRODUCTS, SHIPMENTS, ORDERS))])
+async def get_dashboard_stats(
+    mode: Optional[Literal['aggregate', 'counters']] = Query(None), # Defaults to DASHBOARD_STATS_MODE
+    db: Prisma = Depends(lambda: db_client)
+):
+    return await service.get_stats(db, mode)
 
-@router.get("/low-stock", response_model=List[LowStockItem])
+@router.get("/low-stock", response_model=List[LowStockItem], dependencies=[Depends(conditional_get(PRODUCTS))])
 async def get_low_stock_list(db: Prisma = Depends(lambda: db_client)):
     return await service.get_low_stock_items(db)
\ No newline at end of file
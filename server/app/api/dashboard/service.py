@@ -1,70 +1,87 @@
+import os
 from prisma import Prisma
-from prisma.enums import ShipmentStatus, OrderStatus
+from app.db import pg
 
-async def get_stats(db: Prisma):
-    # 1. Product Stats
-    total_skus = await db.product.count(
-        where={'quantityInStock': {'gt': 0}}
-    )
-    
-    # 2. Total Inventory Units
-    result = await db.query_raw('SELECT SUM(quantity_in_stock) as total FROM "Product"')
-    total_units = int(result[0]['total']) if result and result[0]['total'] is not None else 0
+# Products with 0 < quantity <= low_stock_threshold() count as "low stock". The bound is
+# a SQL function (see migration 20251212090000_dashboard_counters_gate) shared with the
+# partial index "Product_low_stock_idx" and the counter triggers.
 
-    # 3. Low Stock 
-    low_stock_count = await db.product.count(
-        where={
-            'quantityInStock': {
-                'gt': 0,  
-                'lte': 5  
-            }
-        }
-    )
+# 'aggregate' (default): one aggregate query over the live tables.
+# 'counters': read the trigger-maintained dashboard_counters table (O(1)). The triggers
+#   only do work once switched on for the database: python -m app.db.dashboard_counters on
+STATS_MODE = os.getenv("DASHBOARD_STATS_MODE", "aggregate").lower()
 
-    # 4. Shipment Stats
-    pending_shipments = await db.shipment.count(
-        where={'status': {'in': [ShipmentStatus.PLANNING, ShipmentStatus.ORDERED]}}
-    )
+STATS_SQL = '''
+SELECT p.total_skus, p.total_units, p.low_stock_count,
+       s.pending_shipments, o.orders_ready, o.orders_waiting
+FROM (
+    SELECT COUNT(*) FILTER (WHERE quantity_in_stock > 0) AS total_skus,
+           COALESCE(SUM(quantity_in_stock), 0) AS total_units,
+           COUNT(*) FILTER (WHERE quantity_in_stock > 0 AND quantity_in_stock <= low_stock_threshold()) AS low_stock_count
+    FROM "Product"
+) p, (
+    SELECT COUNT(*) AS pending_shipments
+    FROM "Shipment"
+    WHERE status IN ('PLANNING', 'ORDERED')
+) s, (
+    SELECT COUNT(*) FILTER (WHERE status = 'READY_TO_SHIP') AS orders_ready,
+           COUNT(*) FILTER (WHERE status = 'AWAITING_STOCK') AS orders_waiting
+    FROM "Order"
+) o
+'''
 
-    # 5. Order Stats [UPDATED]
-    orders_ready = await db.order.count(
-        where={'status': OrderStatus.READY_TO_SHIP}
-    )
-    
-    orders_waiting = await db.order.count(
-        where={'status': OrderStatus.AWAITING_STOCK}
-    )
+# Empty while the triggers are off (the counters are stale then).
+COUNTERS_SQL = 'SELECT name, value FROM dashboard_counters WHERE dashboard_counters_enabled()'
 
-    return {
-        'total_skus': total_skus,
-        'total_units': total_units,
-        'low_stock_count': low_stock_count,
-        'pending_shipments': pending_shipments,
-        'orders_ready': orders_ready,      # New
-        'orders_waiting': orders_waiting   # New
-    }
+COUNTERS_ENABLED_SQL = 'SELECT dashboard_counters_enabled() AS enabled'
+
+# No parameters: the inlined threshold lets the planner always match the partial index.
+LOW_STOCK_SQL = '''
+SELECT id, name, sku, quantity_in_stock AS quantity
+FROM "Product"
+WHERE quantity_in_stock > 0 AND quantity_in_stock <= low_stock_threshold()
+ORDER BY quantity_in_stock ASC
+LIMIT 5
+'''
+
+STAT_FIELDS = (
+    'total_skus',
+    'total_units',
+    'low_stock_count',
+    'pending_shipments',
+    'orders_ready',    # Actionable (Ready to Ship)
+    'orders_waiting',  # Blocked (Awaiting Stock)
+)
+
+async def get_stats(db: Prisma, mode: str | None = None):
+    """
+    Returns all dashboard metrics in a single round trip.
+    """
+    fast = pg.fast_reads('dashboard')
+    if (mode or STATS_MODE) == 'counters':
+        rows = await (pg.fetch(COUNTERS_SQL) if fast else db.query_raw(COUNTERS_SQL))
+        if rows:
+            counters = {row['name']: row['value'] for row in rows}
+            return {field: int(counters.get(field) or 0) for field in STAT_FIELDS}
+        # Counters are switched off: aggregate instead
+
+    rows = await (pg.fetch(STATS_SQL) if fast else db.query_raw(STATS_SQL))
+    row = rows[0] if rows else {}
+    return {field: int(row.get(field) or 0) for field in STAT_FIELDS}
+
+async def check_counters(db: Prisma):
+    """Warns at startup when DASHBOARD_STATS_MODE=counters but the counters are switched off."""
+    if STATS_MODE != 'counters':
+        return
+    rows = await db.query_raw(COUNTERS_ENABLED_SQL)
+    if not (rows and rows[0]['enabled']):
+        print("⚠️ [Dashboard] DASHBOARD_STATS_MODE=counters but the counters are off; "
+              "serving aggregates. Run: python -m app.db.dashboard_counters on")
 
 async def get_low_stock_items(db: Prisma):
     """
     Get top 5 items running low.
     """
-    products = await db.product.find_many(
-        where={
-            'quantityInStock': {
-                'gt': 0, 
-                'lte': 5
-            }
-        },
-        order={'quantityInStock': 'asc'},
-        take=5
-    )
-    
-    return [
-        {
-            'id': p.id,
-            'name': p.name,
-            'sku': p.sku,
-            'quantity': p.quantityInStock
-        }
-        for p in products
-    ]
\ No newline at end of file
+    if pg.fast_reads('dashboard'):
+        return await pg.fetch(LOW_STOCK_SQL)
+    return await db.query_raw(LOW_STOCK_SQL)
@@ -0,0 +1,51 @@
+import asyncio
+import json
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.services.events import RESYNC, event_broker
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 15 # Keeps proxies from closing idle streams
+
+def _format(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event['items'] if 'items' in event else event, separators=(',', ':'))}\n\n"
+
+@router.get("")
+async def events_route(
+    request: Request,
+    types: Optional[str] = Query(None, description="Comma separated, e.g. 'stock,order'. Default: all")
+):
+    """
+    Server-Sent Events stream of database changes:
+    - 'stock': [[product_id, quantity, previous quantity], ...]
+    - 'order': [[order_id, status, previous status], ...]
+      (previous is null for new rows)
+    - 'stock_bulk' / 'order_bulk' / 'resync': too much changed (or events were missed), refetch.
+    """
+    wanted = {t.strip() for t in types.split(',') if t.strip()} if types else None
+
+    async def stream():
+        queue = event_broker.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                kind = event['type']
+                if wanted is None or event is RESYNC or kind in wanted or kind.removesuffix('_bulk') in wanted:
+                    yield _format(event)
+        finally:
+            event_broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
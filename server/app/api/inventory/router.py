@@ -1,21 +1,51 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Literal, Optional
 from prisma import Prisma
+from pydantic import TypeAdapter
 from app.db.session import db_client
+from app.api.conditional import PRODUCTS, conditional_get
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from app.api.serialization import serialize
 from . import service
-from .schemas import InventoryItem
+from .schemas import InventoryItem, StockImportResult
+from .stock_import import ImportMode, import_stock
 
 router = APIRouter()
 
-@router.get("", response_model=List[InventoryItem])
+INVENTORY_LIST = TypeAdapter(List[InventoryItem])
+
+@router.get("", response_model=List[InventoryItem], dependencies=[Depends(conditional_get(PRODUCTS))])
 async def get_inventory_list(
+    response: Response,
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Prisma = Depends(lambda: db_client)
 ):
-    return await service.get_all_inventory_items(db, search)
+    try:
+        items, next_cursor = await service.get_all_inventory_items(db, search, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return serialize(INVENTORY_LIST, items, response)
 
 @router.post("/reset", status_code=204)
 async def reset_inventory_route(db: Prisma = Depends(lambda: db_client)):
     """Development Endpoint: Clears all inventory stock."""
     await service.reset_inventory(db)
-    return None
\ No newline at end of file
+    return None
+
+@router.post("/import", response_model=StockImportResult)
+async def import_stock_route(
+    request: Request,
+    mode: ImportMode = ImportMode.SET,
+    format: Optional[Literal['csv', 'ndjson']] = None
+):
+    """
+    Bulk stock update from a 'sku,quantity' CSV or an NDJSON ({"sku", "quantity"} per line) body.
+    The format defaults from the Content-Type header.
+    """
+    if format is None:
+        format = 'ndjson' if 'json' in request.headers.get('content-type', '') else 'csv'
+    return await import_stock(request.stream(), mode, ndjson=format == 'ndjson')
@@ -4,9 +4,23 @@ from pydantic import BaseModel, ConfigDict, Field
 class InventoryItem(BaseModel):
     # The frontend page expects these specific field names.
     # We use aliases to map them from our Prisma 'Product' model.
+    id: str # Matches the product ids in /api/events stock events
     product_sku: str = Field(..., alias='sku')
     product_name: str = Field(..., alias='name')
     quantity: int = Field(..., alias='quantityInStock')
 
     # This config allows Pydantic to read data from the Prisma model object.
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class StockImportReject(BaseModel):
+    line: int
+    sku: str | None = None
+    reason: str
+
+class StockImportResult(BaseModel):
+    mode: str
+    received: int   # Data lines read (header excluded)
+    staged: int     # Lines that passed parsing
+    updated: int    # Products whose stock changed
+    rejected: int   # All rejects, including ones beyond the listed cap
+    rejects: list[StockImportReject]
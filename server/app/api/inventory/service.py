@@ -1,36 +1,66 @@
 from prisma import Prisma
+from prisma.models import Product
+from app.api.pagination import DEFAULT_PAGE_SIZE, decode_cursor, split_page
+from app.db import pg
+from app.services.catalog_cache import catalog_cache
+from app.services.product_search import search_product_rows, search_products
 
-async def get_all_inventory_items(db: Prisma, search_query: str | None = None):
+# In-stock products by (name, id). Raw SQL so that the literal 'quantity_in_stock > 0'
+# matches the partial index "Product_in_stock_name_id_idx" and the row comparison
+# turns the cursor into an index range scan.
+IN_STOCK_PAGE_SQL = '''
+SELECT id, sku, name, quantity_in_stock AS "quantityInStock", "createdAt", "updatedAt"
+FROM "Product"
+WHERE quantity_in_stock > 0 AND (name, id) > ($1, $2)
+ORDER BY name ASC, id ASC
+LIMIT $3
+'''
+
+IN_STOCK_FIRST_PAGE_SQL = '''
+SELECT id, sku, name, quantity_in_stock AS "quantityInStock", "createdAt", "updatedAt"
+FROM "Product"
+WHERE quantity_in_stock > 0
+ORDER BY name ASC, id ASC
+LIMIT $1
+'''
+
+async def get_all_inventory_items(
+    db: Prisma,
+    search_query: str | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE
+):
     """
-    Smart Inventory Fetch:
+    Smart Inventory Fetch, returns (items, next_cursor):
     - If 'search_query' is provided: Search ALL products (Name/SKU), ignoring stock level.
-    - If NO search: Return only products with Stock > 0 (Clean Dashboard).
+    - If NO search: Return a page of products with Stock > 0 (Clean Dashboard).
     """
+    fast = pg.fast_reads('inventory')
     if search_query:
-        return await db.product.find_many(
-            where={
-                'OR': [
-                    {'name': {'contains': search_query, 'mode': 'insensitive'}},
-                    {'sku': {'contains': search_query, 'mode': 'insensitive'}}
-                ]
-            },
-            order={'quantityInStock': 'desc'},
-            take=50 # Limit results for performance
-        )
+        if fast:
+            return await search_product_rows(search_query, limit=50), None
+        return await search_products(db, search_query, limit=50), None # Limit results for performance
     
     # Default view: Only active stock
-    return await db.product.find_many(
-        where={
-            'quantityInStock': {'gt': 0}
-        },
-        order={'name': 'asc'}
-    )
+    if cursor:
+        name, product_id = decode_cursor(cursor)
+        sql, args = IN_STOCK_PAGE_SQL, (name, product_id, limit + 1)
+    else:
+        sql, args = IN_STOCK_FIRST_PAGE_SQL, (limit + 1,)
+
+    if fast:
+        rows = await pg.fetch(sql, *args)
+        return split_page(rows, limit, key=lambda r: (r['name'], r['id']))
+    products = await db.query_raw(sql, *args, model=Product)
+    return split_page(products, limit, key=lambda p: (p.name, p.id))
 
 async def reset_inventory(db: Prisma):
     """
     Resets quantityInStock to 0 for ALL products.
     """
-    return await db.product.update_many(
+    count = await db.product.update_many(
         where={}, 
         data={'quantityInStock': 0}
-    )
\ No newline at end of file
+    )
+    catalog_cache.reset_stock()
+    return count
\ No newline at end of file
@@ -0,0 +1,220 @@
+import csv
+import json
+import tempfile
+from enum import Enum
+from typing import AsyncIterator
+from app.db import pg
+from app.services.catalog_cache import catalog_cache
+
+# Bulk stock import (stock counts, supplier feeds).
+# - The upload is parsed line by line as it streams in; nothing buffers the whole file.
+# - Valid lines are spooled (memory, then disk) in COPY text format while the client
+#   is still sending, so no connection or transaction is held open for the upload.
+# - The spool is COPYed into a temp table and one merge UPDATE applies everything;
+#   unknown SKUs and bad lines are reported back as rejects instead of failing the batch.
+
+SPOOL_BYTES = 8 * 1024 * 1024 # Spooled rows stay in memory up to this size
+MAX_REJECTS = 1000 # Rejects beyond this are counted but not listed
+
+class ImportMode(str, Enum):
+    SET = 'set'     # quantity is the new stock level
+    DELTA = 'delta' # quantity is added to (or, if negative, taken from) current stock
+
+CREATE_STAGING_SQL = '''
+CREATE TEMP TABLE stock_import (
+    line     int  NOT NULL,
+    sku      text NOT NULL,
+    quantity int  NOT NULL
+) ON COMMIT DROP
+'''
+
+UNKNOWN_SKUS_SQL = '''
+SELECT s.line, s.sku
+FROM stock_import s
+WHERE NOT EXISTS (SELECT 1 FROM "Product" p WHERE p.sku = s.sku)
+ORDER BY s.line
+'''
+
+# Per-SKU source rows. Set: the last line for a SKU wins. Delta: lines for a SKU add up.
+MERGE_SOURCES = {
+    ImportMode.SET: '''
+    SELECT DISTINCT ON (sku) sku, quantity, line
+    FROM stock_import
+    ORDER BY sku, line DESC''',
+    ImportMode.DELTA: '''
+    SELECT sku, SUM(quantity)::int AS quantity, MIN(line) AS line
+    FROM stock_import
+    GROUP BY sku''',
+}
+
+# One UPDATE for the whole upload. Products are locked in id order (see
+# orders/allocation.py) and the new quantity is computed from the locked row, so an
+# order decrement committed meanwhile is added to, not overwritten. A delta that
+# would take stock below zero is skipped; the anti-join returns it for the report.
+MERGE_SQL = '''
+WITH d AS ({source}
+),
+locked AS (
+    SELECT p.id
+    FROM "Product" p
+    JOIN d ON d.sku = p.sku
+    ORDER BY p.id
+    FOR UPDATE
+),
+applied AS (
+    UPDATE "Product" p
+    SET quantity_in_stock = {new_quantity},
+        "updatedAt" = timezone('utc', now())
+    FROM d
+    WHERE p.sku = d.sku AND p.id IN (SELECT id FROM locked)
+      AND {new_quantity} >= 0 AND p.quantity_in_stock <> {new_quantity}
+    RETURNING p.id, p.quantity_in_stock
+)
+SELECT 'applied' AS kind, id, quantity_in_stock AS quantity, NULL::int AS line, NULL::text AS sku FROM applied
+UNION ALL
+SELECT 'negative', p.id, d.quantity, d.line, d.sku
+FROM d
+JOIN "Product" p ON p.sku = d.sku
+WHERE d.quantity < 0 AND NOT EXISTS (SELECT 1 FROM applied a WHERE a.id = p.id)
+'''
+
+def merge_sql(mode: ImportMode) -> str:
+    new_quantity = 'd.quantity' if mode == ImportMode.SET else 'p.quantity_in_stock + d.quantity'
+    return MERGE_SQL.format(source=MERGE_SOURCES[mode], new_quantity=new_quantity)
+
+
+class _Rejects:
+    def __init__(self):
+        self.items: list[dict] = []
+        self.count = 0
+
+    def add(self, line: int, sku: str | None, reason: str):
+        self.count += 1
+        if len(self.items) < MAX_REJECTS:
+            self.items.append({'line': line, 'sku': sku, 'reason': reason})
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """(line number, text) for every non-blank line of a streamed upload."""
+    buffer = b''
+    number = 0
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split(b'\n')
+        for raw in complete:
+            number += 1
+            text = raw.decode('utf-8-sig' if first else 'utf-8', errors='replace').strip()
+            first = False
+            if text:
+                yield number, text
+    if buffer.strip():
+        yield number + 1, buffer.decode('utf-8-sig' if first else 'utf-8', errors='replace').strip()
+
+def _parse_csv(text: str) -> tuple[str, str]:
+    fields = next(csv.reader([text]))
+    if len(fields) != 2:
+        raise ValueError("expected 'sku,quantity'")
+    return fields[0], fields[1]
+
+def _parse_ndjson(text: str) -> tuple[str, str]:
+    try:
+        row = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError("invalid JSON")
+    if not isinstance(row, dict) or 'sku' not in row or 'quantity' not in row:
+        raise ValueError("expected {\"sku\": ..., \"quantity\": ...}")
+    return str(row['sku']), row['quantity']
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def _copy_row(number: int, sku: str, quantity: int) -> bytes:
+    """One stock_import row in COPY text format."""
+    return f"{number}\t{sku.translate(_COPY_ESCAPES)}\t{quantity}\n".encode()
+
+def _quantity(value, mode: ImportMode) -> int:
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError
+    quantity = int(value.strip() if isinstance(value, str) else value)
+    if mode == ImportMode.SET and quantity < 0:
+        raise ValueError
+    if abs(quantity) > 2_147_483_647:
+        raise ValueError
+    return quantity
+
+
+async def _spool(chunks: AsyncIterator[bytes], mode: ImportMode, ndjson: bool, rejects: _Rejects):
+    """Parse and validate the upload into a COPY-ready spool. Returns (spool, received, staged)."""
+    parse = _parse_ndjson if ndjson else _parse_csv
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    received = 0
+    staged = 0
+    try:
+        async for number, text in _lines(chunks):
+            try:
+                sku, raw_quantity = parse(text)
+            except ValueError as e:
+                received += 1
+                rejects.add(number, None, f"Malformed line: {e}")
+                continue
+
+            sku = sku.strip()
+            if number == 1 and not ndjson and sku.lower() == 'sku':
+                continue # Header
+
+            received += 1
+            if not sku or '\x00' in sku:
+                rejects.add(number, None, "Missing SKU")
+                continue
+            try:
+                quantity = _quantity(raw_quantity, mode)
+            except (TypeError, ValueError):
+                rejects.add(number, sku, f"Bad quantity: {raw_quantity!r}")
+                continue
+
+            spool.write(_copy_row(number, sku, quantity))
+            staged += 1
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, received, staged
+
+
+async def import_stock(chunks: AsyncIterator[bytes], mode: ImportMode, ndjson: bool = False) -> dict:
+    rejects = _Rejects()
+    spool, received, staged = await _spool(chunks, mode, ndjson, rejects)
+
+    new_stock = {}
+    try:
+        if staged:
+            conn = await pg.connect()
+            try:
+                async with conn.transaction():
+                    await conn.execute(CREATE_STAGING_SQL)
+                    await conn.copy_to_table('stock_import', source=spool, format='text')
+
+                    for row in await conn.fetch(UNKNOWN_SKUS_SQL):
+                        rejects.add(row['line'], row['sku'], "Unknown SKU")
+
+                    for row in await conn.fetch(merge_sql(mode)):
+                        if row['kind'] == 'applied':
+                            new_stock[row['id']] = row['quantity']
+                        else:
+                            rejects.add(row['line'], row['sku'], f"Not enough stock for a delta of {row['quantity']}")
+            finally:
+                await conn.close()
+    finally:
+        spool.close()
+
+    catalog_cache.patch_stock(new_stock)
+
+    rejects.items.sort(key=lambda r: r['line'])
+    return {
+        'mode': mode,
+        'received': received,
+        'staged': staged,
+        'updated': len(new_stock),
+        'rejected': rejects.count,
+        'rejects': rejects.items,
+    }
@@ -0,0 +1,155 @@
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from prisma import Prisma
+from prisma.enums import OrderStatus
+from app.services.catalog_cache import catalog_cache
+
+class AllocationPolicy(str, Enum):
+    # Oldest first. An order that can't be filled keeps its place in the queue:
+    # younger orders may not take the products it is waiting for.
+    FIFO = 'fifo'
+    # Highest priority source first (see SOURCE_PRIORITY), then oldest first.
+    # Orders that can't be filled are skipped.
+    SOURCE_PRIORITY = 'source_priority'
+    # Oldest first, but orders that can't be filled are skipped so that younger
+    # orders that fit jump ahead. Orders are never split: each one ships complete.
+    SKIP_AHEAD = 'skip_ahead'
+
+DEFAULT_POLICY = AllocationPolicy(os.getenv("ORDER_ALLOCATION_POLICY", AllocationPolicy.FIFO.value))
+
+# Lower index = served first. Pre-orders were promised stock from a shipment.
+SOURCE_PRIORITY = [
+    s.strip() for s in os.getenv("ORDER_SOURCE_PRIORITY", "PreOrder,Amazon,Local").split(',')
+]
+
+# Lock order for every stock-moving transaction (allocation, shipment receiving):
+# Order rows first, then Product rows in id order. Never the other way round.
+
+# Locks every waiting order (and skips ones whose status changed meanwhile).
+# Pre-Orders linked to a shipment that hasn't arrived are left out: receiving that
+# shipment hands them its units, so serving them from stock now would serve them twice.
+WAITING_ORDERS_SQL = '''
+SELECT o.id, o.source::text AS source, o.created_at, li."productId" AS product_id, li.quantity
+FROM "Order" o
+JOIN order_line_items li ON li."orderId" = o.id
+WHERE o.status = 'AWAITING_STOCK'
+  AND NOT EXISTS (
+      SELECT 1
+      FROM shipment_requests sr
+      JOIN "Shipment" s ON s.id = sr."shipmentId"
+      WHERE sr.fulfilling_order_id = o.id AND s.status <> 'RECEIVED'
+  )
+ORDER BY o.created_at ASC, o.id ASC
+FOR UPDATE OF o
+'''
+
+LOCK_STOCK_SQL = '''
+SELECT id, sku, quantity_in_stock
+FROM "Product"
+WHERE id = ANY($1::text[])
+ORDER BY id
+FOR UPDATE
+'''
+
+APPLY_DECREMENTS_SQL = '''
+UPDATE "Product" p
+SET quantity_in_stock = p.quantity_in_stock - d.quantity,
+    "updatedAt" = timezone('utc', now())
+FROM unnest($1::text[], $2::int[]) AS d(id, quantity)
+WHERE p.id = d.id
+RETURNING p.id, p.quantity_in_stock
+'''
+
+@dataclass
+class WaitingOrder:
+    id: str
+    source: str
+    created_at: datetime
+    lines: dict[str, int] = field(default_factory=dict) # product_id -> quantity
+
+def _source_rank(source: str) -> int:
+    return SOURCE_PRIORITY.index(source) if source in SOURCE_PRIORITY else len(SOURCE_PRIORITY)
+
+def plan_allocation(
+    orders: list[WaitingOrder],
+    stock: dict[str, int],
+    policy: AllocationPolicy
+) -> tuple[list[str], dict[str, int]]:
+    """
+    Pure in-memory allocation. 'orders' must be oldest first.
+    Returns (allocated order ids, total decrement per product id).
+    """
+    if policy == AllocationPolicy.SOURCE_PRIORITY:
+        orders = sorted(orders, key=lambda o: _source_rank(o.source)) # Stable: keeps FIFO within a source
+
+    available = dict(stock)
+    blocked: set[str] = set()
+    allocated: list[str] = []
+    decrements: dict[str, int] = {}
+
+    for order in orders:
+        fits = all(
+            pid not in blocked and available.get(pid, 0) >= qty
+            for pid, qty in order.lines.items()
+        )
+        if not fits:
+            if policy == AllocationPolicy.FIFO:
+                blocked.update(order.lines)
+            continue
+
+        for pid, qty in order.lines.items():
+            available[pid] -= qty
+            decrements[pid] = decrements.get(pid, 0) + qty
+        allocated.append(order.id)
+
+    return allocated, decrements
+
+async def allocate_all(db: Prisma, policy: AllocationPolicy | None = None) -> dict:
+    """
+    Allocates stock to every AWAITING_STOCK order in one transaction:
+    load (1 query), lock stock (1), then one set-based decrement and one status update.
+    """
+    policy = policy or DEFAULT_POLICY
+    new_stock = {}
+
+    async with db.tx() as transaction:
+        rows = await transaction.query_raw(WAITING_ORDERS_SQL)
+
+        orders: dict[str, WaitingOrder] = {}
+        for row in rows:
+            order = orders.get(row['id'])
+            if order is None:
+                created_at = datetime.fromisoformat(row['created_at']) # query_raw returns it as text
+                order = orders[row['id']] = WaitingOrder(row['id'], row['source'], created_at)
+            order.lines[row['product_id']] = order.lines.get(row['product_id'], 0) + row['quantity']
+
+        allocated, decrements = [], {}
+        if orders:
+            product_ids = sorted({pid for o in orders.values() for pid in o.lines})
+            stock_rows = await transaction.query_raw(LOCK_STOCK_SQL, product_ids)
+            stock = {r['id']: r['quantity_in_stock'] for r in stock_rows}
+            allocated, decrements = plan_allocation(list(orders.values()), stock, policy)
+
+        if allocated:
+            updated = await transaction.query_raw(
+                APPLY_DECREMENTS_SQL,
+                list(decrements.keys()),
+                list(decrements.values())
+            )
+            new_stock = {r['id']: r['quantity_in_stock'] for r in updated}
+
+            await transaction.order.update_many(
+                where={'id': {'in': allocated}, 'status': OrderStatus.AWAITING_STOCK},
+                data={'status': OrderStatus.READY_TO_SHIP}
+            )
+
+    catalog_cache.patch_stock(new_stock)
+
+    return {
+        'policy': policy,
+        'allocated': len(allocated),
+        'still_waiting': len(orders) - len(allocated),
+        'order_ids': allocated,
+    }
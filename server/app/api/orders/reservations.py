@@ -0,0 +1,72 @@
+from prisma import Prisma
+from prisma.models import Product
+from .schemas import OrderLineItemCreate
+
+# All-or-nothing stock reservation for a whole order in ONE statement:
+# 1. 'wanted'   - requested quantity per product (duplicate lines are summed).
+# 2. 'locked'   - row-locks the products (in id order, so concurrent orders can't deadlock)
+#                 and reads their latest committed stock.
+# 3. 'verdict'  - TRUE only if every product exists and has enough stock.
+# 4. 'reserved' - decrements all products, but only when the verdict is TRUE.
+# Because the check runs on locked rows, two concurrent orders for the same
+# SKU can no longer both pass and oversell.
+RESERVE_STOCK_SQL = '''
+WITH wanted AS (
+    SELECT product_id, SUM(quantity)::int AS quantity
+    FROM unnest($1::text[], $2::int[]) AS t(product_id, quantity)
+    GROUP BY product_id
+),
+locked AS (
+    SELECT p.id, p.sku, p.name, p.quantity_in_stock, p."createdAt", p."updatedAt"
+    FROM "Product" p
+    WHERE p.id IN (SELECT product_id FROM wanted)
+    ORDER BY p.id
+    FOR UPDATE
+),
+verdict AS (
+    SELECT (SELECT COUNT(*) FROM wanted) = COUNT(l.id)
+           AND COALESCE(bool_and(l.quantity_in_stock >= w.quantity), TRUE) AS ok
+    FROM wanted w
+    LEFT JOIN locked l ON l.id = w.product_id
+),
+reserved AS (
+    UPDATE "Product" p
+    SET quantity_in_stock = p.quantity_in_stock - w.quantity,
+        "updatedAt" = timezone('utc', now())
+    FROM wanted w, verdict v
+    WHERE v.ok AND p.id = w.product_id
+    RETURNING p.id, p.quantity_in_stock, p."updatedAt"
+)
+SELECT l.id, l.sku, l.name,
+       COALESCE(r.quantity_in_stock, l.quantity_in_stock) AS "quantityInStock",
+       l."createdAt",
+       COALESCE(r."updatedAt", l."updatedAt") AS "updatedAt",
+       (SELECT ok FROM verdict) AS reserved
+FROM locked l
+LEFT JOIN reserved r ON r.id = l.id
+'''
+
+async def reserve_stock(
+    transaction: Prisma,
+    line_items: list[OrderLineItemCreate]
+) -> tuple[bool, dict[str, Product]]:
+    """
+    Checks and (if possible) decrements stock for every line item at once.
+    Returns (reserved, products_by_id). Products reflect the post-reservation stock.
+    """
+    if not line_items:
+        return True, {}
+
+    rows = await transaction.query_raw(
+        RESERVE_STOCK_SQL,
+        [item.product_id for item in line_items],
+        [item.quantity for item in line_items]
+    )
+
+    reserved = bool(rows) and bool(rows[0]['reserved'])
+    products = {}
+    for row in rows:
+        row = dict(row)
+        row.pop('reserved')
+        products[row['id']] = Product(**row)
+    return reserved, products
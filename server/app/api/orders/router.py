@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from typing import List
 from prisma import Prisma
+from pydantic import TypeAdapter
 from prisma.enums import OrderStatus
 from app.db.session import db_client
+from app.api.conditional import ORDERS, PRODUCTS, conditional_get
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from app.api.serialization import serialize
 from . import service
-from .schemas import Order, OrderCreate
+from .allocation import AllocationPolicy, allocate_all
+from .schemas import Order, OrderCreate, AllocationResult
 
 router = APIRouter()
 
+ORDER_LIST = TypeAdapter(List[Order])
+
 @router.post("", response_model=Order, status_code=201)
 async def create_new_order(
     order_data: OrderCreate,
@@ -18,16 +25,34 @@ async def create_new_order(
     """
     return await service.create(db, order_data)
 
-@router.get("", response_model=List[Order])
+@router.get("", response_model=List[Order], dependencies=[Depends(conditional_get(ORDERS, PRODUCTS))])
 async def get_all_orders_route(
+    response: Response,
     status: OrderStatus | None = Query(None), 
+    cursor: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Prisma = Depends(lambda: db_client)
 ):
     """
-    Get a list of all orders, optionally filtered by status.
+    Get a page of orders (newest first), optionally filtered by status.
+    The next page's cursor is returned in the X-Next-Cursor header.
     """
+    try:
+        orders, next_cursor = await service.get_all(db, status, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     # The Schema now handles mapping 'lineItems' to 'products' automatically via alias.
-    return await service.get_all(db, status)
+    return serialize(ORDER_LIST, orders, response)
+
+@router.post("/allocate-all", response_model=AllocationResult)
+async def allocate_all_orders_route(
+    policy: AllocationPolicy | None = Query(None), # Defaults to ORDER_ALLOCATION_POLICY
+    db: Prisma = Depends(lambda: db_client)
+):
+    """Allocate available stock to every order awaiting stock in one pass."""
+    return await allocate_all(db, policy)
 
 @router.post("/{order_id}/complete", response_model=Order)
 async def complete_order_route(order_id: str, db: Prisma = Depends(lambda: db_client)):
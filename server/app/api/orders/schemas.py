@@ -31,4 +31,12 @@ class Order(BaseModel):
     source: OrderSource
     status: OrderStatus
     products: list[OrderLineItem] = Field(alias='lineItems', default=[]) 
-    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+# --- Schemas for Bulk Allocation ---
+
+class AllocationResult(BaseModel):
+    policy: str
+    allocated: int
+    still_waiting: int
+    order_ids: list[str]
@@ -1,86 +1,86 @@
-import os
-import aiohttp
-import asyncio
-from prisma import Prisma
-from prisma.enums import OrderStatus
+from prisma import Prisma, models
+from prisma.enums import OrderStatus, OrderSource
+from app.api.pagination import DEFAULT_PAGE_SIZE, created_desc_where, decode_created_cursor, split_page
+from app.db import pg
+from app.db.ids import new_id
+from app.services.catalog_cache import catalog_cache
+from app.services.notifications import enqueue_order_created, notification_dispatcher, order_payload
+from .allocation import APPLY_DECREMENTS_SQL, LOCK_STOCK_SQL
+from .reservations import reserve_stock
 from .schemas import OrderCreate
 
-# --- NOTIFICATION HELPER ---
-async def send_whatsapp_notification(order):
-    """
-    Sends a strictly professional WhatsApp notification.
-    Shows SKU, Description, and Quantity with BOLD labels.
-    """
-    token = os.getenv("WHATSAPP_TOKEN")
-    phone_id = os.getenv("WHATSAPP_PHONE_ID")
-    recipient = os.getenv("WHATSAPP_RECIPIENT")
-
-    if not all([token, phone_id, recipient]):
-        print("⚠️ WhatsApp keys missing in .env - Skipping notification.")
-        return
-
-    # 1. Build the Item Details String
-    items_list = ""
-    
-    for line in order.lineItems:
-        prod = line.product
-        
-        # Added asterisks around labels to make them BOLD
-        items_list += (
-            f"*SKU:* {prod.sku}\n"
-            f"*Item Description:* {prod.name}\n"
-            f"*Quantity:* {line.quantity}\n"
-            f"--------------------------------\n"
-        )
+# Fast read path (asyncpg): one page of orders with their line items folded in as JSON.
+# Four fixed statements (status filter x cursor) so each gets its own prepared plan.
+# created_at is a naive UTC column; it is returned (and the cursor compared) as
+# timestamptz so rows and cursors match the Prisma path.
+ORDER_PAGE_SQL = '''
+SELECT o.id, o.customer_name AS "customerName", o.source::text AS source,
+       o.status::text AS status, o.created_at AT TIME ZONE 'UTC' AS "createdAt",
+       COALESCE(li.items, '[]'::json) AS "lineItems"
+FROM "Order" o
+LEFT JOIN LATERAL (
+    SELECT json_agg(json_build_object(
+               'quantity', l.quantity,
+               'product', json_build_object('name', p.name, 'sku', p.sku)
+           ) ORDER BY l.id) AS items
+    FROM order_line_items l
+    JOIN "Product" p ON p.id = l."productId"
+    WHERE l."orderId" = o.id
+) li ON true
+{where}
+ORDER BY o.created_at DESC, o.id DESC
+LIMIT ${limit}
+'''
 
-    # 2. Construct the Message Body
-    message_body = (
-        f"*NEW ORDER NOTIFICATION*\n"
-        f"========================\n"
-        f"Customer: {order.customerName}\n"
-        f"Order ID: {order.id}\n\n"
-        f"ORDER DETAILS\n"
-        f"========================\n"
-        f"{items_list}"
-    )
-
-    url = f"https://graph.facebook.com/v17.0/{phone_id}/messages"
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
-    # --- FIXED: Defined payload here ---
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": recipient,
-        "type": "text",
-        "text": {
-            "body": message_body
-        }
-    }
+def _order_page_sql(with_status: bool, with_cursor: bool) -> str:
+    conditions, n = [], 0
+    if with_status:
+        n += 1
+        conditions.append(f'o.status = ${n}::"OrderStatus"')
+    if with_cursor:
+        conditions.append(f"(o.created_at, o.id) < (${n + 1}::timestamptz AT TIME ZONE 'UTC', ${n + 2})")
+        n += 2
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    return ORDER_PAGE_SQL.format(where=where, limit=n + 1)
 
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                if response.status == 200:
-                    print(f"✅ WhatsApp Alert Sent for Order {order.id}")
-                else:
-                    body = await response.text()
-                    print(f"❌ WhatsApp Failed: {body}")
-    except Exception as e:
-        print(f"❌ WhatsApp Error: {str(e)}")
+ORDER_PAGE_SQLS = {
+    (with_status, with_cursor): _order_page_sql(with_status, with_cursor)
+    for with_status in (False, True) for with_cursor in (False, True)
+}
 
+# One row per line item (a single row with NULL product for an empty order), order row-locked.
+LOCK_ORDER_SQL = '''
+SELECT o.status::text AS status, li."productId" AS product_id, li.quantity
+FROM "Order" o
+LEFT JOIN order_line_items li ON li."orderId" = o.id
+WHERE o.id = $1
+FOR UPDATE OF o
+'''
 
 # --- CORE SERVICE LOGIC ---
 
-async def get_all(db: Prisma, status: OrderStatus | None = None):
-    query = {}
+async def get_all(
+    db: Prisma,
+    status: OrderStatus | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE
+):
+    """
+    Returns one page of orders (newest first) and the cursor for the next page.
+    """
+    if pg.fast_reads('orders'):
+        args = [status.value] if status else []
+        if cursor:
+            args += list(decode_created_cursor(cursor))
+        rows = await pg.fetch(ORDER_PAGE_SQLS[(bool(status), bool(cursor))], *args, limit + 1)
+        return split_page(rows, limit, key=lambda r: (r['createdAt'], r['id']))
+
+    where = created_desc_where(cursor)
     if status:
-        query['where'] = {'status': status}
+        where['status'] = status
     
-    return await db.order.find_many(
+    orders = await db.order.find_many(
+        where=where,
         include={
             'lineItems': {
                 'include': {
@@ -88,9 +88,10 @@ async def get_all(db: Prisma, status: OrderStatus | None = None):
                 }
             }
         },
-        order={'createdAt': 'desc'},
-        **query
+        order=[{'createdAt': 'desc'}, {'id': 'desc'}],
+        take=limit + 1
     )
+    return split_page(orders, limit, key=lambda o: (o.createdAt, o.id))
 
 async def get_by_id(db: Prisma, order_id: str):
     return await db.order.find_unique(
@@ -98,49 +99,61 @@ async def get_by_id(db: Prisma, order_id: str):
         include={'lineItems': {'include': {'product': True}}}
     )
 
-async def create(db: Prisma, order_data: OrderCreate):
+async def create(
+    db: Prisma,
+    order_data: OrderCreate,
+    external_order_id: str | None = None,
+    external_source: OrderSource | None = None
+):
+    """
+    Creates an order with a constant number of queries: one reservation statement,
+    one order insert, one line-item create_many and one notification outbox insert.
+    'external_order_id' / 'external_source' identify orders imported from a sales channel.
+    """
+    line_items = [
+        {
+            'id': new_id(),
+            'productId': item.product_id,
+            'quantity': item.quantity
+        }
+        for item in order_data.line_items
+    ]
+
     async with db.tx() as transaction:
-        can_fulfill_all = True
-        for item in order_data.line_items:
-            product = await transaction.product.find_unique(where={'id': item.product_id})
-            # Check if stock is sufficient
-            if not product or product.quantityInStock < item.quantity:
-                can_fulfill_all = False
-                break
-        
-        initial_status = OrderStatus.READY_TO_SHIP if can_fulfill_all else OrderStatus.AWAITING_STOCK
-        
         # LOGIC FIX: If we can fulfill immediately, DEDUCT STOCK NOW (Reserve it)
-        if initial_status == OrderStatus.READY_TO_SHIP:
-            for item in order_data.line_items:
-                await transaction.product.update(
-                    where={'id': item.product_id},
-                    data={'quantityInStock': {'decrement': item.quantity}}
-                )
+        reserved, products = await reserve_stock(transaction, order_data.line_items)
+        initial_status = OrderStatus.READY_TO_SHIP if reserved else OrderStatus.AWAITING_STOCK
 
         new_order = await transaction.order.create(
             data={
                 'customerName': order_data.customer_name,
                 'source': order_data.source,
-                'status': initial_status
+                'status': initial_status,
+                'externalOrderId': external_order_id,
+                'externalSource': external_source
             }
         )
-        
-        for item in order_data.line_items:
-            await transaction.orderlineitem.create(
-                data={
-                    'orderId': new_order.id,
-                    'productId': item.product_id,
-                    'quantity': item.quantity
-                }
-            )
-            
-    # Fetch complete order with products
-    created_order = await get_by_id(db, new_order.id)
 
-    # --- NOTIFICATION ---
-    await send_whatsapp_notification(created_order)
-    # --------------------
+        for line in line_items:
+            line['orderId'] = new_order.id
+        if line_items:
+            await transaction.orderlineitem.create_many(data=line_items)
+
+        # Hydrate the order from what we already have (no extra get_by_id round trip)
+        created_order = new_order.model_copy(update={
+            'lineItems': [
+                models.OrderLineItem(**line, product=products.get(line['productId']))
+                for line in line_items
+            ]
+        })
+
+        # --- NOTIFICATION (outbox row, committed together with the order) ---
+        await enqueue_order_created(transaction, order_payload(created_order, products))
+
+    if reserved:
+        catalog_cache.patch_stock({p.id: p.quantityInStock for p in products.values()})
+
+    notification_dispatcher.wake()
 
     return created_order
 
@@ -171,19 +184,24 @@ async def cancel_order(db: Prisma, order_id: str):
     async with db.tx() as transaction:
         # LOGIC FIX: If the order reserved stock, give it back.
         # This applies to READY_TO_SHIP and ON_HOLD.
+        new_stock = {}
         if order.status in [OrderStatus.READY_TO_SHIP, OrderStatus.ON_HOLD]:
             for item in order.lineItems:
-                await transaction.product.update(
+                product = await transaction.product.update(
                     where={'id': item.productId},
                     data={'quantityInStock': {'increment': item.quantity}}
                 )
+                new_stock[product.id] = product.quantityInStock
 
-        return await transaction.order.update(
+        cancelled_order = await transaction.order.update(
             where={'id': order_id},
             data={'status': OrderStatus.CANCELLED},
             include={'lineItems': {'include': {'product': True}}}
         )
 
+    catalog_cache.patch_stock(new_stock)
+    return cancelled_order
+
 async def hold_order(db: Prisma, order_id: str):
     # Stock remains reserved (deducted) while ON_HOLD
     return await db.order.update(
@@ -204,34 +222,49 @@ async def allocate_order(db: Prisma, order_id: str):
     """
     Attempts to allocate stock to an AWAITING_STOCK order.
     If stock is available, it reserves (deducts) it and moves to READY_TO_SHIP.
+    Locks the order, then its products (same lock order as allocate_all).
     """
-    order = await get_by_id(db, order_id)
-    if not order:
-        return None
-    
-    if order.status != OrderStatus.AWAITING_STOCK:
-        raise ValueError("Only orders awaiting stock can be allocated.")
-
     async with db.tx() as transaction:
-        # 1. Check if we have enough stock for ALL items
-        for item in order.lineItems:
-            product = await transaction.product.find_unique(where={'id': item.productId})
+        # 1. Lock the order and re-check its status on the locked row
+        rows = await transaction.query_raw(LOCK_ORDER_SQL, order_id)
+        if not rows:
+            return None
+        if rows[0]['status'] != OrderStatus.AWAITING_STOCK.value:
+            raise ValueError("Only orders awaiting stock can be allocated.")
+
+        wanted = {}
+        for row in rows:
+            if row['product_id'] is not None:
+                wanted[row['product_id']] = wanted.get(row['product_id'], 0) + row['quantity']
+
+        # 2. Check if we have enough stock for ALL items (on locked rows)
+        product_ids = sorted(wanted)
+        stock = {}
+        if product_ids:
+            stock = {r['id']: r for r in await transaction.query_raw(LOCK_STOCK_SQL, product_ids)}
+        for product_id, quantity in wanted.items():
+            product = stock.get(product_id)
             if not product:
-                raise ValueError(f"Product {item.productId} not found")
-            
-            if product.quantityInStock < item.quantity:
-                raise ValueError(f"Insufficient stock for {product.sku}. Needed: {item.quantity}, Available: {product.quantityInStock}")
-
-        # 2. If we are here, stock is good. Reserve it.
-        for item in order.lineItems:
-            await transaction.product.update(
-                where={'id': item.productId},
-                data={'quantityInStock': {'decrement': item.quantity}}
+                raise ValueError(f"Product {product_id} not found")
+            if product['quantity_in_stock'] < quantity:
+                raise ValueError(f"Insufficient stock for {product['sku']}. Needed: {quantity}, Available: {product['quantity_in_stock']}")
+
+        # 3. If we are here, stock is good. Reserve it.
+        new_stock = {}
+        if product_ids:
+            updated = await transaction.query_raw(
+                APPLY_DECREMENTS_SQL,
+                product_ids,
+                [wanted[pid] for pid in product_ids]
             )
+            new_stock = {r['id']: r['quantity_in_stock'] for r in updated}
 
-        # 3. Update Status
-        return await transaction.order.update(
+        # 4. Update Status
+        allocated_order = await transaction.order.update(
             where={'id': order_id},
             data={'status': OrderStatus.READY_TO_SHIP},
             include={'lineItems': {'include': {'product': True}}}
-        )
\ No newline at end of file
+        )
+
+    catalog_cache.patch_stock(new_stock)
+    return allocated_order
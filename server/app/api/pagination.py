@@ -0,0 +1,79 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+# Shared keyset (cursor) pagination helpers for the list endpoints.
+# The cursor is an opaque base64 token of the last row's sort key, e.g. [createdAt, id].
+# The next-page cursor is returned in the NEXT_CURSOR_HEADER response header
+# so list bodies keep their existing shape.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values) -> str:
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, size: int = 2) -> list[str]:
+    """Raises ValueError for anything that is not a cursor we issued."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Invalid pagination cursor.")
+
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise ValueError("Invalid pagination cursor.")
+    return values
+
+def decode_created_cursor(cursor: str) -> tuple[datetime, str]:
+    """The timestamp comes back tz-aware UTC; a naive one (older cursors) is taken as UTC."""
+    created_at, row_id = decode_cursor(cursor)
+    try:
+        value = datetime.fromisoformat(created_at)
+    except ValueError:
+        raise ValueError("Invalid pagination cursor.")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc), row_id
+
+def created_desc_where(cursor: str | None) -> dict:
+    """
+    Prisma filter for rows after 'cursor' in (createdAt DESC, id DESC) order.
+    The redundant 'lte' bound lets Postgres range-scan the (createdAt, id) index.
+    """
+    if not cursor:
+        return {}
+    created_at, row_id = decode_created_cursor(cursor)
+    return {
+        'createdAt': {'lte': created_at},
+        'OR': [
+            {'createdAt': {'lt': created_at}},
+            {'id': {'lt': row_id}}
+        ]
+    }
+
+def name_asc_where(cursor: str | None) -> dict:
+    """Prisma filter for rows after 'cursor' in (name ASC, id ASC) order."""
+    if not cursor:
+        return {}
+    name, row_id = decode_cursor(cursor)
+    return {
+        'name': {'gte': name},
+        'OR': [
+            {'name': {'gt': name}},
+            {'id': {'gt': row_id}}
+        ]
+    }
+
+def split_page(rows: list, limit: int, key) -> tuple[list, str | None]:
+    """
+    'rows' must be fetched with take=limit + 1.
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional
 from prisma import Prisma
+from pydantic import TypeAdapter
 from app.db.session import db_client
+from app.api.conditional import PRODUCTS, conditional_get
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from app.api.serialization import serialize
 from . import service
-from .schemas import Product, ProductCreate
+from app.services.catalog_cache import catalog_cache
+from .schemas import Product, ProductCreate, CatalogCacheStats
 
 router = APIRouter()
 
+PRODUCT_LIST = TypeAdapter(List[Product])
+
 @router.post("", response_model=Product, status_code=201)
 async def create_new_product(
     product: ProductCreate, 
@@ -24,13 +31,39 @@ async def create_new_product(
     return await service.create(db, product)
 
 # --- UPDATED ENDPOINT ---
-@router.get("", response_model=List[Product])
+@router.get("", response_model=List[Product], dependencies=[Depends(conditional_get(PRODUCTS))])
 async def get_all_products_route(
+    response: Response,
     search: Optional[str] = Query(None), # Capture ?search=... from URL
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Prisma = Depends(lambda: db_client)
 ):
     """
     Get a list of products. 
     If 'search' is provided, filters by Name OR SKU.
+    Otherwise returns a page of the catalog; the next cursor is in the X-Next-Cursor header.
     """
-    return await service.get_all(db, search_query=search)
\ No newline at end of file
+    try:
+        products, next_cursor = await service.get_all(db, search_query=search, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return serialize(PRODUCT_LIST, products, response)
+
+@router.get("/autocomplete", response_model=List[Product])
+async def autocomplete_products_route(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: Prisma = Depends(lambda: db_client)
+):
+    """
+    Prefix autocomplete on Name/SKU, served from the in-memory catalog cache.
+    """
+    return serialize(PRODUCT_LIST, await service.autocomplete(db, q, limit))
+
+@router.get("/cache/stats", response_model=CatalogCacheStats)
+async def catalog_cache_stats_route():
+    """Hit rate and approximate memory footprint of the catalog cache."""
+    return catalog_cache.stats()
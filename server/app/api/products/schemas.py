@@ -24,4 +24,14 @@ class ProductCreate(ProductBase):
 
 class Product(ProductBase):
     id: str
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class CatalogCacheStats(BaseModel):
+    ready: bool
+    products: int
+    tokens: int
+    hits: int
+    misses: int
+    hit_rate: float
+    memory_bytes: int
+    loaded_at: float | None = None
@@ -1,40 +1,73 @@
 from prisma import Prisma
+from app.api.pagination import DEFAULT_PAGE_SIZE, decode_cursor, name_asc_where, split_page
+from app.db import pg
+from app.services.catalog_cache import catalog_cache
+from app.services.product_search import search_product_rows, search_products
 from .schemas import ProductCreate
 
+# Fast read path (asyncpg) for the catalog pages; same order as the Prisma path.
+CATALOG_PAGE_SQL = '''
+SELECT id, sku, name, quantity_in_stock AS "quantityInStock"
+FROM "Product"
+WHERE (name, id) > ($1, $2)
+ORDER BY name ASC, id ASC
+LIMIT $3
+'''
+
+CATALOG_FIRST_PAGE_SQL = '''
+SELECT id, sku, name, quantity_in_stock AS "quantityInStock"
+FROM "Product"
+ORDER BY name ASC, id ASC
+LIMIT $1
+'''
+
 # --- UPDATED FUNCTION ---
-async def get_all(db: Prisma, search_query: str | None = None):
+async def get_all(
+    db: Prisma,
+    search_query: str | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE
+):
     """
-    Returns products. If search_query is provided, filters by SKU or Name.
+    Returns (products, next_cursor).
+    If search_query is provided, returns the best matches by SKU or Name (single page).
+    Otherwise pages through the whole catalog by (name, id).
     """
     if search_query:
-        # Prisma 'OR' operator allows searching multiple fields
-        return await db.product.find_many(
-            where={
-                'OR': [
-                    {
-                        'name': {
-                            'contains': search_query,
-                            'mode': 'insensitive' # Case-insensitive search
-                        }
-                    },
-                    {
-                        'sku': {
-                            'contains': search_query,
-                            'mode': 'insensitive'
-                        }
-                    }
-                ]
-            },
-            take=20 # Limit results to keep the dropdown snappy
-        )
+        # Ranked trigram search (exact/prefix SKU first, typo tolerant on Name).
+        # Not answered from the catalog cache: its prefix hits skip the ranking.
+        if pg.fast_reads('products'):
+            return await search_product_rows(search_query, limit=20), None
+        return await search_products(db, search_query, limit=20), None # Limit results to keep the dropdown snappy
+
+    if pg.fast_reads('products'):
+        if cursor:
+            name, product_id = decode_cursor(cursor)
+            rows = await pg.fetch(CATALOG_PAGE_SQL, name, product_id, limit + 1)
+        else:
+            rows = await pg.fetch(CATALOG_FIRST_PAGE_SQL, limit + 1)
+        return split_page(rows, limit, key=lambda r: (r['name'], r['id']))
     
-    # If no search query, return all (or first 100 to avoid huge payloads)
-    return await db.product.find_many(take=100)
+    products = await db.product.find_many(
+        where=name_asc_where(cursor),
+        order=[{'name': 'asc'}, {'id': 'asc'}],
+        take=limit + 1
+    )
+    return split_page(products, limit, key=lambda p: (p.name, p.id))
+
+async def autocomplete(db: Prisma, query: str, limit: int = 10):
+    """Answers dropdown autocomplete from the catalog cache, falling back to SQL when cold."""
+    cached = catalog_cache.autocomplete(query, limit=limit)
+    if cached is not None:
+        return cached
+    return await search_products(db, query, limit=limit)
 
 async def create(db: Prisma, product_data: ProductCreate):
     """Creates a new product in the database."""
-    return await db.product.create(data=product_data.model_dump())
+    product = await db.product.create(data=product_data.model_dump())
+    catalog_cache.put(product)
+    return product
 
 async def get_by_sku(db: Prisma, sku: str):
     """Finds a product by its unique SKU."""
-    return await db.product.find_unique(where={'sku': sku})
\ No newline at end of file
+    return await catalog_cache.get_by_sku(db, sku)
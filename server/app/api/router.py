@@ -4,10 +4,14 @@ from app.api.shipments.router import router as shipments_router
 from app.api.inventory.router import router as inventory_router
 from app.api.orders.router import router as orders_router
 from app.api.dashboard.router import router as dashboard_router
+from app.api.scheduler.router import router as scheduler_router
+from app.api.events.router import router as events_router
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
 api_router.include_router(products_router, prefix="/products", tags=["Products"])
 api_router.include_router(shipments_router, prefix="/shipments", tags=["Shipments"])
 api_router.include_router(inventory_router, prefix="/inventory", tags=["Inventory"])
-api_router.include_router(orders_router, prefix="/orders", tags=["Orders"])
\ No newline at end of file
+api_router.include_router(orders_router, prefix="/orders", tags=["Orders"])
+api_router.include_router(scheduler_router, prefix="/scheduler", tags=["Scheduler"])
+api_router.include_router(events_router, prefix="/events", tags=["Events"])
\ No newline at end of file
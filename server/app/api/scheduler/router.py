@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+from prisma import Prisma
+from app.db.session import db_client
+from app.services.scheduler import job_scheduler
+from . import service
+from .schemas import JobRunDetail, SchedulerJob
+
+router = APIRouter()
+
+@router.get("/jobs", response_model=List[SchedulerJob])
+async def get_jobs_route(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    db: Prisma = Depends(lambda: db_client)
+):
+    return await service.get_jobs(db, hours)
+
+@router.get("/jobs/{name}/runs", response_model=List[JobRunDetail])
+async def get_job_runs_route(
+    name: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: Prisma = Depends(lambda: db_client)
+):
+    if name not in job_scheduler.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await service.get_runs(db, name, limit)
@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class JobRun(BaseModel):
+    worker: str
+    status: str
+    error: str | None = None
+    started_at: datetime
+    finished_at: datetime | None = None
+    duration_ms: int | None = None
+
+class JobRunDetail(JobRun):
+    id: str
+
+class WorkerJobStats(BaseModel):
+    # Counters of the worker that answered the request
+    runs: int
+    failures: int
+    skipped_locked: int   # Another worker held the lock
+    skipped_recent: int   # Another worker already ran it this period (or is running it)
+    lock_lost: int        # Runs that finished after their lock connection dropped
+    running: bool
+    last_duration_ms: int | None = None
+    last_error: str | None = None
+
+class SchedulerJob(BaseModel):
+    name: str
+    interval_seconds: float
+    next_run_time: datetime | None = None
+    # Cluster-wide, over the last 'window_hours'
+    window_hours: int
+    runs: int
+    failures: int
+    avg_duration_ms: int | None = None
+    p95_duration_ms: int | None = None
+    max_duration_ms: int | None = None
+    last_run: JobRun | None = None
+    worker: WorkerJobStats
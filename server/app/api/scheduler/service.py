@@ -0,0 +1,65 @@
+from prisma import Prisma
+from app.services.scheduler import job_scheduler
+
+# Run history across ALL workers for the last $1 hours, one row per job.
+JOB_STATS_SQL = '''
+SELECT job,
+       COUNT(*)::int AS runs,
+       COUNT(*) FILTER (WHERE status = 'FAILED')::int AS failures,
+       AVG(duration_ms)::int AS avg_duration_ms,
+       (percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms))::int AS p95_duration_ms,
+       MAX(duration_ms) AS max_duration_ms
+FROM scheduler_job_runs
+WHERE started_at > timezone('utc', now()) - make_interval(hours => $1)
+GROUP BY job
+'''
+
+LAST_RUNS_SQL = '''
+SELECT DISTINCT ON (job)
+       job, worker, status::text AS status, error, started_at, finished_at, duration_ms
+FROM scheduler_job_runs
+ORDER BY job, started_at DESC
+'''
+
+RECENT_RUNS_SQL = '''
+SELECT id, worker, status::text AS status, error, started_at, finished_at, duration_ms
+FROM scheduler_job_runs
+WHERE job = $1
+ORDER BY started_at DESC
+LIMIT $2
+'''
+
+async def get_jobs(db: Prisma, hours: int = 24) -> list[dict]:
+    """Registered jobs with cluster-wide history (DB) and this worker's counters."""
+    stats = {row['job']: row for row in await db.query_raw(JOB_STATS_SQL, hours)}
+    last_runs = {row['job']: row for row in await db.query_raw(LAST_RUNS_SQL)}
+
+    jobs = []
+    for name, job in job_scheduler.jobs.items():
+        window = stats.get(name, {})
+        jobs.append({
+            'name': name,
+            'interval_seconds': job.interval_seconds,
+            'next_run_time': job_scheduler.next_run_time(name),
+            'window_hours': hours,
+            'runs': window.get('runs', 0),
+            'failures': window.get('failures', 0),
+            'avg_duration_ms': window.get('avg_duration_ms'),
+            'p95_duration_ms': window.get('p95_duration_ms'),
+            'max_duration_ms': window.get('max_duration_ms'),
+            'last_run': last_runs.get(name),
+            'worker': {
+                'runs': job.runs,
+                'failures': job.failures,
+                'skipped_locked': job.skipped_locked,
+                'skipped_recent': job.skipped_recent,
+                'lock_lost': job.lock_lost,
+                'running': job.running,
+                'last_duration_ms': job.last_duration_ms,
+                'last_error': job.last_error,
+            },
+        })
+    return jobs
+
+async def get_runs(db: Prisma, name: str, limit: int = 50) -> list[dict]:
+    return await db.query_raw(RECENT_RUNS_SQL, name, limit)
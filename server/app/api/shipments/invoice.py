@@ -0,0 +1,112 @@
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache
+from openpyxl import Workbook
+
+# Invoice rendering, kept off the event loop.
+# - XLSX is built with a write_only openpyxl workbook on a small thread pool and
+#   spooled to a temp file (memory up to SPOOL_BYTES, disk beyond that).
+# - CSV is generated row by row while the response streams.
+# - The lines of a RECEIVED shipment can no longer change, but product names can (the
+#   catalog import rewrites them). Rendered bytes are kept in an LRU bounded by total
+#   bytes, keyed by (shipment id, receivedAt, newest product updatedAt, format).
+
+CACHE_BYTES = int(os.getenv("INVOICE_CACHE_BYTES", str(64 * 1024 * 1024)))
+MAX_THREADS = int(os.getenv("INVOICE_MAX_THREADS", "2"))
+SPOOL_BYTES = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+CSV_ROWS_PER_CHUNK = 500
+
+FORMATS = {
+    'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    'csv': "text/csv; charset=utf-8",
+}
+
+COLUMNS = [('SKU', 15), ('Product Name', 50), ('Quantity', 10)]
+
+_executor = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="invoice")
+_cache: LRUCache = LRUCache(maxsize=CACHE_BYTES, getsizeof=len)
+
+
+def _rows(items: list[dict]):
+    for item in items:
+        yield [item['sku'], item['product_name'], item['total_quantity']]
+
+def _render_xlsx(items: list[dict]):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Invoice')
+    for letter, (_, width) in zip('ABC', COLUMNS):
+        ws.column_dimensions[letter].width = width
+    ws.append([title for title, _ in COLUMNS])
+    for row in _rows(items):
+        ws.append(row)
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    wb.save(output)
+    output.seek(0)
+    return output
+
+def _iter_file(output):
+    """Sync generator: Starlette iterates it in its thread pool, so reads stay off the loop."""
+    try:
+        while chunk := output.read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        output.close()
+
+def _iter_bytes(data: bytes):
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+def iter_csv(items: list[dict]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([title for title, _ in COLUMNS])
+    for i, row in enumerate(_rows(items), start=1):
+        writer.writerow(row)
+        if i % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+async def render(items: list[dict], fmt: str):
+    """Returns an iterator of byte chunks for the response body."""
+    if fmt == 'csv':
+        return iter_csv(items)
+    loop = asyncio.get_running_loop()
+    output = await loop.run_in_executor(_executor, _render_xlsx, items)
+    return _iter_file(output)
+
+async def render_bytes(items: list[dict], fmt: str) -> bytes:
+    if fmt == 'csv':
+        return b''.join(iter_csv(items))
+
+    def build():
+        output = _render_xlsx(items)
+        try:
+            return output.read()
+        finally:
+            output.close()
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, build)
+
+
+def cache_key(shipment_id: str, received_at, products_updated_at, fmt: str) -> tuple:
+    return (shipment_id, received_at.isoformat(), str(products_updated_at), fmt)
+
+def cached(key: tuple):
+    data = _cache.get(key)
+    return _iter_bytes(data) if data is not None else None
+
+def store(key: tuple, data: bytes):
+    if len(data) <= CACHE_BYTES:
+        _cache[key] = data
+    return _iter_bytes(data)
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 from prisma import Prisma
+from pydantic import TypeAdapter
 from app.db.session import db_client
-from . import service
+from app.api.conditional import ORDERS, PRODUCTS, SHIPMENTS, conditional_get
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from app.api.serialization import serialize
+from . import invoice, service
 from .schemas import (
     ShipmentListItem, 
     ShipmentDetail, 
@@ -12,11 +17,14 @@ from .schemas import (
     ShipmentCreate,
     ShipmentRequestBatchCreate,
     ShipmentRequestUpdate,
-    InvoiceData
+    InvoiceData,
+    ConsolidatedReport
 )
 
 router = APIRouter()
 
+SHIPMENT_LIST = TypeAdapter(List[ShipmentListItem])
+
 @router.post("", response_model=ShipmentListItem, status_code=201)
 async def create_new_shipment(shipment_data: ShipmentCreate, db: Prisma = Depends(lambda: db_client)):
     return await service.create(db, shipment_data)
@@ -29,11 +37,31 @@ async def delete_shipment_route(shipment_id: str, db: Prisma = Depends(lambda: d
     except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
     return None
 
-@router.get("", response_model=List[ShipmentListItem])
-async def get_all_shipments_route(db: Prisma = Depends(lambda: db_client)):
-    return await service.get_all(db)
+@router.get("", response_model=List[ShipmentListItem], dependencies=[Depends(conditional_get(SHIPMENTS))])
+async def get_all_shipments_route(
+    response: Response,
+    cursor: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Prisma = Depends(lambda: db_client)
+):
+    try:
+        shipments, next_cursor = await service.get_all(db, cursor, limit)
+    except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor: response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return serialize(SHIPMENT_LIST, shipments, response)
+
+@router.get("/reports/consolidated", response_model=ConsolidatedReport)
+async def consolidated_report_route(
+    shipment_ids: Optional[List[str]] = Query(None),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Prisma = Depends(lambda: db_client)
+):
+    if not shipment_ids and not created_from and not created_to:
+        raise HTTPException(status_code=400, detail="Pass shipment_ids and/or a created_from/created_to range.")
+    return await service.get_consolidated_report(db, shipment_ids, created_from, created_to)
 
-@router.get("/{shipment_id}", response_model=ShipmentDetail)
+@router.get("/{shipment_id}", response_model=ShipmentDetail, dependencies=[Depends(conditional_get(SHIPMENTS, ORDERS, PRODUCTS))])
 async def get_shipment_details(shipment_id: str, db: Prisma = Depends(lambda: db_client)):
     shipment = await service.get_by_id(db, shipment_id)
     if not shipment: raise HTTPException(status_code=404, detail="Shipment not found")
@@ -45,13 +73,11 @@ async def add_request_to_shipment_route(
     request_data: ShipmentRequestCreate,
     db: Prisma = Depends(lambda: db_client)
 ):
-    shipment = await service.get_by_id(db, shipment_id)
+    try:
+        shipment = await service.add_request_to_shipment(db, shipment_id, request_data)
+    except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
     if not shipment: raise HTTPException(status_code=404, detail="Shipment not found")
-    if str(shipment.status) != "PLANNING": 
-        raise HTTPException(status_code=400, detail=f"Cannot add requests to a shipment with status '{shipment.status}'")
-
-    await service.add_request_to_shipment(db, shipment_id, request_data)
-    return await service.get_by_id(db, shipment_id)
+    return shipment
 
 @router.post("/{shipment_id}/requests/batch", response_model=ShipmentDetail)
 async def add_batch_requests_route(
@@ -60,14 +86,12 @@ async def add_batch_requests_route(
     db: Prisma = Depends(lambda: db_client)
 ):
     """Add multiple requests at once."""
-    shipment = await service.get_by_id(db, shipment_id)
+    try:
+        shipment = await service.add_batch_requests(db, shipment_id, batch_data)
+    except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
     if not shipment: raise HTTPException(status_code=404, detail="Shipment not found")
-    if str(shipment.status) != "PLANNING": 
-        raise HTTPException(status_code=400, detail=f"Cannot add requests to a shipment with status '{shipment.status}'")
-
-    await service.add_batch_requests(db, shipment_id, batch_data)
     # Return updated shipment details
-    return await service.get_by_id(db, shipment_id)
+    return shipment
 
 @router.put("/{shipment_id}/status", response_model=ShipmentDetail)
 async def update_shipment_status_route(
@@ -111,16 +135,20 @@ async def preview_invoice_route(shipment_id: str, db: Prisma = Depends(lambda: d
     return data
 
 @router.get("/{shipment_id}/invoice/download")
-async def download_invoice_route(shipment_id: str, db: Prisma = Depends(lambda: db_client)):
-    result = await service.generate_excel_invoice(db, shipment_id)
+async def download_invoice_route(
+    shipment_id: str,
+    format: Literal['xlsx', 'csv'] = 'xlsx',
+    db: Prisma = Depends(lambda: db_client)
+):
+    result = await service.generate_invoice(db, shipment_id, format)
     if not result:
         raise HTTPException(status_code=404, detail="Shipment not found")
     
-    output, shipment_name = result
-    filename = f"Invoice_{shipment_name.replace(' ', '_')}.xlsx"
+    chunks, shipment_name = result
+    filename = f"Invoice_{shipment_name.replace(' ', '_')}.{format}"
     
     return StreamingResponse(
-        output, 
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        chunks, 
+        media_type=invoice.FORMATS[format],
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
\ No newline at end of file
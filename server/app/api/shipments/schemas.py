@@ -56,4 +56,20 @@ class InvoiceItem(BaseModel):
 class InvoiceData(BaseModel):
     shipment_name: str
     items: list[InvoiceItem]
-    total_items: int
\ No newline at end of file
+    total_items: int
+
+class ConsolidatedShipmentLine(BaseModel):
+    shipment_id: str
+    shipment_name: str
+    quantity: int
+
+class ConsolidatedItem(BaseModel):
+    sku: str
+    product_name: str
+    total_quantity: int
+    shipments: list[ConsolidatedShipmentLine]
+
+class ConsolidatedReport(BaseModel):
+    shipment_count: int
+    items: list[ConsolidatedItem]
+    total_items: int
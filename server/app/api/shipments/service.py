@@ -1,12 +1,104 @@
 from prisma import Prisma
-from datetime import datetime
+from datetime import datetime, timezone
 from prisma.enums import ShipmentStatus, OrderStatus, OrderSource
+from app.api.orders.allocation import allocate_all
+from app.api.pagination import DEFAULT_PAGE_SIZE, created_desc_where, split_page
+from app.db.ids import new_id
+from app.services.catalog_cache import catalog_cache
 from .schemas import ShipmentRequestCreate, ShipmentCreate, ShipmentRequestBatchCreate
-import pandas as pd
-import io
+from . import invoice
 
-async def get_all(db: Prisma):
-    return await db.shipment.find_many(order={'createdAt': 'desc'})
+# Linked Pre-Orders still waiting for this shipment (row-locked so they can't change mid-receive).
+# Cancelled ones, and ones already served from stock (manual or auto allocation), don't
+# take the shipment's units: those go to inventory like any restock.
+WAITING_LINKED_ORDERS_SQL = '''
+SELECT id
+FROM "Order"
+WHERE id = ANY($1::text[]) AND status = 'AWAITING_STOCK'
+ORDER BY id
+FOR UPDATE
+'''
+
+# Applies every per-product stock change in one statement.
+# Rows are locked in id order (after the orders), same as app/api/orders/allocation.py.
+APPLY_STOCK_DELTAS_SQL = '''
+WITH locked AS (
+    SELECT id FROM "Product"
+    WHERE id = ANY($1::text[])
+    ORDER BY id
+    FOR UPDATE
+)
+UPDATE "Product" p
+SET quantity_in_stock = p.quantity_in_stock + d.delta,
+    "updatedAt" = timezone('utc', now())
+FROM unnest($1::text[], $2::int[]) AS d(id, delta)
+WHERE p.id = d.id AND p.id IN (SELECT id FROM locked)
+RETURNING p.id, p.quantity_in_stock
+'''
+
+# Invoice lines: one row per SKU, summed in Postgres.
+INVOICE_ITEMS_SQL = '''
+SELECT p.sku, p.name AS product_name, SUM(r.quantity)::int AS total_quantity
+FROM shipment_requests r
+JOIN "Product" p ON p.id = r."productId"
+WHERE r."shipmentId" = $1
+GROUP BY p.sku, p.name
+ORDER BY p.sku
+'''
+
+# Product names on an invoice can still change after receiving (the catalog import
+# rewrites them), and every product write bumps "updatedAt", so this goes in the cache key.
+INVOICE_PRODUCTS_UPDATED_SQL = '''
+SELECT MAX(p."updatedAt") AS updated_at
+FROM shipment_requests r
+JOIN "Product" p ON p.id = r."productId"
+WHERE r."shipmentId" = $1
+'''
+
+# Per (SKU, shipment), per-SKU and grand totals in one pass over the request lines.
+# Shipments are picked by id list ($1, empty = any) and/or a createdAt range ($2 <= t < $3).
+CONSOLIDATED_REPORT_SQL = '''
+SELECT p.sku,
+       MAX(p.name) AS product_name,
+       s.id AS shipment_id,
+       MAX(s.name) AS shipment_name,
+       SUM(r.quantity)::int AS quantity
+FROM shipment_requests r
+JOIN "Shipment" s ON s.id = r."shipmentId"
+JOIN "Product" p ON p.id = r."productId"
+WHERE (cardinality($1::text[]) = 0 OR s.id = ANY($1::text[]))
+  AND ($2::timestamp IS NULL OR s.created_at >= $2::timestamp)
+  AND ($3::timestamp IS NULL OR s.created_at < $3::timestamp)
+GROUP BY GROUPING SETS ((p.sku, s.id), (p.sku), ())
+ORDER BY p.sku NULLS LAST, s.id NULLS FIRST
+'''
+
+# Back-fills fulfillingOrderId for every linked request in one statement.
+LINK_REQUESTS_SQL = '''
+UPDATE shipment_requests sr
+SET fulfilling_order_id = l.order_id
+FROM unnest($1::text[], $2::text[]) AS l(request_id, order_id)
+WHERE sr.id = l.request_id
+'''
+
+# Bulk upsert of request lines keyed by (shipment, product, customer).
+# Only inserts while the shipment is still PLANNING (checked in the same statement).
+UPSERT_REQUESTS_SQL = '''
+INSERT INTO shipment_requests (id, "shipmentId", "productId", customer_name, quantity)
+SELECT t.id, $4, t.product_id, $5, t.quantity
+FROM unnest($1::text[], $2::text[], $3::int[]) AS t(id, product_id, quantity)
+WHERE EXISTS (SELECT 1 FROM "Shipment" WHERE id = $4 AND status = 'PLANNING')
+ON CONFLICT ("shipmentId", "productId", (COALESCE(customer_name, '')))
+DO UPDATE SET quantity = shipment_requests.quantity + EXCLUDED.quantity
+'''
+
+async def get_all(db: Prisma, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE):
+    shipments = await db.shipment.find_many(
+        where=created_desc_where(cursor),
+        order=[{'createdAt': 'desc'}, {'id': 'desc'}],
+        take=limit + 1
+    )
+    return split_page(shipments, limit, key=lambda s: (s.createdAt, s.id))
 
 async def get_by_id(db: Prisma, shipment_id: str):
     return await db.shipment.find_unique(
@@ -30,51 +122,61 @@ async def delete_shipment(db: Prisma, shipment_id: str):
         raise ValueError("Only shipments in PLANNING status can be deleted.")
     return await db.shipment.delete(where={'id': shipment_id})
 
+async def _upsert_requests(
+    db: Prisma,
+    shipment_id: str,
+    customer_name: str | None,
+    quantities: dict[str, int]
+):
+    """
+    Merges {product_id: quantity} into the shipment in one statement.
+    Returns None if the shipment doesn't exist, raises ValueError if it is not PLANNING.
+    """
+    shipment = await db.shipment.find_unique(where={'id': shipment_id})
+    if not shipment: return None
+    if shipment.status != ShipmentStatus.PLANNING:
+        raise ValueError(f"Cannot add requests to a shipment with status '{shipment.status}'")
+
+    # Blank names are general restock, same as no name.
+    customer_name = customer_name.strip() if customer_name and customer_name.strip() else None
+
+    if quantities:
+        merged = await db.execute_raw(
+            UPSERT_REQUESTS_SQL,
+            [new_id() for _ in quantities],
+            list(quantities.keys()),
+            list(quantities.values()),
+            shipment_id,
+            customer_name
+        )
+        if not merged:
+            raise ValueError("Shipment is no longer in PLANNING stage.")
+
+    return await get_by_id(db, shipment_id)
+
 async def add_request_to_shipment(db: Prisma, shipment_id: str, request_data: ShipmentRequestCreate):
-    return await db.shipmentrequest.create(
-        data={
-            'shipmentId': shipment_id,
-            'productId': request_data.product_id,
-            'quantity': request_data.quantity,
-            'customerName': request_data.customer_name,
-        }
+    """Adds (or merges into) a single request line. Returns the updated shipment detail."""
+    return await _upsert_requests(
+        db,
+        shipment_id,
+        request_data.customer_name,
+        {request_data.product_id: request_data.quantity}
     )
 
 async def add_batch_requests(db: Prisma, shipment_id: str, batch_data: ShipmentRequestBatchCreate):
-    async with db.tx() as transaction:
-        results = []
-        for item in batch_data.items:
-            existing_request = await transaction.shipmentrequest.find_first(
-                where={
-                    'shipmentId': shipment_id,
-                    'productId': item.product_id,
-                    'customerName': batch_data.customer_name if batch_data.customer_name else None
-                }
-            )
-
-            if existing_request:
-                updated = await transaction.shipmentrequest.update(
-                    where={'id': existing_request.id},
-                    data={'quantity': {'increment': item.quantity}}
-                )
-                results.append(updated)
-            else:
-                created = await transaction.shipmentrequest.create(
-                    data={
-                        'shipmentId': shipment_id,
-                        'productId': item.product_id,
-                        'quantity': item.quantity,
-                        'customerName': batch_data.customer_name,
-                    }
-                )
-                results.append(created)
-    return results
+    """Adds (or merges into) many request lines at once. Returns the updated shipment detail."""
+    quantities = {}
+    for item in batch_data.items:
+        # Duplicate products in one batch must be summed: ON CONFLICT can't touch a row twice.
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return await _upsert_requests(db, shipment_id, batch_data.customer_name, quantities)
 
 async def update_status(db: Prisma, shipment_id: str, new_status: ShipmentStatus):
     """
     Updates status. 
     - PLANNING -> ORDERED: Generates Sales Orders ONLY for items with a Customer Name.
-    - ORDERED -> RECEIVED: Adds stock. If it was a Pre-Order, reserves it immediately (unless Cancelled).
+    - ORDERED -> RECEIVED: Adds stock. If it was a Pre-Order, reserves it immediately
+      (unless it was Cancelled or already served from stock).
     """
     shipment = await db.shipment.find_unique(where={'id': shipment_id}, include={'requests': True})
     
@@ -83,84 +185,111 @@ async def update_status(db: Prisma, shipment_id: str, new_status: ShipmentStatus
 
     # 1. RECEIVING STOCK
     if new_status == ShipmentStatus.RECEIVED and shipment.status == ShipmentStatus.ORDERED:
+        received_at = datetime.now()
+        new_stock = {}
         async with db.tx() as transaction:
+            # A. Flip the shipment first; the status guard makes a double "receive" a no-op.
+            flipped = await transaction.shipment.update_many(
+                where={'id': shipment_id, 'status': ShipmentStatus.ORDERED},
+                data={'status': new_status, 'receivedAt': received_at}
+            )
+            if not flipped:
+                return shipment
+
+            # B. Which linked Pre-Orders still want their stock? (Cancelled or already served ones don't.)
+            linked_ids = sorted({r.fulfillingOrderId for r in shipment.requests if r.fulfillingOrderId})
+            waiting_orders = set()
+            if linked_ids:
+                rows = await transaction.query_raw(WAITING_LINKED_ORDERS_SQL, linked_ids)
+                waiting_orders = {row['id'] for row in rows}
+
+            # C. Net stock change per product. Lines for a waiting Pre-Order are added
+            #    and reserved straight away, so only the rest reaches inventory.
+            net = {}
             for request in shipment.requests:
-                # A. ALWAYS Add to global inventory first (Replenishment)
-                await transaction.product.update(
-                    where={'id': request.productId},
-                    data={'quantityInStock': {'increment': request.quantity}}
+                if request.fulfillingOrderId in waiting_orders:
+                    continue
+                net[request.productId] = net.get(request.productId, 0) + request.quantity
+
+            if net:
+                product_ids = sorted(net)
+                rows = await transaction.query_raw(
+                    APPLY_STOCK_DELTAS_SQL,
+                    product_ids,
+                    [net[pid] for pid in product_ids]
+                )
+                new_stock = {row['id']: row['quantity_in_stock'] for row in rows}
+
+            # D. Linked Sales Orders are now ready
+            if waiting_orders:
+                await transaction.order.update_many(
+                    where={'id': {'in': list(waiting_orders)}, 'status': OrderStatus.AWAITING_STOCK},
+                    data={'status': OrderStatus.READY_TO_SHIP}
                 )
-            
-                # B. Handle Linked Pre-Orders
-                if request.fulfillingOrderId:
-                    # [FIX START] Check Order Status first!
-                    # We need to fetch the order to see if it was cancelled while waiting.
-                    linked_order = await transaction.order.find_unique(where={'id': request.fulfillingOrderId})
-                    
-                    if linked_order and linked_order.status != OrderStatus.CANCELLED:
-                        # 1. Deduct Stock (Reserve it for the customer)
-                        await transaction.product.update(
-                            where={'id': request.productId},
-                            data={'quantityInStock': {'decrement': request.quantity}}
-                        )
-                        
-                        # 2. Update the Linked Sales Order Status
-                        await transaction.order.update(
-                            where={'id': request.fulfillingOrderId},
-                            data={'status': OrderStatus.READY_TO_SHIP}
-                        )
-                    # [FIX END] If cancelled or missing, we do nothing (stock stays in inventory)
-
-            updated_shipment = await transaction.shipment.update(
-                where={'id': shipment_id},
-                data={'status': new_status, 'receivedAt': datetime.now()}
-            )
-            return updated_shipment
+
+        updated_shipment = shipment.model_copy(update={'status': new_status, 'receivedAt': received_at})
+
+        catalog_cache.patch_stock(new_stock)
+
+        # New stock is in: hand it out to orders that were waiting for it.
+        try:
+            result = await allocate_all(db)
+            print(f"📦 [Allocation] Shipment {shipment_id} received: {result['allocated']} orders allocated.")
+        except Exception as e:
+            print(f"❌ [Allocation] Auto-allocation failed: {e}")
+
+        return updated_shipment
 
     # 2. MARKING AS ORDERED
     elif new_status == ShipmentStatus.ORDERED and shipment.status == ShipmentStatus.PLANNING:
+        ordered_at = datetime.now()
+
+        # A. Group Requests by Customer
+        customer_groups = {}
+        for req in shipment.requests:
+            # If customerName is None or Empty, ignore it for Sales Order creation.
+            if req.customerName and req.customerName.strip():
+                if req.customerName not in customer_groups:
+                    customer_groups[req.customerName] = []
+                customer_groups[req.customerName].append(req)
+
+        # B. Build every Order / Line Item up front with pre-generated ids (Only for named customers)
+        new_orders, new_line_items = [], []
+        linked_request_ids, linked_order_ids = [], []
+        for cust_name, requests in customer_groups.items():
+            order_id = new_id()
+            new_orders.append({
+                'id': order_id,
+                'customerName': cust_name,
+                'source': OrderSource.PreOrder,
+                'status': OrderStatus.AWAITING_STOCK
+            })
+            for req in requests:
+                new_line_items.append({
+                    'id': new_id(),
+                    'orderId': order_id,
+                    'productId': req.productId,
+                    'quantity': req.quantity
+                })
+                linked_request_ids.append(req.id)
+                linked_order_ids.append(order_id)
+
         async with db.tx() as transaction:
-            # A. Update Shipment Status
-            updated_shipment = await transaction.shipment.update(
-                where={'id': shipment_id},
-                data={'status': new_status, 'orderedAt': datetime.now()}
+            # C. Update Shipment Status (guarded, so a repeated call can't create duplicate orders)
+            flipped = await transaction.shipment.update_many(
+                where={'id': shipment_id, 'status': ShipmentStatus.PLANNING},
+                data={'status': new_status, 'orderedAt': ordered_at}
             )
+            if not flipped:
+                return shipment
 
-            # B. Group Requests by Customer
-            customer_groups = {}
-            for req in shipment.requests:
-                # If customerName is None or Empty, ignore it for Sales Order creation.
-                if req.customerName and req.customerName.strip():
-                    if req.customerName not in customer_groups:
-                        customer_groups[req.customerName] = []
-                    customer_groups[req.customerName].append(req)
-            
-            # C. Create Orders (Only for named customers)
-            for cust_name, requests in customer_groups.items():
-                new_order = await transaction.order.create(
-                    data={
-                        'customerName': cust_name,
-                        'source': OrderSource.PreOrder,
-                        'status': OrderStatus.AWAITING_STOCK
-                    }
-                )
+            # D. Insert in bulk and link each shipment request to its order
+            if new_orders:
+                await transaction.order.create_many(data=new_orders)
+                await transaction.orderlineitem.create_many(data=new_line_items)
+                await transaction.execute_raw(LINK_REQUESTS_SQL, linked_request_ids, linked_order_ids)
 
-                for req in requests:
-                    await transaction.orderlineitem.create(
-                        data={
-                            'orderId': new_order.id,
-                            'productId': req.productId,
-                            'quantity': req.quantity
-                        }
-                    )
-                    
-                    # Link the shipment request to this order
-                    await transaction.shipmentrequest.update(
-                        where={'id': req.id},
-                        data={'fulfillingOrderId': new_order.id}
-                    )
-            
-            return updated_shipment
+        return shipment.model_copy(update={'status': new_status, 'orderedAt': ordered_at})
     
     return shipment
 
@@ -187,47 +316,84 @@ async def update_request_quantity(db: Prisma, request_id: str, quantity: int):
         data={'quantity': quantity}
     )
 
+async def _invoice_items(db: Prisma, shipment_id: str) -> list[dict]:
+    return await db.query_raw(INVOICE_ITEMS_SQL, shipment_id)
+
 async def get_invoice_data(db: Prisma, shipment_id: str):
-    shipment = await db.shipment.find_unique(
-        where={'id': shipment_id},
-        include={'requests': {'include': {'product': True}}}
-    )
+    shipment = await db.shipment.find_unique(where={'id': shipment_id})
     if not shipment: return None
 
-    aggregated = {}
-    for req in shipment.requests:
-        sku = req.product.sku
-        if sku in aggregated:
-            aggregated[sku]['qty'] += req.quantity
-        else:
-            aggregated[sku] = {'name': req.product.name, 'qty': req.quantity}
-
-    items = []
-    for sku, data in aggregated.items():
-        items.append({'sku': sku, 'product_name': data['name'], 'total_quantity': data['qty']})
-    
-    items.sort(key=lambda x: x['sku'])
-
+    items = await _invoice_items(db, shipment_id)
     return {
         'shipment_name': shipment.name,
         'items': items,
         'total_items': sum(item['total_quantity'] for item in items)
     }
 
-async def generate_excel_invoice(db: Prisma, shipment_id: str):
-    data = await get_invoice_data(db, shipment_id)
-    if not data: return None
+def _utc_param(value: datetime | None) -> str | None:
+    # Columns are naive UTC timestamps
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
 
-    df = pd.DataFrame(data['items'])
-    df.rename(columns={'sku': 'SKU', 'product_name': 'Product Name', 'total_quantity': 'Quantity'}, inplace=True)
+async def get_consolidated_report(
+    db: Prisma,
+    shipment_ids: list[str] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None
+) -> dict:
+    """
+    Per-SKU totals across many shipments, each with its per-shipment breakdown.
+    One GROUPING SETS query; rows arrive SKU-ordered so they are folded in a single pass.
+    """
+    rows = await db.query_raw(
+        CONSOLIDATED_REPORT_SQL,
+        shipment_ids or [],
+        _utc_param(created_from),
+        _utc_param(created_to)
+    )
 
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Invoice')
-        worksheet = writer.sheets['Invoice']
-        worksheet.column_dimensions['A'].width = 15
-        worksheet.column_dimensions['B'].width = 50
-        worksheet.column_dimensions['C'].width = 10
-    
-    output.seek(0)
-    return output, data['shipment_name']
\ No newline at end of file
+    items, shipments, total = [], set(), 0
+    for row in rows:
+        if row['sku'] is None:            # Grand total row
+            total = row['quantity']
+        elif row['shipment_id'] is None:  # Per-SKU total row (sorted first within its SKU)
+            items.append({
+                'sku': row['sku'],
+                'product_name': row['product_name'],
+                'total_quantity': row['quantity'],
+                'shipments': []
+            })
+        else:
+            shipments.add(row['shipment_id'])
+            items[-1]['shipments'].append({
+                'shipment_id': row['shipment_id'],
+                'shipment_name': row['shipment_name'],
+                'quantity': row['quantity']
+            })
+
+    return {'shipment_count': len(shipments), 'items': items, 'total_items': total}
+
+async def generate_invoice(db: Prisma, shipment_id: str, fmt: str = 'xlsx'):
+    """
+    Returns (byte chunk iterator, shipment name), or None if the shipment doesn't exist.
+    A RECEIVED shipment's lines are frozen, so its invoice is rendered once and served
+    from cache until one of its products changes.
+    """
+    shipment = await db.shipment.find_unique(where={'id': shipment_id})
+    if not shipment: return None
+
+    key = None
+    if shipment.status == ShipmentStatus.RECEIVED and shipment.receivedAt:
+        rows = await db.query_raw(INVOICE_PRODUCTS_UPDATED_SQL, shipment.id)
+        key = invoice.cache_key(shipment.id, shipment.receivedAt, rows[0]['updated_at'], fmt)
+        chunks = invoice.cached(key)
+        if chunks is not None:
+            return chunks, shipment.name
+
+    items = await _invoice_items(db, shipment_id)
+    if key is not None:
+        return invoice.store(key, await invoice.render_bytes(items, fmt)), shipment.name
+    return await invoice.render(items, fmt), shipment.name
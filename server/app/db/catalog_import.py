@@ -0,0 +1,160 @@
+import time
+from pathlib import Path
+import asyncpg
+import pandas as pd
+from app.db import pg
+from app.db.ids import new_id
+
+# Catalog import pipeline for the Shopify product export.
+# 1. Stream the CSV in chunks with pandas and build product names column-wise.
+# 2. COPY each chunk into a temp staging table (one round trip per chunk).
+# 3. Merge with one INSERT ... ON CONFLICT (sku): new SKUs are inserted, existing ones
+#    are only rewritten when md5(name) differs from the stored content_hash.
+# 4. Apply stock levels with one set-based UPDATE: by default only to products this
+#    import created, so re-running the seed never overwrites live stock.
+# Orders, shipments and their line items are never touched.
+
+CHUNK_ROWS = 5000
+
+# Common UTF-8 decoding artifacts found in Shopify exports
+ENCODING_ARTIFACTS = {
+    "¬Æ": "®",
+    "Ôºå": ", ", # Weird wide comma
+    "‚Äì": "-",  # En dash
+    "‚Äî": "-",  # Em dash
+    "‚Äô": "'",  # Smart quote
+}
+
+CSV_COLUMNS = ['Title', 'SKU'] + [f'Option{i} {part}' for i in range(1, 4) for part in ('Name', 'Value')]
+
+CREATE_STAGING_SQL = '''
+CREATE TEMP TABLE catalog_staging (
+    id   text NOT NULL,
+    sku  text NOT NULL,
+    name text NOT NULL
+) ON COMMIT DROP
+'''
+
+MERGE_SQL = '''
+INSERT INTO "Product" (id, sku, name, content_hash, "createdAt", "updatedAt")
+SELECT id, sku, name, md5(name), timezone('utc', now()), timezone('utc', now())
+FROM catalog_staging
+ON CONFLICT (sku) DO UPDATE
+SET name = EXCLUDED.name,
+    content_hash = EXCLUDED.content_hash,
+    "updatedAt" = EXCLUDED."updatedAt"
+WHERE "Product".content_hash IS DISTINCT FROM EXCLUDED.content_hash
+RETURNING sku, (xmax = 0) AS inserted
+'''
+
+FOUND_SKUS_SQL = 'SELECT sku FROM "Product" WHERE sku = ANY($1::text[])'
+
+APPLY_STOCK_SQL = '''
+UPDATE "Product" p
+SET quantity_in_stock = s.quantity,
+    "updatedAt" = timezone('utc', now())
+FROM unnest($1::text[], $2::int[]) AS s(sku, quantity)
+WHERE p.sku = s.sku
+RETURNING p.sku
+'''
+
+
+def _fix_artifacts(col: pd.Series) -> pd.Series:
+    for bad, good in ENCODING_ARTIFACTS.items():
+        col = col.str.replace(bad, good, regex=False)
+    return col
+
+def build_names(chunk: pd.DataFrame) -> pd.Series:
+    """
+    "Base Title | OptionValue1 | OptionValue2", where the base title keeps
+    the text before the 2nd pipe ("A | B | C" -> "A | B").
+    """
+    parts = _fix_artifacts(chunk['Title']).str.split('|', n=2, expand=True)
+    names = parts[0].str.strip()
+    if 1 in parts.columns:
+        second = parts[1].str.strip()
+        names = names.where(second.isna(), names + " | " + second)
+
+    for i in range(1, 4):
+        opt_name, opt_val = chunk[f'Option{i} Name'], chunk[f'Option{i} Value']
+        real = (opt_name != '') & (opt_val != '') & (opt_name != 'Title') & (opt_val != 'Default Title')
+        names = names.where(~real, names + " | " + _fix_artifacts(opt_val))
+    return names
+
+def read_catalog(csv_path: Path, chunk_rows: int = CHUNK_ROWS):
+    """Yields (ids, skus, names) per chunk; blank SKUs are dropped, the first row of a SKU wins."""
+    seen: set[str] = set()
+    reader = pd.read_csv(
+        csv_path,
+        encoding='utf-8-sig',
+        dtype=str,
+        keep_default_na=False,
+        usecols=lambda c: c in CSV_COLUMNS,
+        chunksize=chunk_rows,
+    )
+    for chunk in reader:
+        for col in CSV_COLUMNS:
+            if col not in chunk.columns:
+                chunk[col] = ''
+        chunk['SKU'] = chunk['SKU'].str.strip()
+        chunk = chunk[(chunk['SKU'] != '') & ~chunk['SKU'].isin(seen)]
+        chunk = chunk.drop_duplicates('SKU')
+        if chunk.empty:
+            continue
+
+        skus = chunk['SKU'].tolist()
+        seen.update(skus)
+        yield [new_id() for _ in skus], skus, build_names(chunk).tolist()
+
+
+async def import_catalog(
+    csv_path: Path,
+    stock: dict[str, int] | None = None,
+    overwrite_stock: bool = False
+) -> dict:
+    """
+    Upserts the catalog from 'csv_path' and, if given, sets stock levels ({sku: quantity})
+    of the products it creates ('overwrite_stock': of every listed product).
+    Runs in one transaction. Returns counts for reporting.
+    """
+    started = time.perf_counter()
+    conn: asyncpg.Connection = await pg.connect()
+    try:
+        async with conn.transaction():
+            await conn.execute(CREATE_STAGING_SQL)
+
+            staged = 0
+            for ids, skus, names in read_catalog(csv_path):
+                await conn.copy_records_to_table(
+                    'catalog_staging',
+                    records=zip(ids, skus, names),
+                    columns=['id', 'sku', 'name']
+                )
+                staged += len(skus)
+
+            merged = await conn.fetch(MERGE_SQL)
+            new_skus = {row['sku'] for row in merged if row['inserted']}
+            inserted = len(new_skus)
+
+            stock_updated, stock_kept, stock_missing = 0, 0, []
+            if stock:
+                found = {row['sku'] for row in await conn.fetch(FOUND_SKUS_SQL, list(stock))}
+                stock_missing = sorted(set(stock) - found)
+                targets = {sku: q for sku, q in stock.items() if sku in found and (overwrite_stock or sku in new_skus)}
+                stock_kept = len(found) - len(targets)
+                if targets:
+                    rows = await conn.fetch(APPLY_STOCK_SQL, list(targets.keys()), list(targets.values()))
+                    stock_updated = len(rows)
+    finally:
+        await conn.close()
+
+    return {
+        'staged': staged,
+        'inserted': inserted,
+        'updated': len(merged) - inserted,
+        'unchanged': staged - len(merged),
+        'stock_updated': stock_updated,
+        'stock_kept': stock_kept,
+        'stock_missing': stock_missing,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+from app.db import pg
+
+# Switches the trigger-maintained dashboard counters (DASHBOARD_STATS_MODE=counters)
+# on or off for the whole database. Run it once when changing modes, not per worker:
+#
+#     python -m app.db.dashboard_counters on
+#
+# While off the triggers return immediately and the counters go stale; turning them
+# on recounts everything (briefly blocking writes to Product, Order and Shipment).
+
+ENABLE_SQL = 'SELECT dashboard_counters_enable($1::boolean)'
+ENABLED_SQL = 'SELECT dashboard_counters_enabled()'
+
+async def set_enabled(enabled: bool) -> None:
+    conn = await pg.connect()
+    try:
+        await conn.execute(ENABLE_SQL, enabled)
+    finally:
+        await conn.close()
+
+async def is_enabled() -> bool:
+    conn = await pg.connect()
+    try:
+        return await conn.fetchval(ENABLED_SQL)
+    finally:
+        await conn.close()
+
+async def main(action: str) -> None:
+    if action != 'status':
+        await set_enabled(action == 'on')
+    print(f"📊 Dashboard counters are {'on' if await is_enabled() else 'off'}.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Switch the dashboard counter triggers on or off.")
+    parser.add_argument('action', choices=['on', 'off', 'status'])
+    args = parser.parse_args()
+    asyncio.run(main(args.action))
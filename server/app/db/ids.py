@@ -0,0 +1,31 @@
+import itertools
+import os
+import secrets
+import time
+
+# Client-side ids for rows inserted in bulk (create_many / raw INSERT), where
+# Prisma's @default(cuid()) is not available. Same shape as a cuid:
+# 'c' + timestamp + counter + process fingerprint + random, all base36.
+
+_ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyz'
+_BLOCK = 36 ** 4
+
+def _base36(value: int, width: int) -> str:
+    chars = []
+    while value:
+        value, rem = divmod(value, 36)
+        chars.append(_ALPHABET[rem])
+    return ''.join(reversed(chars)).rjust(width, '0')[-width:]
+
+_counter = itertools.count(secrets.randbelow(_BLOCK))
+_fingerprint = _base36(os.getpid() * 7919 + secrets.randbelow(_BLOCK), 4)
+
+def new_id() -> str:
+    """Returns a new collision-resistant, roughly time-ordered 25 character id."""
+    return (
+        'c'
+        + _base36(int(time.time() * 1000), 8)
+        + _base36(next(_counter) % _BLOCK, 4)
+        + _fingerprint
+        + _base36(secrets.randbelow(_BLOCK * _BLOCK), 8)
+    )
@@ -0,0 +1,194 @@
+import os
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from prisma import Prisma
+
+# Query accounting for the Prisma client (and the asyncpg paths via record()).
+# install() wraps Prisma._execute at class level, so every client - db_client,
+# transaction clients from db.tx(), scripts - is covered without code changes.
+# - track_queries() collects the queries issued in the current request/task, grouped
+#   by "shape" (the statement with every value blanked out), so the same query
+#   repeated in a loop (N+1) stands out.
+# - add_listener() receives every query, e.g. for metrics.
+# - add_transaction_listener() receives the duration of every db.tx() block.
+
+# Per-request tracking in production: QUERY_TRACKING_REPEATS=N logs every request
+# that issued the same query shape more than N times (0 = off).
+REPEAT_WARN_THRESHOLD = int(os.getenv("QUERY_TRACKING_REPEATS", "0"))
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _blank(value):
+    if isinstance(value, dict):
+        return {k: _blank(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        # Any length collapses to one element: IN lists of different sizes share a shape
+        return [_blank(value[0])] if value else []
+    return '?'
+
+def query_shape(model: str, method: str, arguments: dict | None) -> str:
+    """
+    "Product.find_unique {'where': {'sku': '?'}}" or, for raw SQL, the statement text.
+    Values never appear in a shape.
+    """
+    if arguments and isinstance(arguments.get('query'), str):
+        return f"{model}.{method} {_WHITESPACE_RE.sub(' ', arguments['query']).strip()}"
+    return f"{model}.{method} {_blank(arguments or {})}"
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    by_operation: dict[str, int] = field(default_factory=dict) # "Product.find_many" -> count
+    by_shape: dict[str, int] = field(default_factory=dict)
+
+    def record(self, operation: str, seconds: float, shape: str | None = None):
+        self.count += 1
+        self.seconds += seconds
+        self.by_operation[operation] = self.by_operation.get(operation, 0) + 1
+        if shape is not None:
+            self.by_shape[shape] = self.by_shape.get(shape, 0) + 1
+
+    def repeated(self, more_than: int = 1) -> dict[str, int]:
+        """Shapes issued more than 'more_than' times, most repeated first."""
+        hits = [(shape, n) for shape, n in self.by_shape.items() if n > more_than]
+        return dict(sorted(hits, key=lambda item: item[1], reverse=True))
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.by_shape.values(), default=0)
+
+    def report(self, limit: int = 10) -> str:
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f} ms"]
+        for shape, n in sorted(self.by_shape.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            lines.append(f"  {n:>5} x {shape[:300]}")
+        return '\n'.join(lines)
+
+# Every QueryStats being collected in this context, outermost first: a query counts
+# towards all of them (a test's budget inside a tracked request, nested budgets).
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar('query_stats', default=())
+_listeners: list = []
+_tx_listeners: list = []
+
+
+class track_queries:
+    """
+    with track_queries() as stats: ...
+    Counts queries issued by this task and the tasks it starts while the block runs,
+    also into any track_queries() blocks around it. Pass 'stats' to keep adding to
+    an existing QueryStats.
+    """
+
+    def __init__(self, stats: QueryStats | None = None):
+        self.stats = stats if stats is not None else QueryStats()
+
+    def __enter__(self) -> QueryStats:
+        self._token = _active.set(_active.get() + (self.stats,))
+        return self.stats
+
+    def __exit__(self, *exc):
+        _active.reset(self._token)
+
+
+def add_listener(listener):
+    """listener(model: str, method: str, seconds: float, failed: bool, arguments: dict | None)"""
+    _listeners.append(listener)
+
+def add_transaction_listener(listener):
+    """listener(seconds: float, committed: bool)"""
+    _tx_listeners.append(listener)
+
+def record(model: str, method: str, seconds: float, failed: bool = False, arguments: dict | None = None):
+    active = _active.get()
+    if active:
+        operation, shape = f"{model}.{method}", query_shape(model, method, arguments)
+        for stats in active:
+            stats.record(operation, seconds, shape)
+    for listener in _listeners:
+        listener(model, method, seconds, failed, arguments)
+
+class _TimedTransaction:
+    """Wraps the manager returned by Prisma.tx() to time the 'async with' block."""
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    async def __aenter__(self):
+        self._started = time.perf_counter()
+        return await self._manager.__aenter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            return await self._manager.__aexit__(exc_type, exc, tb)
+        finally:
+            seconds = time.perf_counter() - self._started
+            for listener in _tx_listeners:
+                listener(seconds, exc_type is None)
+
+    def __getattr__(self, name): # start() / commit() / rollback() for manual use
+        return getattr(self._manager, name)
+
+def _install_tx():
+    original = Prisma.tx
+
+    def tx(self, *args, **kwargs):
+        return _TimedTransaction(original(self, *args, **kwargs))
+
+    tx.__instrumented__ = True
+    tx.__wrapped__ = original
+    Prisma.tx = tx
+
+def install():
+    """Idempotent."""
+    if not getattr(Prisma.tx, '__instrumented__', False):
+        _install_tx()
+    if getattr(Prisma._execute, '__instrumented__', False):
+        return
+    original = Prisma._execute
+
+    async def _execute(self, *args, **kwargs):
+        model = kwargs.get('model')
+        method = kwargs.get('method', 'unknown')
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await original(self, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            record(
+                model.__name__ if model is not None else 'raw',
+                method,
+                time.perf_counter() - started,
+                failed,
+                kwargs.get('arguments'),
+            )
+
+    _execute.__instrumented__ = True
+    _execute.__wrapped__ = original
+    Prisma._execute = _execute
+
+
+class QueryTrackingMiddleware:
+    """
+    Pure ASGI middleware: tracks each request's queries and logs the ones that
+    repeat a shape more than REPEAT_WARN_THRESHOLD times. No-op when the threshold is 0.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not REPEAT_WARN_THRESHOLD:
+            return await self.app(scope, receive, send)
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send)
+
+        repeated = stats.repeated(REPEAT_WARN_THRESHOLD)
+        if repeated:
+            print(f"⚠️ [Queries] {scope['method']} {scope['path']}: {stats.count} queries, repeated shapes:")
+            for shape, n in repeated.items():
+                print(f"   {n:>5} x {shape[:300]}")
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import asyncpg
+from app.db import instrumentation
+
+# Direct asyncpg access, sharing DATABASE_URL with Prisma (minus Prisma-only parameters).
+# - connect(): one-off connections for bulk paths Prisma can't express (COPY, temp tables).
+# - pool: optional fast read path for the hottest list endpoints. asyncpg prepares and
+#   caches every statement per connection, and rows skip the query engine's JSON hop.
+#   Enabled per endpoint with FAST_READ_ENDPOINTS, e.g. "inventory,products,dashboard,orders" or "all".
+
+FAST_READ_CHOICES = {'inventory', 'products', 'dashboard', 'orders'}
+
+def _fast_read_endpoints(value: str) -> set[str]:
+    names = {n.strip().lower() for n in value.split(',') if n.strip()}
+    return set(FAST_READ_CHOICES) if 'all' in names else names & FAST_READ_CHOICES
+
+FAST_READ_ENDPOINTS = _fast_read_endpoints(os.getenv("FAST_READ_ENDPOINTS", ""))
+POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+
+pool: asyncpg.Pool | None = None
+
+_PRISMA_ONLY_PARAMS = {
+    'schema', 'connection_limit', 'pool_timeout', 'connect_timeout', 'socket_timeout',
+    'pgbouncer', 'statement_cache_size', 'sslcert', 'sslidentity', 'sslpassword', 'sslaccept',
+}
+
+def database_url() -> str:
+    """DATABASE_URL from the environment, else from prisma/.env (app.config), like Prisma itself."""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
+    from app.config import settings # Reads prisma/.env; only imported when the variable isn't exported
+    return settings.DATABASE_URL
+
+def asyncpg_dsn(url: str | None = None) -> str:
+    """DATABASE_URL with the parameters asyncpg would reject stripped out."""
+    url = url or database_url()
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in _PRISMA_ONLY_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def _search_path(url: str | None = None) -> str | None:
+    url = url or database_url()
+    return dict(parse_qsl(urlsplit(url).query)).get('schema')
+
+async def connect() -> asyncpg.Connection:
+    """One-off connection (imports, scripts). Honours Prisma's ?schema= as the search_path."""
+    schema = _search_path()
+    return await asyncpg.connect(
+        asyncpg_dsn(),
+        server_settings={'search_path': schema} if schema else None
+    )
+
+async def _init_connection(conn: asyncpg.Connection):
+    for json_type in ('json', 'jsonb'):
+        await conn.set_type_codec(json_type, encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+
+async def open_pool(force: bool = False):
+    """Opens the shared pool if any endpoint uses fast reads (or 'force', e.g. benchmarks)."""
+    global pool
+    if pool is not None or not (FAST_READ_ENDPOINTS or force):
+        return
+    schema = _search_path()
+    pool = await asyncpg.create_pool(
+        asyncpg_dsn(),
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        init=_init_connection,
+        server_settings={'search_path': schema} if schema else None
+    )
+    print(f"⚡ [Postgres] Fast read pool open for: {', '.join(sorted(FAST_READ_ENDPOINTS)) or '-'}")
+
+async def close_pool():
+    global pool
+    if pool is not None:
+        await pool.close()
+        pool = None
+
+def fast_reads(endpoint: str) -> bool:
+    return pool is not None and endpoint in FAST_READ_ENDPOINTS
+
+async def _timed(method: str, sql: str, *args):
+    started = time.perf_counter()
+    failed = True
+    try:
+        result = await getattr(pool, method)(sql, *args)
+        failed = False
+        return result
+    finally:
+        instrumentation.record('asyncpg', method, time.perf_counter() - started, failed, {'query': sql})
+
+async def fetch(sql: str, *args) -> list[dict]:
+    """Rows as plain dicts, ready for the response models."""
+    return [dict(row) for row in await _timed('fetch', sql, *args)]
+
+async def fetchrow(sql: str, *args) -> dict | None:
+    row = await _timed('fetchrow', sql, *args)
+    return dict(row) if row is not None else None
@@ -1,11 +1,7 @@
+import argparse
 import asyncio
-import csv
-import os
 from pathlib import Path
-from prisma import Prisma
-
-# Initialize Prisma client
-db = Prisma(auto_register=True)
+from app.db.catalog_import import import_catalog
 
 CSV_FILENAME = "shopify-all-rak-products.csv"
 
@@ -142,73 +138,8 @@ CURRENT_INVENTORY = {
     "110035": 5
 }
 
-def fix_encoding_artifacts(text: str) -> str:
-    """Fix common UTF-8 decoding artifacts found in Shopify exports."""
-    replacements = {
-        "¬Æ": "®",
-        "Ôºå": ", ", # Weird wide comma
-        "‚Äì": "-",  # En dash
-        "‚Äî": "-",  # Em dash
-        "‚Äô": "'",  # Smart quote
-    }
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
-    return text
-
-def clean_title(raw_title: str) -> str:
-    """
-    Keep text before the 2nd pipe '|'.
-    Example: "A | B | C" -> "A | B"
-    """
-    # [CHANGED] Apply artifact cleaning
-    clean = fix_encoding_artifacts(raw_title)
-    parts = [p.strip() for p in clean.split('|')]
-    return " | ".join(parts[:2])
-
-def format_product_name(row: dict) -> str:
-    """
-    Format: "Base Title | OptionValue1 | OptionValue2"
-    """
-    # 1. Base Title
-    base_title = clean_title(row.get('Title', ''))
-    final_name_parts = [base_title]
-
-    # 2. Iterate through Option 1, 2, 3
-    for i in range(1, 4):
-        opt_name = row.get(f'Option{i} Name')
-        opt_val = row.get(f'Option{i} Value')
-
-        if opt_name and opt_val and opt_name != 'Title' and opt_val != 'Default Title':
-            # [CHANGED] Clean artifacts in values too (e.g. 900MHz...)
-            clean_val = fix_encoding_artifacts(opt_val)
-            final_name_parts.append(clean_val)
-
-    return " | ".join(final_name_parts)
-
-async def update_stock_quantities(db: Prisma):
-    print("\n--- 📦 Updating Stock Quantities ---")
-    updated_count = 0
-    not_found_count = 0
-
-    for sku, qty in CURRENT_INVENTORY.items():
-        # Find product by SKU
-        product = await db.product.find_unique(where={'sku': sku})
-        
-        if product:
-            await db.product.update(
-                where={'id': product.id},
-                data={'quantityInStock': qty}
-            )
-            updated_count += 1
-        else:
-            print(f"   ⚠️ SKU {sku} not found in catalog!")
-            not_found_count += 1
-            
-    print(f"✅ Stock Update Complete: {updated_count} updated, {not_found_count} not found.")
-
-async def main() -> None:
-    print("--- 🚀 Starting Hard Reset Import ---")
-    await db.connect()
+async def main(reset_stock: bool = False) -> None:
+    print("--- 🚀 Starting Catalog Import ---")
 
     # 1. LOCATE CSV
     base_dir = Path(__file__).parent.parent.parent 
@@ -216,64 +147,30 @@ async def main() -> None:
 
     if not csv_path.exists():
         print(f"❌ ERROR: Could not find {CSV_FILENAME}")
-        await db.disconnect()
         return
 
-    # 2. CLEAR OLD DATA
-    print("🗑️  Clearing old database entries...")
-    await db.orderlineitem.delete_many()
-    await db.shipmentrequest.delete_many()
-    deleted_count = await db.product.delete_many()
-    print(f"   Deleted {deleted_count} old products.")
-
-    # 3. PARSE CSV
-    processed_skus = set()
-    products_to_create = []
-
-    print(f"📄 Reading {csv_path}...")
-
+    # 2. UPSERT CATALOG + STOCK (orders and shipments are left alone).
+    #    CURRENT_INVENTORY only seeds new products unless --reset-stock is given.
+    print(f"📄 Importing {csv_path}...")
     try:
-        with open(csv_path, mode='r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            
-            for row in reader:
-                raw_sku = row.get('SKU', '').strip()
-
-                if not raw_sku: continue 
-                if raw_sku in processed_skus: continue 
-                
-                processed_skus.add(raw_sku)
-
-                full_name = format_product_name(row)
-
-                products_to_create.append({
-                    'sku': raw_sku,
-                    'name': full_name,
-                    'quantityInStock': 0,
-                })
-
-        print(f"📦 Found {len(products_to_create)} unique valid products.")
-
-        # 4. INSERT NEW DATA
-        if products_to_create:
-            print("💾 Writing to database...")
-            count = await db.product.create_many(
-                data=products_to_create,
-                skip_duplicates=True 
-            )
-            print(f"✅ Successfully seeded {count} products with 0 stock.")
-            
-            # 5. UPDATE STOCK
-            await update_stock_quantities(db)
-            
-        else:
-            print("⚠️ No valid products found to import.")
-
+        result = await import_catalog(csv_path, stock=CURRENT_INVENTORY, overwrite_stock=reset_stock)
     except Exception as e:
         print(f"❌ Critical Error: {e}")
+        return
 
-    await db.disconnect()
-    print("--- 🌱 Process Complete ---")
+    print(f"📦 {result['staged']} unique products: {result['inserted']} new, "
+          f"{result['updated']} changed, {result['unchanged']} unchanged.")
+    for sku in result['stock_missing']:
+        print(f"   ⚠️ SKU {sku} not found in catalog!")
+    print(f"✅ Stock Update Complete: {result['stock_updated']} updated, "
+          f"{result['stock_kept']} existing kept, {len(result['stock_missing'])} not found.")
+    print(f"--- 🌱 Process Complete in {result['seconds']}s ---")
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import the product catalog and seed stock levels.")
+    parser.add_argument(
+        '--reset-stock', action='store_true',
+        help="Overwrite live stock of existing products with CURRENT_INVENTORY"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(reset_stock=args.reset_stock))
@@ -1,33 +1,57 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 # Import your sync function
 from app.services.amazon_sync import sync_amazon_orders
 
 # Import the router (aliased correctly)
 from app.api.router import api_router as router 
+from app.api.dashboard.service import check_counters
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.db import pg
+from app.db.instrumentation import QueryTrackingMiddleware
 from app.db.session import db_client
+from app.services.catalog_cache import catalog_cache
+from app.services.events import event_broker
+from app.services import metrics
+from app.services.notifications import notification_dispatcher
+from app.services.scheduler import job_scheduler
 
 # --- LIFESPAN MANAGER ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 1. Start Database
+    # 1. Start Database (query/transaction metrics hook into the client first)
+    metrics.install()
     await db_client.connect()
+    await pg.open_pool() # Only when FAST_READ_ENDPOINTS is set
+    await check_counters(db_client) # Read-only: the counters are switched per database, not per worker
+
+    # 2. Warm the in-memory product catalog (autocomplete, SKU lookups)
+    await catalog_cache.warm(db_client)
+    catalog_cache.start_refresher(db_client)
+
+    # 3. Drain queued WhatsApp alerts in the background
+    await notification_dispatcher.start(db_client)
+
+    # 3b. One LISTEN connection feeding every /api/events stream on this worker
+    event_broker.start()
+    metrics.lag_monitor.start()
     
-    # 2. Start Scheduler
-    scheduler = AsyncIOScheduler()
-    scheduler.add_job(sync_amazon_orders, 'date')           # Run once now
-    scheduler.add_job(sync_amazon_orders, 'interval', minutes=10) # Run every 10 mins
-    scheduler.start()
-    print("⏰ [Scheduler] Amazon Sync started (Runs every 10 mins)")
+    # 4. Start Scheduler (every worker schedules, one worker per run wins the advisory lock)
+    job_scheduler.add_job('amazon_sync', sync_amazon_orders, minutes=10, run_at_startup=True)
+    job_scheduler.start()
     
     yield
     
-    # 3. Shutdown
+    # 5. Shutdown
     print("🛑 [Scheduler] Shutting down...")
-    scheduler.shutdown()
+    await job_scheduler.stop()
+    await catalog_cache.stop_refresher()
+    await notification_dispatcher.stop()
+    await event_broker.stop()
+    await metrics.lag_monitor.stop()
+    await pg.close_pool()
     await db_client.disconnect()
 
 # --- APP INITIALIZATION ---
@@ -39,10 +63,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+app.add_middleware(QueryTrackingMiddleware) # Only active with QUERY_TRACKING_REPEATS
+app.add_middleware(metrics.MetricsMiddleware)
+
 # --- FIX IS HERE: No prefix needed (router.py already has it) ---
 app.include_router(router)
+app.add_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
 
 @app.get("/")
 def read_root():
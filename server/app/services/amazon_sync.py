@@ -1,90 +1,117 @@
 print("🚀 SCRIPT STARTING... (If you see this, the file is running)")
 
+import json
 import os
+import time
 import datetime
 import asyncio
-from dotenv import load_dotenv
-from sp_api.api import Orders
-from sp_api.base import Marketplaces
 from app.api.orders.schemas import OrderCreate, OrderLineItemCreate
 from app.api.orders import service as orders_service
 from app.db.session import db_client
+from app.services.catalog_cache import catalog_cache
+from app.services.sp_api_client import MARKETPLACES, OrdersGateway, get_orders_gateway
 from prisma.enums import OrderSource
+from prisma.errors import UniqueViolationError
 
-load_dotenv()
+# First run for a marketplace (no watermark yet) looks back this far.
+INITIAL_LOOKBACK = datetime.timedelta(days=int(os.getenv("AMAZON_SYNC_LOOKBACK_DAYS", "7")))
 
-# Configuration from .env
-credentials = {
-    "refresh_token": os.getenv("AMAZON_REFRESH_TOKEN"),
-    "lwa_app_id": os.getenv("AMAZON_CLIENT_ID"),
-    "lwa_client_secret": os.getenv("AMAZON_CLIENT_SECRET"),
-    "aws_access_key": os.getenv("AWS_ACCESS_KEY"),
-    "aws_secret_key": os.getenv("AWS_SECRET_KEY"),
-    "role_arn": os.getenv("AWS_ROLE_ARN"),
-}
+# Each run re-reads a small overlap; re-seen orders are skipped by the externalOrderId check.
+WATERMARK_OVERLAP = datetime.timedelta(minutes=5)
 
-async def sync_amazon_orders():
-    print("🔄 [Amazon Sync] Connecting to Database...")
-    
-    if not db_client.is_connected():
-        await db_client.connect()
+# Orders that fail to import are retried on every run for this long, then left in
+# amazon_sync_retries (with the last reason) for someone to look at.
+RETRY_DAYS = int(os.getenv("AMAZON_SYNC_RETRY_DAYS", "7"))
+RETRY_BATCH = 100
+
+DUE_RETRIES_SQL = '''
+SELECT "order"
+FROM amazon_sync_retries
+WHERE marketplace = $1 AND first_failed_at > timezone('utc', now()) - make_interval(days => $2)
+ORDER BY last_attempt_at -- Round robin when more than RETRY_BATCH are queued
+LIMIT $3
+'''
+
+RECORD_RETRIES_SQL = '''
+INSERT INTO amazon_sync_retries (marketplace, amazon_order_id, "order", reason, first_failed_at, last_attempt_at)
+SELECT $1, f.id, f.summary::jsonb, f.reason, timezone('utc', now()), timezone('utc', now())
+FROM unnest($2::text[], $3::text[], $4::text[]) AS f(id, summary, reason)
+ON CONFLICT (marketplace, amazon_order_id) DO UPDATE
+SET "order" = EXCLUDED."order",
+    reason = EXCLUDED.reason,
+    attempts = amazon_sync_retries.attempts + 1,
+    last_attempt_at = timezone('utc', now())
+'''
 
+CLEAR_RETRIES_SQL = '''
+DELETE FROM amazon_sync_retries
+WHERE marketplace = $1 AND amazon_order_id = ANY($2::text[])
+'''
+
+# Allow PENDING and UNSHIPPED (Catches everything)
+ORDER_STATUSES = ["Unshipped", "PartiallyShipped", "Pending"]
+
+def _iso_utc(value: datetime.datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+async def _fetch_items(gateway: OrdersGateway, amz_order_id: str):
     try:
-        print("🔌 [Amazon Sync] Connecting to Amazon API...")
-        orders_client = Orders(credentials=credentials, marketplace=Marketplaces.IN)
-        
-        # 1. Look back 7 DAYS (to be safe)
-        last_week = (datetime.datetime.now() - datetime.timedelta(days=7)).isoformat()
-        
-        # 2. Allow PENDING and UNSHIPPED (Catches everything)
-        print(f"   🔎 Searching orders created after: {last_week[:10]}...")
-        res = orders_client.get_orders(
-            CreatedAfter=last_week, 
-            OrderStatuses=["Unshipped", "PartiallyShipped", "Pending"]
-        )
-        amazon_orders = res.payload.get("Orders", [])
-        
+        payload = await gateway.get_order_items(amz_order_id)
+        return amz_order_id, payload.get("OrderItems", [])
     except Exception as e:
-        print(f"❌ [Amazon Sync] Connection Failed: {str(e)}")
-        return
+        print(f"      ⚠️ [{gateway.marketplace}] Failed to fetch items for {amz_order_id}: {e}")
+        return amz_order_id, None
 
-    if not amazon_orders:
-        print("✅ [Amazon Sync] Connection Successful, but NO new orders found.")
-        return
+async def _import_page(gateway: OrdersGateway, amazon_orders: list[dict]) -> tuple[int, list[str], dict[str, str]]:
+    """
+    Imports one getOrders page (or a batch of retries).
+    Returns (imported, done, failures): 'done' are the ids now in the DB (imported
+    by this or an earlier run), 'failures' maps the rest to the reason.
+    """
 
-    print(f"📦 [Amazon Sync] Found {len(amazon_orders)} active orders.")
-    new_count = 0
+    # 1. Check Duplicates (one indexed IN query for the whole page)
+    amz_order_ids = [o["AmazonOrderId"] for o in amazon_orders]
+    existing = await db_client.order.find_many(
+        where={
+            'externalSource': OrderSource.Amazon,
+            'externalOrderId': {'in': amz_order_ids}
+        }
+    )
+    already_imported = {o.externalOrderId for o in existing}
+    done = list(already_imported)
+    failures: dict[str, str] = {}
+    new_orders = [o for o in amazon_orders if o["AmazonOrderId"] not in already_imported]
+    if not new_orders:
+        return 0, done, failures
 
-    for amz_order in amazon_orders:
-        amz_order_id = amz_order["AmazonOrderId"]
-        buyer_name = amz_order.get("BuyerInfo", {}).get("BuyerName", "Amazon Customer")
-        status = amz_order["OrderStatus"]
-        
-        # 3. Check Duplicate
-        customer_str = f"{buyer_name} (Amz: {amz_order_id})"
-        existing = await db_client.order.find_first(where={'customerName': customer_str})
-        
-        if existing:
-            # print(f"   ℹ️ Skipping {amz_order_id} (Already Imported)")
-            continue
+    # 2. Fetch Items concurrently (the rate limiter paces the actual calls)
+    for amz_order in new_orders:
+        print(f"   ✨ NEW ORDER FOUND: {amz_order['AmazonOrderId']} [{amz_order['OrderStatus']}]")
+    fetched = await asyncio.gather(*(_fetch_items(gateway, o["AmazonOrderId"]) for o in new_orders))
+    items_by_order = {order_id: items for order_id, items in fetched if items is not None}
 
-        print(f"   ✨ NEW ORDER FOUND: {amz_order_id} [{status}]")
+    # 3. Resolve every SKU on the page at once (catalog cache + one query for misses)
+    all_skus = {item.get("SellerSKU") for items in items_by_order.values() for item in items}
+    products_by_sku = await catalog_cache.resolve_skus(db_client, all_skus)
 
-        # 4. Fetch Items
-        try:
-            items_res = orders_client.get_order_items(order_id=amz_order_id)
-            amz_items = items_res.payload.get("OrderItems", [])
-        except Exception as e:
-            print(f"      ⚠️ Failed to fetch items: {e}")
+    imported = 0
+    for amz_order in new_orders:
+        amz_order_id = amz_order["AmazonOrderId"]
+        if amz_order_id not in items_by_order:
+            failures[amz_order_id] = "Failed to fetch order items"
             continue
 
+        buyer_name = amz_order.get("BuyerInfo", {}).get("BuyerName", "Amazon Customer")
+        customer_str = f"{buyer_name} (Amz: {amz_order_id})"
         line_items = []
         
-        for item in amz_items:
+        for item in items_by_order[amz_order_id]:
             seller_sku = item.get("SellerSKU")
             qty = item.get("QuantityOrdered")
             
-            product = await db_client.product.find_unique(where={'sku': seller_sku})
+            product = products_by_sku.get(seller_sku)
             
             if product:
                 line_items.append(OrderLineItemCreate(
@@ -92,35 +119,179 @@ async def sync_amazon_orders():
                     quantity=qty
                 ))
             else:
-                print(f"      ❌ SKU '{seller_sku}' not found in DB! Skipping Order.")
+                print(f"      ❌ SKU '{seller_sku}' not found in DB! Skipping Order {amz_order_id} (will retry).")
+                failures[amz_order_id] = f"SKU '{seller_sku}' not found"
                 line_items = [] 
                 break
 
         if not line_items:
+            failures.setdefault(amz_order_id, "Order has no items")
             continue
 
-        # 5. Create Order & Send WhatsApp
+        # 4. Create Order & Queue WhatsApp Alert
         try:
-            payload = OrderCreate(
+            order_payload = OrderCreate(
                 customer_name=customer_str,
                 source=OrderSource.Amazon,
                 line_items=line_items
             )
             
-            print(f"      📝 Saving to Database...")
-            await orders_service.create(db_client, payload)
+            print(f"      📝 Saving {amz_order_id} to Database...")
+            await orders_service.create(
+                db_client,
+                order_payload,
+                external_order_id=amz_order_id,
+                external_source=OrderSource.Amazon
+            )
             
-            new_count += 1
-            print(f"      ✅ SUCCESS! Notification Sent.")
+            imported += 1
+            done.append(amz_order_id)
+            print(f"      ✅ SUCCESS! Notification Queued.")
 
+        except UniqueViolationError:
+            done.append(amz_order_id)
+            print(f"      ℹ️ {amz_order_id} was imported by another run. Skipping.")
         except Exception as e:
-            print(f"      ❌ Failed to save order: {e}")
+            failures[amz_order_id] = f"Failed to save: {e}"
+            print(f"      ❌ Failed to save order {amz_order_id}: {e}")
+
+    return imported, done, failures
+
+async def _due_retries(marketplace: str, skip: set[str]) -> list[dict]:
+    rows = await db_client.query_raw(DUE_RETRIES_SQL, marketplace, RETRY_DAYS, RETRY_BATCH)
+    orders = [row['order'] if isinstance(row['order'], dict) else json.loads(row['order']) for row in rows]
+    return [o for o in orders if o["AmazonOrderId"] not in skip]
+
+async def _settle_retries(marketplace: str, summaries: dict[str, dict], done: set[str], failures: dict[str, str]):
+    """Queues (or bumps) every failed order and clears the ones that are now imported."""
+    ids = [i for i in failures if i not in done]
+    if ids:
+        await db_client.execute_raw(
+            RECORD_RETRIES_SQL,
+            marketplace,
+            ids,
+            [json.dumps(summaries[i]) for i in ids],
+            [failures[i] for i in ids]
+        )
+    if done:
+        await db_client.execute_raw(CLEAR_RETRIES_SQL, marketplace, list(done))
+
+async def _sync_marketplace(marketplace: str) -> dict:
+    """
+    Imports orders updated since the stored watermark, following NextToken pages,
+    then retries orders earlier runs could not import.
+    Returns {'imported', 'queued', 'error'}: 'error' is set only when the listing or an
+    API call broke off; orders that failed to import are counted in 'queued'.
+    """
+    started = time.monotonic()
+    run_at = datetime.datetime.now(datetime.timezone.utc)
+
+    state = await db_client.amazonsyncstate.find_unique(where={'marketplace': marketplace})
+    since = state.lastUpdatedAfter if state and state.lastUpdatedAfter else run_at - INITIAL_LOOKBACK
+
+    pages = fetched = imported = retried = 0
+    summaries: dict[str, dict] = {}
+    done: set[str] = set()
+    failures: dict[str, str] = {}
+    error = None
+    gateway = None
+    try:
+        gateway = get_orders_gateway(marketplace) # Unknown marketplace names fail here, for this marketplace only
+        print(f"🔌 [Amazon Sync] [{marketplace}] Fetching orders updated after: {_iso_utc(since)}...")
+        params = {'LastUpdatedAfter': _iso_utc(since), 'OrderStatuses': ORDER_STATUSES}
+        while True:
+            payload = await gateway.get_orders(**params)
+            pages += 1
+
+            amazon_orders = payload.get("Orders", [])
+            fetched += len(amazon_orders)
+            if amazon_orders:
+                summaries.update((o["AmazonOrderId"], o) for o in amazon_orders)
+                page_imported, page_done, page_failures = await _import_page(gateway, amazon_orders)
+                imported += page_imported
+                done.update(page_done)
+                failures.update(page_failures)
+
+            next_token = payload.get("NextToken")
+            if not next_token:
+                break
+            params = {'NextToken': next_token}
+
+        # Orders earlier runs couldn't import (and this run didn't see again)
+        due = await _due_retries(marketplace, skip=set(summaries))
+        if due:
+            retried = len(due)
+            print(f"🔁 [Amazon Sync] [{marketplace}] Retrying {retried} orders from earlier runs...")
+            summaries.update((o["AmazonOrderId"], o) for o in due)
+            retry_imported, retry_done, retry_failures = await _import_page(gateway, due)
+            imported += retry_imported
+            done.update(retry_done)
+            failures.update(retry_failures)
+
+    except Exception as e:
+        error = str(e)
+        print(f"❌ [Amazon Sync] [{marketplace}] Sync Failed on page {pages + 1}: {error}")
+    finally:
+        if gateway is not None:
+            await gateway.aclose()
+
+    await _settle_retries(marketplace, summaries, done, failures)
+
+    # Failed orders are in the retry queue, so a complete listing always moves the
+    # watermark. Only a listing that broke off keeps it (unseen pages can't be queued).
+    watermark = run_at - WATERMARK_OVERLAP if error is None else since
+
+    stats = {
+        'lastUpdatedAfter': watermark,
+        'lastRunAt': run_at,
+        'lastDurationMs': int((time.monotonic() - started) * 1000),
+        'lastPages': pages,
+        'lastFetched': fetched,
+        'lastImported': imported,
+        'lastError': error,
+    }
+    await db_client.amazonsyncstate.upsert(
+        where={'marketplace': marketplace},
+        data={
+            'create': {'marketplace': marketplace, **stats},
+            'update': stats,
+        }
+    )
+
+    print(
+        f"📊 [Amazon Sync] [{marketplace}] {pages} pages, {fetched} orders seen, {retried} retried, "
+        f"{imported} imported, {len(failures)} queued for retry in {stats['lastDurationMs']} ms."
+    )
+    return {'imported': imported, 'queued': len(failures), 'error': error}
+
+async def sync_amazon_orders():
+    """
+    Syncs every marketplace. Each one saves its state even if another fails; a listing
+    or API failure is raised afterwards so the scheduler records the run as FAILED.
+    Orders queued for retry (e.g. an unknown SKU) are only reported.
+    """
+    print("🔄 [Amazon Sync] Connecting to Database...")
+    
+    if not db_client.is_connected():
+        await db_client.connect()
+
+    # Marketplaces are synced side by side; SP-API calls never block the event loop.
+    results = await asyncio.gather(*(_sync_marketplace(m) for m in MARKETPLACES))
+    new_count = sum(r['imported'] for r in results)
 
     if new_count > 0:
         print(f"🏁 [Amazon Sync] Finished. Imported {new_count} orders.")
     else:
         print("🏁 [Amazon Sync] Finished. No new orders to import.")
 
+    queued = sum(r['queued'] for r in results)
+    if queued:
+        print(f"⚠️ [Amazon Sync] {queued} orders could not be imported and are queued for retry.")
+
+    errors = [f"{m}: {r['error']}" for m, r in zip(MARKETPLACES, results) if r['error']]
+    if errors:
+        raise RuntimeError("Amazon sync failed for " + "; ".join(errors))
+
 # --- MAKE SURE YOU COPY THIS PART ---
 if __name__ == "__main__":
-    asyncio.run(sync_amazon_orders())
\ No newline at end of file
+    asyncio.run(sync_amazon_orders())
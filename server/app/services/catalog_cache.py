@@ -0,0 +1,270 @@
+import asyncio
+import bisect
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from prisma import Prisma
+from prisma.models import Product
+
+# How often each worker checks Postgres for catalog changes made elsewhere
+# (other workers, the seed import, manual SQL).
+REFRESH_SECONDS = float(os.getenv("CATALOG_CACHE_REFRESH_SECONDS", "30"))
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+def _tokens(text: str) -> set[str]:
+    return set(_TOKEN_RE.findall(text.lower()))
+
+def _product_tokens(product: Product) -> set[str]:
+    return _tokens(product.name) | _tokens(product.sku)
+
+
+class CatalogCache:
+    """
+    Process-local copy of the Product catalog.
+    - Hash maps by id and SKU for point lookups.
+    - Sorted token list + token -> ids map for prefix autocomplete.
+    """
+
+    def __init__(self):
+        self._by_id: dict[str, Product] = {}
+        self._by_sku: dict[str, Product] = {}
+        self._token_ids: dict[str, set[str]] = {}
+        self._sorted_tokens: list[str] = []
+        self._watermark: datetime | None = None
+        self._lock = asyncio.Lock()
+        self._refresher: asyncio.Task | None = None
+        self.ready = False
+        self.loaded_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+
+    # --- INDEX MAINTENANCE ---
+
+    def _index(self, product: Product):
+        for token in _product_tokens(product):
+            ids = self._token_ids.get(token)
+            if ids is None:
+                self._token_ids[token] = ids = set()
+                bisect.insort(self._sorted_tokens, token)
+            ids.add(product.id)
+
+    def _unindex(self, product: Product):
+        for token in _product_tokens(product):
+            ids = self._token_ids.get(token)
+            if ids is None:
+                continue
+            ids.discard(product.id)
+            if not ids:
+                del self._token_ids[token]
+                pos = bisect.bisect_left(self._sorted_tokens, token)
+                if pos < len(self._sorted_tokens) and self._sorted_tokens[pos] == token:
+                    self._sorted_tokens.pop(pos)
+
+    def _clear(self):
+        self._by_id.clear()
+        self._by_sku.clear()
+        self._token_ids.clear()
+        self._sorted_tokens.clear()
+        self._watermark = None
+
+    def put(self, product: Product):
+        """Insert or replace a single product (re-indexes if Name/SKU changed)."""
+        old = self._by_id.get(product.id)
+        if old is not None:
+            if old.sku != product.sku:
+                self._by_sku.pop(old.sku, None)
+            if old.name != product.name or old.sku != product.sku:
+                self._unindex(old)
+                self._index(product)
+        else:
+            self._index(product)
+
+        self._by_id[product.id] = product
+        self._by_sku[product.sku] = product
+        if self._watermark is None or product.updatedAt > self._watermark:
+            self._watermark = product.updatedAt
+
+    def put_many(self, products: list[Product]):
+        for product in products:
+            self.put(product)
+
+    def patch_stock(self, quantities: dict[str, int]):
+        """Apply new stock levels ({product_id: quantity}) after a committed write."""
+        for product_id, quantity in quantities.items():
+            product = self._by_id.get(product_id)
+            if product is not None:
+                product.quantityInStock = quantity
+
+    def reset_stock(self):
+        for product in self._by_id.values():
+            product.quantityInStock = 0
+
+    # --- LOADING ---
+
+    async def warm(self, db: Prisma):
+        """Full (re)load of the catalog."""
+        async with self._lock:
+            products = await db.product.find_many()
+            self._clear()
+            self.put_many(products)
+            self.ready = True
+            self.loaded_at = time.time()
+        print(f"📚 [Catalog Cache] Loaded {len(products)} products.")
+
+    async def refresh(self, db: Prisma):
+        """
+        Cheap freshness check: pull rows touched since the last seen 'updatedAt'.
+        A row count mismatch means deletes (e.g. the seed import), so reload fully.
+        """
+        if not self.ready:
+            return await self.warm(db)
+
+        total = await db.product.count()
+        if total != len(self._by_id):
+            return await self.warm(db)
+
+        async with self._lock:
+            changed = await db.product.find_many(
+                where={'updatedAt': {'gt': self._watermark}} if self._watermark else None
+            )
+            self.put_many(changed)
+
+    async def _refresh_loop(self, db: Prisma):
+        while True:
+            await asyncio.sleep(REFRESH_SECONDS)
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                print(f"⚠️ [Catalog Cache] Refresh failed: {e}")
+
+    def start_refresher(self, db: Prisma):
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop(db))
+
+    async def stop_refresher(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    # --- LOOKUPS ---
+
+    async def get_by_id(self, db: Prisma, product_id: str) -> Product | None:
+        product = self._by_id.get(product_id)
+        if product is not None:
+            self.hits += 1
+            return product
+
+        self.misses += 1
+        product = await db.product.find_unique(where={'id': product_id})
+        if product is not None:
+            self.put(product)
+        return product
+
+    async def get_by_sku(self, db: Prisma, sku: str) -> Product | None:
+        product = self._by_sku.get(sku)
+        if product is not None:
+            self.hits += 1
+            return product
+
+        self.misses += 1
+        product = await db.product.find_unique(where={'sku': sku})
+        if product is not None:
+            self.put(product)
+        return product
+
+    async def resolve_skus(self, db: Prisma, skus) -> dict[str, Product]:
+        """
+        Maps SKUs to products. Cache hits are free; all misses are fetched in ONE query.
+        Unknown SKUs are simply absent from the result.
+        """
+        found: dict[str, Product] = {}
+        missing = []
+        for sku in set(skus):
+            product = self._by_sku.get(sku)
+            if product is not None:
+                self.hits += 1
+                found[sku] = product
+            else:
+                self.misses += 1
+                missing.append(sku)
+
+        if missing:
+            for product in await db.product.find_many(where={'sku': {'in': missing}}):
+                self.put(product)
+                found[product.sku] = product
+        return found
+
+    def _ids_for_prefix(self, prefix: str) -> set[str]:
+        ids: set[str] = set()
+        tokens = self._sorted_tokens
+        pos = bisect.bisect_left(tokens, prefix)
+        while pos < len(tokens) and tokens[pos].startswith(prefix):
+            ids |= self._token_ids[tokens[pos]]
+            pos += 1
+        return ids
+
+    def autocomplete(self, query: str, limit: int = 20) -> list[Product] | None:
+        """
+        Prefix match of every query word against Name/SKU words, answered from memory.
+        Returns None when the cache is not warm, so callers can fall back to SQL.
+        """
+        if not self.ready:
+            return None
+
+        words = _TOKEN_RE.findall(query.lower())
+        if not words:
+            return []
+
+        candidates: set[str] | None = None
+        for word in sorted(words, key=len, reverse=True): # Most selective first
+            ids = self._ids_for_prefix(word)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                self.misses += 1
+                return []
+
+        self.hits += 1
+        needle = query.strip().upper()
+        products = [self._by_id[pid] for pid in candidates]
+        products.sort(key=lambda p: (
+            p.sku.upper() != needle,
+            not p.sku.upper().startswith(needle),
+            p.name
+        ))
+        return products[:limit]
+
+    # --- STATS ---
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint of the cached rows and both indexes."""
+        size = sys.getsizeof(self._by_id) + sys.getsizeof(self._by_sku)
+        size += sys.getsizeof(self._token_ids) + sys.getsizeof(self._sorted_tokens)
+        for product in self._by_id.values():
+            size += sys.getsizeof(product) + sys.getsizeof(product.id)
+            size += sys.getsizeof(product.sku) + sys.getsizeof(product.name)
+        for token, ids in self._token_ids.items():
+            size += sys.getsizeof(token) + sys.getsizeof(ids)
+        return size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'ready': self.ready,
+            'products': len(self._by_id),
+            'tokens': len(self._sorted_tokens),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'memory_bytes': self.memory_bytes(),
+            'loaded_at': self.loaded_at,
+        }
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import asyncpg
+from app.db import pg
+from app.services.catalog_cache import catalog_cache
+
+# Fan-out of database change events to Server-Sent Events clients.
+# - ONE asyncpg connection per worker LISTENs on CHANNEL (see migrations
+#   20251211090000_change_events and 20251219090000_change_events_previous for the
+#   payloads), however many tabs are open.
+# - Each SSE client gets a bounded queue. A client that falls behind gets its
+#   queue replaced by a single 'resync' event (refetch everything) instead of
+#   holding memory; the same happens to everyone after a listener reconnect.
+# - Stock events also patch this worker's catalog cache, so writes made by other
+#   workers show up without waiting for the periodic refresh.
+
+CHANNEL = 'stockhub_events'
+QUEUE_SIZE = 256
+RECONNECT_SECONDS = 5
+
+RESYNC = {'type': 'resync'}
+
+
+class EventBroker:
+
+    def __init__(self):
+        self._conn: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: dict):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.dropped += queue.qsize()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    def _on_notify(self, conn, pid, channel, payload: str):
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            return
+        if event.get('type') == 'stock':
+            catalog_cache.patch_stock({product_id: qty for product_id, qty, _ in event['items']})
+        self.publish(event)
+
+    # --- LISTENER CONNECTION ---
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close()
+
+    async def _close(self):
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    async def _run(self):
+        lost = asyncio.Event()
+        first = True
+        while True:
+            try:
+                lost.clear()
+                self._conn = await pg.connect()
+                self._conn.add_termination_listener(lambda conn: lost.set())
+                await self._conn.add_listener(CHANNEL, self._on_notify)
+                print(f"📡 [Events] Listening on '{CHANNEL}'.")
+                if not first:
+                    self.publish(RESYNC) # Anything sent while we were away is lost
+                first = False
+                await lost.wait()
+                print("⚠️ [Events] Listener connection lost, reconnecting...")
+            except Exception as e: # Keep retrying: a dead listener would silently stop every stream
+                print(f"⚠️ [Events] Listener failed: {type(e).__name__}: {e}")
+            await self._close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+
+event_broker = EventBroker()
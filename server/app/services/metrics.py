@@ -0,0 +1,163 @@
+import asyncio
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+from app.db import instrumentation
+
+# Prometheus metrics, served at GET /metrics.
+# - HTTP: latency histogram per route template, in-flight gauge (pure ASGI middleware).
+# - Database: Prisma query count/duration by model and operation, db.tx() durations
+#   (hooks from app/db/instrumentation.py).
+# - Event loop lag, sampled by a background task.
+# - Scheduler: job duration and outcome (app/services/scheduler.py).
+# Under gunicorn set PROMETHEUS_MULTIPROC_DIR (an empty dir, wiped on deploy) so
+# /metrics aggregates all workers instead of whichever one answered, and start it with
+# gunicorn.conf.py (picked up from the working directory) so dead workers' live gauges
+# are dropped.
+
+LAG_INTERVAL_SECONDS = 0.5
+
+# Long-lived (SSE) or self-referential routes, not counted as requests
+UNTRACKED_PATHS = {"/metrics", "/api/events"}
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template.',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests being handled.', multiprocess_mode='livesum'
+)
+DB_QUERIES = Counter(
+    'db_queries_total', 'Database queries by model and operation.', ['model', 'operation', 'outcome']
+)
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'Database query latency by model and operation.',
+    ['model', 'operation'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_TRANSACTION_LATENCY = Histogram(
+    'db_transaction_duration_seconds', 'Duration of db.tx() blocks.', ['outcome'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+EVENT_LOOP_LAG = Gauge(
+    'event_loop_lag_seconds', 'How late the last lag probe woke up.', multiprocess_mode='max'
+)
+EVENT_LOOP_LAG_HIST = Histogram(
+    'event_loop_lag_distribution_seconds', 'Event loop lag samples.',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+JOB_RUNS = Counter(
+    'scheduler_job_runs_total', 'Scheduled job firings by outcome.', ['job', 'outcome']
+)
+JOB_LATENCY = Histogram(
+    'scheduler_job_duration_seconds', 'Duration of scheduled job runs.', ['job', 'outcome'],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+
+# --- HOOKS ---
+
+def _observe_query(model: str, method: str, seconds: float, failed: bool, arguments):
+    DB_QUERIES.labels(model, method, 'error' if failed else 'ok').inc()
+    DB_QUERY_LATENCY.labels(model, method).observe(seconds)
+
+def _observe_transaction(seconds: float, committed: bool):
+    DB_TRANSACTION_LATENCY.labels('commit' if committed else 'rollback').observe(seconds)
+
+def observe_job(job: str, outcome: str, seconds: float | None = None):
+    """outcome: succeeded, failed, skipped_locked or skipped_recent."""
+    JOB_RUNS.labels(job, outcome).inc()
+    if seconds is not None:
+        JOB_LATENCY.labels(job, outcome).observe(seconds)
+
+_installed = False
+
+def install():
+    """Hooks the database instrumentation into the metrics. Idempotent."""
+    global _installed
+    if _installed:
+        return
+    instrumentation.install()
+    instrumentation.add_listener(_observe_query)
+    instrumentation.add_transaction_listener(_observe_transaction)
+    _installed = True
+
+
+# --- HTTP ---
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no per-request task/stream overhead)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in UNTRACKED_PATHS:
+            return await self.app(scope, receive, send)
+
+        status = 500
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get('route')
+            # Route templates only ("/api/orders/{order_id}"), never raw paths: bounded label values
+            template = getattr(route, 'path', None) or 'unmatched'
+            REQUEST_LATENCY.labels(scope['method'], template, str(status)).observe(
+                time.perf_counter() - started
+            )
+
+def metrics_endpoint(request: Request) -> Response:
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+# --- EVENT LOOP LAG ---
+
+class LagMonitor:
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_INTERVAL_SECONDS
+            await asyncio.sleep(LAG_INTERVAL_SECONDS)
+            lag = max(0.0, loop.time() - expected)
+            EVENT_LOOP_LAG.set(lag)
+            EVENT_LOOP_LAG_HIST.observe(lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+lag_monitor = LagMonitor()
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import aiohttp
+from prisma import Json, Prisma
+
+# Transactional outbox for WhatsApp alerts.
+# - Writers call enqueue_order_created() inside their own transaction, so an alert
+#   exists if and only if the order was committed.
+# - NotificationDispatcher drains the outbox in the background over ONE pooled
+#   aiohttp session, retries with exponential backoff, and folds bursts
+#   (e.g. an Amazon sync importing 40 orders) into digest messages.
+
+# Read by _post on every call, so tests can point it at app/testing/fake_whatsapp.py
+WHATSAPP_API_URL = os.getenv("WHATSAPP_API_URL", "https://graph.facebook.com/v17.0")
+
+POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "30"))
+COALESCE_SECONDS = float(os.getenv("OUTBOX_COALESCE_SECONDS", "2"))
+BATCH_SIZE = 100
+DIGEST_THRESHOLD = 3   # More pending orders than this are sent as a digest
+MAX_ATTEMPTS = 8
+LEASE_SECONDS = 120    # A claimed message is retried by any worker if not settled by then
+MAX_MESSAGE_CHARS = 4000 # WhatsApp text body limit is 4096
+
+ORDER_CREATED = "order_created"
+
+# Claims due messages for this worker (SKIP LOCKED: workers never grab the same rows).
+CLAIM_SQL = '''
+UPDATE notification_outbox
+SET attempts = attempts + 1,
+    next_attempt_at = timezone('utc', now()) + make_interval(secs => $2)
+WHERE id IN (
+    SELECT id FROM notification_outbox
+    WHERE status = 'PENDING' AND next_attempt_at <= timezone('utc', now())
+    ORDER BY created_at
+    LIMIT $1
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id, kind, payload, attempts
+'''
+
+SETTLE_SQL = '''
+UPDATE notification_outbox
+SET status = $2::"OutboxStatus", sent_at = timezone('utc', now()), last_error = NULL
+WHERE id = ANY($1::text[])
+'''
+
+RETRY_SQL = '''
+UPDATE notification_outbox
+SET status = CASE WHEN attempts >= $2 THEN 'FAILED'::"OutboxStatus" ELSE 'PENDING'::"OutboxStatus" END,
+    next_attempt_at = timezone('utc', now()) + make_interval(secs => LEAST(POWER(2, attempts) * 5, 3600)),
+    last_error = $3
+WHERE id = ANY($1::text[])
+'''
+
+
+# --- MESSAGE FORMATTING ---
+
+def order_payload(order, products: dict) -> dict:
+    """Snapshot of what the alert needs, taken while the order is being created."""
+    items = []
+    for line in order.lineItems:
+        product = products.get(line.productId)
+        items.append({
+            'sku': product.sku if product else line.productId,
+            'name': product.name if product else '',
+            'quantity': line.quantity,
+        })
+    return {'order_id': order.id, 'customer_name': order.customerName, 'items': items}
+
+def _format_items(items: list[dict]) -> str:
+    # Added asterisks around labels to make them BOLD
+    return "".join(
+        f"*SKU:* {item['sku']}\n"
+        f"*Item Description:* {item['name']}\n"
+        f"*Quantity:* {item['quantity']}\n"
+        f"--------------------------------\n"
+        for item in items
+    )
+
+def format_order_message(payload: dict) -> str:
+    """Strictly professional single-order alert: SKU, Description and Quantity with BOLD labels."""
+    return (
+        f"*NEW ORDER NOTIFICATION*\n"
+        f"========================\n"
+        f"Customer: {payload['customer_name']}\n"
+        f"Order ID: {payload['order_id']}\n\n"
+        f"ORDER DETAILS\n"
+        f"========================\n"
+        f"{_format_items(payload['items'])}"
+    )
+
+def format_digest_messages(payloads: list[dict]) -> list[tuple[str, list[int]]]:
+    """
+    One digest for a burst of orders, split so no message exceeds MAX_MESSAGE_CHARS.
+    Returns (message, indexes of the payloads it covers) pairs.
+    """
+    header = f"*NEW ORDERS DIGEST* ({len(payloads)} orders)\n========================\n"
+    messages, body, covered = [], header, []
+    for index, payload in enumerate(payloads):
+        section = (
+            f"\nCustomer: {payload['customer_name']}\n"
+            f"Order ID: {payload['order_id']}\n"
+            f"{_format_items(payload['items'])}"
+        )
+        if len(body) + len(section) > MAX_MESSAGE_CHARS and body != header:
+            messages.append((body, covered))
+            body, covered = header, []
+        body += section
+        covered.append(index)
+    messages.append((body, covered))
+    return messages
+
+
+# --- OUTBOX ---
+
+async def enqueue_order_created(transaction: Prisma, payload: dict):
+    """Writes the alert in the caller's transaction. Call dispatcher.wake() after commit."""
+    await transaction.notificationoutbox.create(
+        data={'kind': ORDER_CREATED, 'payload': Json(payload)}
+    )
+
+
+class NotificationDispatcher:
+
+    def __init__(self):
+        self._session: aiohttp.ClientSession | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def configured(self) -> bool:
+        return all(os.getenv(k) for k in ("WHATSAPP_TOKEN", "WHATSAPP_PHONE_ID", "WHATSAPP_RECIPIENT"))
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def start(self, db: Prisma):
+        if self._task is not None:
+            return
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=300),
+            timeout=aiohttp.ClientTimeout(total=15)
+        )
+        self._task = asyncio.create_task(self._run(db))
+        print("📨 [Outbox] Notification dispatcher started.")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _run(self, db: Prisma):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_SECONDS)
+                await asyncio.sleep(COALESCE_SECONDS) # Let a burst finish so it becomes one digest
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                while await self.drain(db) == BATCH_SIZE:
+                    pass
+            except Exception as e:
+                print(f"❌ [Outbox] Drain failed: {e}")
+
+    async def _post(self, body: str):
+        url = f"{WHATSAPP_API_URL}/{os.getenv('WHATSAPP_PHONE_ID')}/messages"
+        headers = {
+            "Authorization": f"Bearer {os.getenv('WHATSAPP_TOKEN')}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "messaging_product": "whatsapp",
+            "to": os.getenv("WHATSAPP_RECIPIENT"),
+            "type": "text",
+            "text": {
+                "body": body
+            }
+        }
+        async with self._session.post(url, headers=headers, json=payload) as response:
+            if response.status != 200:
+                raise RuntimeError(f"WhatsApp API {response.status}: {await response.text()}")
+
+    async def drain(self, db: Prisma) -> int:
+        """Sends one batch of due messages. Returns how many were claimed."""
+        rows = await db.query_raw(CLAIM_SQL, BATCH_SIZE, LEASE_SECONDS)
+        if not rows:
+            return 0
+
+        ids = [row['id'] for row in rows]
+        if not self.configured:
+            print("⚠️ WhatsApp keys missing in .env - Skipping notification.")
+            await db.execute_raw(SETTLE_SQL, ids, 'SKIPPED')
+            return len(rows)
+
+        payloads = [
+            row['payload'] if isinstance(row['payload'], dict) else json.loads(row['payload'])
+            for row in rows
+        ]
+        if len(payloads) > DIGEST_THRESHOLD:
+            messages = [
+                (body, [ids[i] for i in covered])
+                for body, covered in format_digest_messages(payloads)
+            ]
+        else:
+            messages = [(format_order_message(p), [message_id]) for p, message_id in zip(payloads, ids)]
+
+        # Settle after every message: if a later one fails, only the unsent rest is retried
+        for n, (body, message_ids) in enumerate(messages):
+            try:
+                await self._post(body)
+            except Exception as e:
+                print(f"❌ WhatsApp Failed: {e}")
+                unsent = [i for _, rest in messages[n:] for i in rest]
+                await db.execute_raw(RETRY_SQL, unsent, MAX_ATTEMPTS, str(e))
+                return len(rows)
+            await db.execute_raw(SETTLE_SQL, message_ids, 'SENT')
+
+        print(f"✅ WhatsApp Alert Sent for {len(ids)} order(s) in {len(messages)} message(s)")
+        return len(rows)
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -0,0 +1,44 @@
+from prisma import Prisma
+from prisma.models import Product
+from app.db import pg
+
+# Ranked catalog search backed by the pg_trgm GIN indexes on Product.name / Product.sku.
+# - Exact SKU hits first, then SKU prefix hits, then best name matches.
+# - '<%' (word similarity) gives typo tolerance: "wisblok" still finds "WisBlock".
+# - Every predicate can be answered from the trigram indexes, so no sequential scan.
+SEARCH_SQL = '''
+SELECT id, sku, name, quantity_in_stock AS "quantityInStock", "createdAt", "updatedAt"
+FROM "Product"
+WHERE sku ILIKE $2 OR name ILIKE $2 OR $1 <% name
+ORDER BY
+    upper(sku) = upper($1) DESC,
+    sku ILIKE $3 DESC,
+    word_similarity($1, name) DESC,
+    quantity_in_stock DESC,
+    name ASC
+LIMIT $4
+'''
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _search_args(query: str, limit: int) -> tuple:
+    escaped = _escape_like(query)
+    return (query, f'%{escaped}%', f'{escaped}%', limit)
+
+async def search_products(db: Prisma, query: str, limit: int = 20) -> list[Product]:
+    """
+    Returns up to 'limit' products matching 'query' on SKU or Name, best match first.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    return await db.query_raw(SEARCH_SQL, *_search_args(query, limit), model=Product)
+
+async def search_product_rows(query: str, limit: int = 20) -> list[dict]:
+    """Same as search_products, over the asyncpg fast read pool (rows as dicts)."""
+    query = query.strip()
+    if not query:
+        return []
+    return await pg.fetch(SEARCH_SQL, *_search_args(query, limit))
@@ -0,0 +1,287 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import asyncpg
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.db import pg
+from app.db.ids import new_id
+from app.db.session import db_client
+from app.services import metrics
+
+# Runs periodic jobs exactly once per period across all gunicorn workers.
+# - Every worker schedules the jobs, but a run only proceeds on the worker that wins
+#   a Postgres advisory lock for that job (held on one dedicated asyncpg connection,
+#   so a crashed worker releases it automatically).
+# - A run claims its wall-clock slot, floor(epoch / interval), in scheduler_job_runs;
+#   a unique (job, slot) index makes the claim fail for any later firing in the same
+#   period, so startup runs and drifting worker timers can't run a job twice per period.
+# - The winner also skips if any run finished within min_gap (default half an interval),
+#   so two runs either side of a slot boundary don't land back to back.
+# - A run also holds a lease on its scheduler_job_runs row, extended by a heartbeat
+#   while the job runs. If the lock connection drops mid-run another worker can win
+#   the lock, but it still skips while the lease is live and only marks the run
+#   abandoned once the lease has lapsed (the owning worker is gone).
+# - max_instances=1 / coalesce stop a slow run from overlapping the next one,
+#   and a random start delay (jitter) spreads workers out.
+
+ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() != "false"
+DEFAULT_JITTER_SECONDS = float(os.getenv("SCHEDULER_JITTER_SECONDS", "15"))
+LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "60"))
+HEARTBEAT_SECONDS = LEASE_SECONDS / 3
+
+LOCK_NAMESPACE = 0x5354 # First key of the two-key advisory lock, "ST"
+
+WORKER = f"{socket.gethostname()}:{os.getpid()}"
+
+RECENT_RUN_SQL = '''
+SELECT 1
+FROM scheduler_job_runs
+WHERE job = $1
+  AND (
+    (status <> 'RUNNING' AND started_at > timezone('utc', now()) - make_interval(secs => $2))
+    OR (status = 'RUNNING' AND lease_expires_at > timezone('utc', now()))
+  )
+LIMIT 1
+'''
+
+# Called while holding the job's lock. A RUNNING row whose lease lapsed belongs to a
+# dead worker (rows from before leases have none); it gives its slot back so the job
+# is retried this period.
+ABANDON_RUNS_SQL = '''
+UPDATE scheduler_job_runs
+SET status = 'FAILED', error = 'Abandoned: worker stopped mid-run', finished_at = timezone('utc', now()),
+    slot = NULL
+WHERE job = $1 AND status = 'RUNNING'
+  AND (lease_expires_at IS NULL OR lease_expires_at <= timezone('utc', now()))
+'''
+
+# Returns no row if another run already claimed this period's slot
+START_RUN_SQL = '''
+INSERT INTO scheduler_job_runs (id, job, worker, status, started_at, lease_expires_at, slot)
+VALUES ($1, $2, $3, 'RUNNING', timezone('utc', now()), timezone('utc', now()) + make_interval(secs => $4),
+        floor(extract(epoch FROM now())::float8 / $5::float8)::bigint)
+ON CONFLICT (job, slot) DO NOTHING
+RETURNING id
+'''
+
+HEARTBEAT_SQL = '''
+UPDATE scheduler_job_runs
+SET lease_expires_at = timezone('utc', now()) + make_interval(secs => $2)
+WHERE id = $1 AND status = 'RUNNING'
+'''
+
+FINISH_RUN_SQL = '''
+UPDATE scheduler_job_runs
+SET status = $2::"JobRunStatus", error = $3, duration_ms = $4, finished_at = timezone('utc', now())
+WHERE id = $1
+'''
+
+def _lock_key(name: str) -> int:
+    key = zlib.crc32(name.encode())
+    return key - 2 ** 32 if key >= 2 ** 31 else key # int4
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: object
+    interval_seconds: float
+    jitter_seconds: float
+    min_gap_seconds: float
+    run_at_startup: bool = False
+    # Per-worker counters
+    runs: int = 0
+    failures: int = 0
+    skipped_locked: int = 0   # Another worker held the lock
+    skipped_recent: int = 0   # Another worker already ran it this period (or is running it)
+    lock_lost: int = 0        # Runs whose lock connection dropped before they finished
+    running: bool = False
+    last_run_at: datetime | None = None
+    last_duration_ms: int | None = None
+    last_error: str | None = None
+
+
+class JobScheduler:
+
+    def __init__(self):
+        self._scheduler: AsyncIOScheduler | None = None
+        self._conn: asyncpg.Connection | None = None
+        self._conn_lock = asyncio.Lock()
+        self.jobs: dict[str, ScheduledJob] = {}
+
+    def add_job(
+        self,
+        name: str,
+        func,
+        minutes: float,
+        run_at_startup: bool = False,
+        jitter_seconds: float | None = None,
+        min_gap_seconds: float | None = None
+    ):
+        interval = minutes * 60
+        self.jobs[name] = ScheduledJob(
+            name=name,
+            func=func,
+            interval_seconds=interval,
+            jitter_seconds=DEFAULT_JITTER_SECONDS if jitter_seconds is None else jitter_seconds,
+            min_gap_seconds=interval / 2 if min_gap_seconds is None else min_gap_seconds,
+            run_at_startup=run_at_startup,
+        )
+
+    # --- LIFECYCLE ---
+
+    def start(self):
+        if not ENABLED:
+            print("⏰ [Scheduler] Disabled on this worker (SCHEDULER_ENABLED=false)")
+            return
+        self._scheduler = AsyncIOScheduler()
+        now = datetime.now(timezone.utc)
+        for job in self.jobs.values():
+            # Passing next_run_time=None would add the job paused, so only pass it to run now
+            first_run = {'next_run_time': now} if job.run_at_startup else {}
+            self._scheduler.add_job(
+                self._run,
+                'interval',
+                seconds=job.interval_seconds,
+                args=[job],
+                id=job.name,
+                max_instances=1,
+                coalesce=True,
+                **first_run
+            )
+        self._scheduler.start()
+        for job in self.jobs.values():
+            print(f"⏰ [Scheduler] {job.name} every {job.interval_seconds / 60:g} min (leader-elected)")
+
+    async def stop(self):
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def next_run_time(self, name: str) -> datetime | None:
+        job = self._scheduler.get_job(name) if self._scheduler else None
+        return job.next_run_time if job else None
+
+    # --- LEADER ELECTION ---
+
+    async def _try_lock(self, name: str) -> bool:
+        async with self._conn_lock:
+            try:
+                if self._conn is None or self._conn.is_closed():
+                    self._conn = await pg.connect()
+                return await self._conn.fetchval(
+                    'SELECT pg_try_advisory_lock($1, $2)', LOCK_NAMESPACE, _lock_key(name)
+                )
+            except Exception as e: # Never let a lock failure kill the job's schedule
+                print(f"⚠️ [Scheduler] Lock connection failed: {type(e).__name__}: {e}")
+                self._conn = None
+                return False
+
+    async def _unlock(self, name: str):
+        async with self._conn_lock:
+            try:
+                if self._conn is not None and not self._conn.is_closed():
+                    await self._conn.execute(
+                        'SELECT pg_advisory_unlock($1, $2)', LOCK_NAMESPACE, _lock_key(name)
+                    )
+            except (OSError, asyncpg.PostgresError) as e:
+                # The server drops session locks with the connection anyway
+                print(f"⚠️ [Scheduler] Unlock failed: {e}")
+                self._conn = None
+
+    async def _holds_lock(self, name: str) -> bool:
+        """Whether this worker's lock connection is still up and still holds the job's lock."""
+        async with self._conn_lock:
+            if self._conn is None or self._conn.is_closed():
+                return False
+            try:
+                return await self._conn.fetchval(
+                    '''SELECT EXISTS (
+                        SELECT 1 FROM pg_locks
+                        WHERE locktype = 'advisory' AND pid = pg_backend_pid()
+                          AND classid = $1::oid AND objid = $2::oid AND objsubid = 2
+                    )''',
+                    LOCK_NAMESPACE, _lock_key(name) & 0xFFFFFFFF
+                )
+            except Exception:
+                self._conn = None
+                return False
+
+    async def _heartbeat(self, run_id: str):
+        """Keeps the run's lease alive while the job runs; cancelled when it finishes."""
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                await db_client.execute_raw(HEARTBEAT_SQL, run_id, LEASE_SECONDS)
+            except Exception as e: # Retried on the next beat; the lease outlives a few misses
+                print(f"⚠️ [Scheduler] Heartbeat failed: {type(e).__name__}: {e}")
+
+    # --- RUNNING ---
+
+    async def _run(self, job: ScheduledJob):
+        if job.jitter_seconds:
+            await asyncio.sleep(random.uniform(0, job.jitter_seconds))
+
+        if not await self._try_lock(job.name):
+            job.skipped_locked += 1
+            metrics.observe_job(job.name, 'skipped_locked')
+            return
+
+        try:
+            if not db_client.is_connected():
+                await db_client.connect()
+            if await db_client.query_raw(RECENT_RUN_SQL, job.name, job.min_gap_seconds):
+                job.skipped_recent += 1
+                metrics.observe_job(job.name, 'skipped_recent')
+                return
+
+            await db_client.execute_raw(ABANDON_RUNS_SQL, job.name)
+            run_id = new_id()
+            if not await db_client.query_raw(
+                START_RUN_SQL, run_id, job.name, WORKER, LEASE_SECONDS, job.interval_seconds
+            ):
+                job.skipped_recent += 1
+                metrics.observe_job(job.name, 'skipped_recent')
+                return
+
+            job.running = True
+            job.last_run_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            status, error = 'SUCCEEDED', None
+            heartbeat = asyncio.create_task(self._heartbeat(run_id))
+            try:
+                await job.func()
+            except Exception as e:
+                status, error = 'FAILED', f"{type(e).__name__}: {e}"
+                print(f"❌ [Scheduler] {job.name} failed: {error}")
+            finally:
+                heartbeat.cancel()
+                job.running = False
+
+            if not await self._holds_lock(job.name):
+                # The lease kept other workers out; record it so a flaky lock connection shows up
+                job.lock_lost += 1
+                print(f"⚠️ [Scheduler] {job.name}: lock connection was lost during the run")
+
+            duration = time.perf_counter() - started
+            duration_ms = int(duration * 1000)
+            metrics.observe_job(job.name, 'failed' if error else 'succeeded', duration)
+            job.runs += 1
+            job.last_duration_ms = duration_ms
+            job.last_error = error
+            if error:
+                job.failures += 1
+            await db_client.execute_raw(FINISH_RUN_SQL, run_id, status, error, duration_ms)
+        finally:
+            await self._unlock(job.name)
+
+
+job_scheduler = JobScheduler()
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from sp_api.api import Orders
+from sp_api.base import Marketplaces
+
+load_dotenv()
+
+# Async facade over the (blocking) python-amazon-sp-api Orders client.
+# - Every SP-API call runs on a small dedicated thread pool, never on the event loop.
+# - A token bucket per operation keeps us inside SP-API's usage plans.
+# - AMAZON_SP_API_ENDPOINT points the same client at a local fake SP-API server
+#   (app/testing/fake_sp_api.py) instead of Amazon: same paths, payloads and error
+#   bodies, and a fixed access token instead of the LWA token exchange.
+
+credentials = {
+    "refresh_token": os.getenv("AMAZON_REFRESH_TOKEN"),
+    "lwa_app_id": os.getenv("AMAZON_CLIENT_ID"),
+    "lwa_client_secret": os.getenv("AMAZON_CLIENT_SECRET"),
+    "aws_access_key": os.getenv("AWS_ACCESS_KEY"),
+    "aws_secret_key": os.getenv("AWS_SECRET_KEY"),
+    "role_arn": os.getenv("AWS_ROLE_ARN"),
+}
+
+# Comma separated sp_api Marketplaces names, e.g. "IN,AE,SA"
+MARKETPLACES = [m.strip().upper() for m in os.getenv("AMAZON_MARKETPLACES", "IN").split(',') if m.strip()]
+
+FAKE_ENDPOINT = os.getenv("AMAZON_SP_API_ENDPOINT")
+
+# The fake doesn't check credentials, but the sp_api client insists on having some.
+FAKE_CREDENTIALS = {"refresh_token": "fake", "lwa_app_id": "fake", "lwa_client_secret": "fake"}
+FAKE_ACCESS_TOKEN = "fake-access-token"
+
+MAX_THREADS = int(os.getenv("SP_API_MAX_THREADS", "4"))
+
+# Orders API v0 usage plans: (restore rate per second, burst)
+RATE_LIMITS = {
+    'getOrders': (0.0167, 20),
+    'getOrderItems': (0.5, 30),
+}
+
+THROTTLE_RETRIES = 3
+
+
+class TokenBucket:
+    """Async token bucket: 'rate' tokens per second, at most 'burst' saved up."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock: # Waiters are served in order
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_executor = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="sp-api")
+_buckets = {op: TokenBucket(rate, burst) for op, (rate, burst) in RATE_LIMITS.items()}
+
+def _is_throttled(error: Exception) -> bool:
+    return 'Throttled' in type(error).__name__ or getattr(error, 'code', None) == 429
+
+
+class OrdersGateway:
+    """Orders API for one marketplace. Methods return the SP-API 'payload' dict."""
+
+    def __init__(self, marketplace: str, endpoint: str | None = None):
+        self.marketplace = marketplace
+        if endpoint:
+            # Passing a restricted data token skips the LWA token exchange
+            self._client = Orders(
+                credentials=FAKE_CREDENTIALS,
+                marketplace=Marketplaces[marketplace],
+                restricted_data_token=FAKE_ACCESS_TOKEN
+            )
+            self._client.endpoint = endpoint.rstrip('/')
+        else:
+            self._client = Orders(credentials=credentials, marketplace=Marketplaces[marketplace])
+
+    async def _call(self, operation: str, fn, *args, **kwargs) -> dict:
+        loop = asyncio.get_running_loop()
+        for attempt in range(THROTTLE_RETRIES + 1):
+            await _buckets[operation].acquire()
+            try:
+                res = await loop.run_in_executor(_executor, lambda: fn(*args, **kwargs))
+                return res.payload
+            except Exception as e:
+                if not _is_throttled(e) or attempt == THROTTLE_RETRIES:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def get_orders(self, **params) -> dict:
+        return await self._call('getOrders', self._client.get_orders, **params)
+
+    async def get_order_items(self, order_id: str) -> dict:
+        return await self._call('getOrderItems', self._client.get_order_items, order_id=order_id)
+
+    async def aclose(self):
+        pass
+
+
+def get_orders_gateway(marketplace: str) -> OrdersGateway:
+    """Raises KeyError for a marketplace name sp_api doesn't know."""
+    return OrdersGateway(marketplace, FAKE_ENDPOINT)
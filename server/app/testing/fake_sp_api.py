@@ -0,0 +1,232 @@
+"""
+Local fake of the SP-API Orders v0 endpoints the Amazon sync uses, for tests and
+development. Point the real client at it with AMAZON_SP_API_ENDPOINT:
+
+    python -m app.testing.fake_sp_api --port 8765 --orders 25 --skus SKU-1,SKU-2
+    AMAZON_SP_API_ENDPOINT=http://127.0.0.1:8765 python -m app.services.amazon_sync
+
+Standard library only (a threaded http.server), so tests can start one per test:
+
+    with FakeSpApi() as fake:
+        fake.add_order("111-1", [("SKU-1", 2)])
+        fake.throttle("getOrderItems", 1) # Next call answers 429, like a real usage plan
+        ...
+"""
+import argparse
+import datetime
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PAGE_SIZE = 2 # Small pages, so NextToken paging is always exercised
+
+ORDERS_PATH = "/orders/v0/orders"
+ORDER_ITEMS_RE = re.compile(r"^/orders/v0/orders/([^/]+)/orderItems$")
+
+def _iso(value: datetime.datetime) -> str:
+    return value.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def _parse_iso(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+@dataclass
+class FakeOrder:
+    order_id: str
+    items: list[tuple[str, int]] # (SellerSKU, QuantityOrdered)
+    buyer_name: str = "Fake Buyer"
+    status: str = "Unshipped"
+    last_update: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def summary(self) -> dict:
+        return {
+            "AmazonOrderId": self.order_id,
+            "OrderStatus": self.status,
+            "LastUpdateDate": _iso(self.last_update),
+            "BuyerInfo": {"BuyerName": self.buyer_name},
+        }
+
+
+class FakeSpApi:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.orders: dict[str, FakeOrder] = {}
+        self.calls: list[tuple[str, int]] = [] # (operation, HTTP status), in arrival order
+        self.access_tokens: set[str] = set()
+        self._throttled: dict[str, int] = {}
+        self._failing: set[str] = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # --- SCENARIO SETUP ---
+
+    def add_order(self, order_id: str, items: list[tuple[str, int]], **kwargs) -> FakeOrder:
+        order = FakeOrder(order_id, items, **kwargs)
+        with self._lock:
+            self.orders[order_id] = order
+        return order
+
+    def throttle(self, operation: str, times: int = 1):
+        """The next 'times' calls of 'operation' ('getOrders' / 'getOrderItems') get a 429."""
+        with self._lock:
+            self._throttled[operation] = self._throttled.get(operation, 0) + times
+
+    def fail_items(self, order_id: str, failing: bool = True):
+        """getOrderItems for this order answers 500 until switched off."""
+        with self._lock:
+            (self._failing.add if failing else self._failing.discard)(order_id)
+
+    def count(self, operation: str, status: int | None = None) -> int:
+        return sum(1 for op, code in self.calls if op == operation and (status is None or code == status))
+
+    # --- LIFECYCLE ---
+
+    def start(self) -> "FakeSpApi":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-sp-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeSpApi":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- REQUEST HANDLING ---
+
+    def _take_throttle(self, operation: str) -> bool:
+        with self._lock:
+            if self._throttled.get(operation, 0) > 0:
+                self._throttled[operation] -= 1
+                return True
+            return False
+
+    def _get_orders(self, query: dict[str, list[str]]) -> dict:
+        # Like SP-API, a NextToken request carries no filters: the token holds them
+        next_token = query.get("NextToken", [None])[0]
+        if next_token:
+            offset, since, statuses = json.loads(next_token)
+        else:
+            offset = 0
+            since = query.get("LastUpdatedAfter", [None])[0]
+            statuses = sorted({s for value in query.get("OrderStatuses", []) for s in value.split(',') if s})
+
+        with self._lock:
+            orders = sorted(self.orders.values(), key=lambda o: (o.last_update, o.order_id))
+        if since:
+            orders = [o for o in orders if o.last_update > _parse_iso(since)]
+        if statuses:
+            orders = [o for o in orders if o.status in set(statuses)]
+
+        page = orders[offset:offset + PAGE_SIZE]
+        payload = {"Orders": [o.summary() for o in page]}
+        if offset + PAGE_SIZE < len(orders):
+            payload["NextToken"] = json.dumps([offset + PAGE_SIZE, since, statuses])
+        return payload
+
+    def _get_order_items(self, order_id: str) -> dict | None:
+        with self._lock:
+            order = self.orders.get(order_id)
+        if order is None:
+            return None
+        return {
+            "AmazonOrderId": order_id,
+            "OrderItems": [
+                {"SellerSKU": sku, "QuantityOrdered": quantity, "OrderItemId": f"{order_id}-{n}"}
+                for n, (sku, quantity) in enumerate(order.items)
+            ],
+        }
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, operation: str, status: int, body: dict):
+                fake.calls.append((operation, status))
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _error(self, operation: str, status: int, code: str, message: str):
+                # Same error body as SP-API, so the client raises its own exceptions
+                self._send(operation, status, {"errors": [{"code": code, "message": message}]})
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                token = self.headers.get("x-amz-access-token")
+                if token:
+                    fake.access_tokens.add(token)
+
+                items_match = ORDER_ITEMS_RE.match(url.path)
+                if url.path == ORDERS_PATH:
+                    operation = "getOrders"
+                elif items_match:
+                    operation = "getOrderItems"
+                else:
+                    return self._error("unknown", 404, "NotFound", f"No fake for {url.path}")
+
+                if not token:
+                    return self._error(operation, 403, "Unauthorized", "Missing x-amz-access-token")
+                if fake._take_throttle(operation):
+                    return self._error(operation, 429, "QuotaExceeded", "You exceeded your quota for the requested resource.")
+
+                if operation == "getOrders":
+                    return self._send(operation, 200, {"payload": fake._get_orders(query)})
+
+                order_id = items_match.group(1)
+                if order_id in fake._failing:
+                    return self._error(operation, 500, "InternalFailure", "Fake failure")
+                payload = fake._get_order_items(order_id)
+                if payload is None:
+                    return self._error(operation, 404, "NotFound", f"Order {order_id} not found")
+                self._send(operation, 200, {"payload": payload})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake SP-API Orders server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--orders", type=int, default=10, help="Number of generated orders")
+    parser.add_argument("--skus", default="SKU-1", help="Comma separated SellerSKUs to order")
+    args = parser.parse_args()
+
+    fake = FakeSpApi(args.host, args.port)
+    skus = [s.strip() for s in args.skus.split(',') if s.strip()]
+    for n in range(args.orders):
+        fake.add_order(f"FAKE-{n + 1:07d}", [(skus[n % len(skus)], 1 + n % 3)])
+
+    print(f"Fake SP-API listening on {fake.endpoint} with {args.orders} orders (Ctrl+C to stop)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._server.server_close()
+
+if __name__ == "__main__":
+    main()
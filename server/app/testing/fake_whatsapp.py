@@ -0,0 +1,150 @@
+"""
+Local fake of the WhatsApp Cloud API messages endpoint the notification outbox posts
+to, for tests and development. Point the dispatcher at it with WHATSAPP_API_URL:
+
+    python -m app.testing.fake_whatsapp --port 8766
+    WHATSAPP_API_URL=http://127.0.0.1:8766 uvicorn app.main:app
+
+Standard library only (a threaded http.server), so tests can start one per test:
+
+    with FakeWhatsApp() as fake:
+        fake.fail(500, times=1) # Next post answers 500, like a Graph API outage
+        ...
+        assert fake.messages[0]["text"]["body"].startswith("*NEW ORDER")
+"""
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MESSAGES_RE = re.compile(r"^/([^/]+)/messages$")
+
+
+class FakeWhatsApp:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.messages: list[dict] = [] # Accepted message payloads, in arrival order
+        self.calls: list[tuple[int, int]] = [] # (client port, HTTP status): one port per pooled connection
+        self.tokens: set[str] = set()
+        self._failures: list[int] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        return len({port for port, _ in self.calls})
+
+    # --- SCENARIO SETUP ---
+
+    def fail(self, status: int = 500, times: int = 1):
+        """The next 'times' posts answer 'status' with a Graph API error body."""
+        with self._lock:
+            self._failures.extend([status] * times)
+
+    # --- LIFECYCLE ---
+
+    def start(self) -> "FakeWhatsApp":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-whatsapp", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeWhatsApp":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- REQUEST HANDLING ---
+
+    def _take_failure(self) -> int | None:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, so connection reuse is observable
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict):
+                fake.calls.append((self.client_address[1], status))
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _error(self, status: int, code: int, message: str):
+                # Same error body as the Graph API
+                self._send(status, {"error": {"message": message, "type": "OAuthException", "code": code}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length)
+
+                match = MESSAGES_RE.match(self.path)
+                if not match:
+                    return self._error(404, 803, f"No fake for {self.path}")
+                auth = self.headers.get("Authorization", "")
+                if not auth.startswith("Bearer ") or auth == "Bearer ":
+                    return self._error(401, 190, "Missing access token")
+                fake.tokens.add(auth[len("Bearer "):])
+
+                status = fake._take_failure()
+                if status is not None:
+                    return self._error(status, 2, "Fake failure")
+
+                try:
+                    payload = json.loads(raw)
+                except json.JSONDecodeError:
+                    return self._error(400, 100, "Invalid JSON")
+                if payload.get("messaging_product") != "whatsapp" or not payload.get("text", {}).get("body"):
+                    return self._error(400, 100, "Missing messaging_product or text body")
+
+                with fake._lock:
+                    fake.messages.append(payload)
+                    message_id = f"wamid.FAKE{len(fake.messages):06d}"
+                self._send(200, {
+                    "messaging_product": "whatsapp",
+                    "contacts": [{"input": payload.get("to"), "wa_id": payload.get("to")}],
+                    "messages": [{"id": message_id}],
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake WhatsApp Cloud API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    fake = FakeWhatsApp(args.host, args.port)
+    print(f"Fake WhatsApp API listening on {fake.endpoint} (Ctrl+C to stop)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import functools
+import inspect
+import pytest
+from app.db import instrumentation
+from .query_budget import check_budget, query_budget as _query_budget
+
+# pytest plugin for query budgets. Enable it in a conftest.py:
+#
+#     pytest_plugins = ["app.testing.pytest_plugin"]
+#
+# Then either use the fixture:
+#
+#     async def test_order_list(client, query_budget):
+#         with query_budget(max_queries=2):
+#             await client.get("/api/orders?limit=100")
+#
+# or the marker, which budgets the whole test body (fixtures' setup excluded):
+#
+#     @pytest.mark.query_budget(max_queries=5, max_repeats=1)
+#     async def test_receive_shipment(client, ordered_shipment): ...
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries=None, max_repeats=None): fail the test if its body issues "
+        "more queries than max_queries or repeats a query shape more than max_repeats times",
+    )
+
+@pytest.fixture
+def query_budget():
+    """Returns the query_budget(max_queries, max_repeats) context manager."""
+    return _query_budget
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('query_budget')
+    if marker is None:
+        yield
+        return
+
+    instrumentation.install()
+    stats = instrumentation.QueryStats()
+    test = item.obj
+    if inspect.iscoroutinefunction(test):
+        # Async plugins (anyio, pytest-asyncio) run the test in their own runner
+        # context, so tracking has to start inside the coroutine itself.
+        @functools.wraps(test)
+        async def budgeted(*args, **kwargs):
+            with instrumentation.track_queries(stats):
+                return await test(*args, **kwargs)
+
+        item.obj = budgeted
+        try:
+            outcome = yield
+        finally:
+            item.obj = test
+    else:
+        with instrumentation.track_queries(stats):
+            outcome = yield
+    if outcome.excinfo is None:
+        check_budget(stats, label=item.nodeid, **marker.kwargs)
@@ -0,0 +1,55 @@
+import functools
+import inspect
+from contextlib import contextmanager
+from app.db import instrumentation
+
+# Query budgets for tests and benchmarks: fail when a code path issues more
+# queries than allowed, or repeats one query shape (a per-row query in a loop).
+#
+#     with query_budget(max_queries=6, max_repeats=1):
+#         await service.create(db, order)          # 50 line items, still 6 queries
+#
+#     @assert_max_queries(4, max_repeats=1)
+#     async def test_receive_shipment(...): ...
+#
+# Size the data so that a per-row query would blow the budget (e.g. 50 line items
+# against a budget of 6); the budget then holds for any data size.
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+def check_budget(stats: instrumentation.QueryStats, max_queries: int | None, max_repeats: int | None, label: str = ''):
+    problems = []
+    if max_queries is not None and stats.count > max_queries:
+        problems.append(f"{stats.count} queries, budget is {max_queries}")
+    if max_repeats is not None and stats.max_repeats > max_repeats:
+        problems.append(f"a query shape ran {stats.max_repeats} times, at most {max_repeats} allowed")
+    if problems:
+        prefix = f"{label}: " if label else ''
+        raise QueryBudgetExceeded(f"{prefix}{'; '.join(problems)}\n{stats.report()}")
+
+@contextmanager
+def query_budget(max_queries: int | None = None, max_repeats: int | None = None, label: str = ''):
+    """Yields the QueryStats being collected; checks the budget when the block exits cleanly."""
+    instrumentation.install()
+    with instrumentation.track_queries() as stats:
+        yield stats
+    check_budget(stats, max_queries, max_repeats, label)
+
+def assert_max_queries(max_queries: int | None = None, max_repeats: int | None = None):
+    """Decorator form of query_budget() for sync or async functions (e.g. tests)."""
+    def decorator(fn):
+        label = fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with query_budget(max_queries, max_repeats, label):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with query_budget(max_queries, max_repeats, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
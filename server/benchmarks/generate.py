@@ -0,0 +1,205 @@
+"""
+Deterministic benchmark data generator.
+
+Generates products, orders + line items and shipments + requests at a chosen scale
+and loads them into Postgres with COPY. The same --seed always yields the same rows
+(ids included), so runs at the same scale are comparable.
+
+    python -m benchmarks.generate --reset --products 100000 --orders 250000 --lines-per-order 4
+
+--reset TRUNCATEs the catalog, order and shipment tables first: point DATABASE_URL
+at a local benchmark database, never at production.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from app.db import pg
+
+BATCH_ROWS = 50_000
+EPOCH = datetime(2025, 1, 1)
+
+ORDER_STATUSES = ['COMPLETED'] * 6 + ['READY_TO_SHIP'] * 2 + ['AWAITING_STOCK', 'CANCELLED', 'ON_HOLD']
+ORDER_SOURCES = ['Local', 'Amazon', 'PreOrder']
+SHIPMENT_STATUSES = ['RECEIVED'] * 7 + ['ORDERED'] * 2 + ['PLANNING']
+WORDS = ['WisBlock', 'Core', 'Sensor', 'LoRa', 'Gateway', 'Module', 'Base', 'Board', 'GPS',
+         'Antenna', 'Enclosure', 'Battery', 'Solar', 'Kit', 'IO', 'Power', 'Slot', 'Mini']
+
+TRUNCATE_SQL = '''
+TRUNCATE "Product", "Order", order_line_items, "Shipment", shipment_requests, notification_outbox CASCADE
+'''
+
+# TRUNCATE bypasses the counter triggers, so rebuild them from the data.
+RECOUNT_SQL = 'SELECT dashboard_counters_recount()'
+
+def product_id(i: int) -> str:
+    return f"bprod{i:020d}"
+
+def order_id(i: int) -> str:
+    return f"bordr{i:020d}"
+
+def shipment_id(i: int) -> str:
+    return f"bship{i:020d}"
+
+
+class Generator:
+
+    def __init__(self, seed: int, products: int, orders: int, lines_per_order: int,
+                 shipments: int, requests_per_shipment: int):
+        self.seed = seed
+        self.products = products
+        self.orders = orders
+        self.lines_per_order = lines_per_order
+        self.shipments = shipments
+        self.requests_per_shipment = min(requests_per_shipment, products)
+        # Skewed popularity: a few products appear in most orders, like real sales
+        self._weights = [1 / (rank + 1) ** 0.8 for rank in range(products)]
+        self._cum_weights = None
+
+    def _rng(self, stream: str) -> random.Random:
+        # One independent stream per table: changing --orders doesn't reshuffle products
+        return random.Random(f"{self.seed}:{stream}")
+
+    def _pick_products(self, rng: random.Random, k: int) -> list[int]:
+        if self._cum_weights is None:
+            total, cum = 0.0, []
+            for w in self._weights:
+                total += w
+                cum.append(total)
+            self._cum_weights = cum
+        return rng.choices(range(self.products), cum_weights=self._cum_weights, k=k)
+
+    def product_rows(self):
+        rng = self._rng('products')
+        for i in range(self.products):
+            name = ' '.join(rng.sample(WORDS, 3)) + f" | RAK{1000 + i % 9000}"
+            roll = rng.random()
+            quantity = 0 if roll < 0.3 else rng.randint(1, 5) if roll < 0.4 else rng.randint(6, 200)
+            created = EPOCH + timedelta(minutes=i)
+            yield (product_id(i), f"B{i:06d}", name, quantity, None, created, created)
+
+    def order_rows(self):
+        """Yields ('order', row) and ('line', row) tuples, orders oldest first."""
+        rng = self._rng('orders')
+        line_no = 0
+        span = 365 * 24 * 3600
+        for i in range(self.orders):
+            created = EPOCH + timedelta(seconds=span * i // max(self.orders, 1))
+            status = rng.choice(ORDER_STATUSES)
+            source = rng.choice(ORDER_SOURCES)
+            external = f"404-{i:07d}" if source == 'Amazon' else None
+            yield 'order', (
+                order_id(i), f"Customer {rng.randint(1, self.orders // 3 + 1)}", source, status,
+                external, 'Amazon' if external else None, created, created
+            )
+            count = rng.randint(1, self.lines_per_order * 2 - 1)
+            for product in set(self._pick_products(rng, count)):
+                yield 'line', (f"bline{line_no:020d}", rng.randint(1, 5), order_id(i), product_id(product))
+                line_no += 1
+
+    def shipment_rows(self):
+        """Yields ('shipment', row) and ('request', row) tuples."""
+        rng = self._rng('shipments')
+        request_no = 0
+        for i in range(self.shipments):
+            created = EPOCH + timedelta(days=i * 365 // max(self.shipments, 1))
+            status = rng.choice(SHIPMENT_STATUSES)
+            ordered = created + timedelta(days=2) if status != 'PLANNING' else None
+            received = created + timedelta(days=20) if status == 'RECEIVED' else None
+            yield 'shipment', (shipment_id(i), f"Benchmark Shipment #{i + 1}", status, created, ordered, received)
+            # Distinct products per shipment: (shipment, product, customer) is unique
+            for product in rng.sample(range(self.products), self.requests_per_shipment):
+                customer = f"Customer {rng.randint(1, 500)}" if rng.random() < 0.2 else None
+                yield 'request', (
+                    f"breq{request_no:021d}", rng.randint(1, 50), customer,
+                    shipment_id(i), product_id(product), None
+                )
+                request_no += 1
+
+
+TABLES = {
+    'product': ('Product', ['id', 'sku', 'name', 'quantity_in_stock', 'content_hash', 'createdAt', 'updatedAt']),
+    'order': ('Order', ['id', 'customer_name', 'source', 'status', 'external_order_id', 'external_source', 'created_at', 'updatedAt']),
+    'line': ('order_line_items', ['id', 'quantity', 'orderId', 'productId']),
+    'shipment': ('Shipment', ['id', 'name', 'status', 'created_at', 'ordered_at', 'received_at']),
+    'request': ('shipment_requests', ['id', 'quantity', 'customer_name', 'shipmentId', 'productId', 'fulfilling_order_id']),
+}
+
+
+async def _copy(conn, kind: str, rows: list) -> int:
+    table, columns = TABLES[kind]
+    await conn.copy_records_to_table(table, records=rows, columns=columns)
+    return len(rows)
+
+async def _copy_mixed(conn, tagged_rows, kinds: tuple[str, str]) -> dict[str, int]:
+    """COPY a stream of (kind, row) pairs in batches; parents are flushed before children."""
+    buffers = {k: [] for k in kinds}
+    counts = {k: 0 for k in kinds}
+    for kind, row in tagged_rows:
+        buffers[kind].append(row)
+        if len(buffers[kind]) >= BATCH_ROWS:
+            for k in kinds: # Parent first, for the foreign keys
+                if buffers[k]:
+                    counts[k] += await _copy(conn, k, buffers[k])
+                    buffers[k] = []
+    for k in kinds:
+        if buffers[k]:
+            counts[k] += await _copy(conn, k, buffers[k])
+    return counts
+
+async def load(generator: Generator, reset: bool) -> dict:
+    started = time.perf_counter()
+    conn = await pg.connect()
+    try:
+        async with conn.transaction():
+            if reset:
+                await conn.execute(TRUNCATE_SQL)
+
+            counts = {'product': 0}
+            batch = []
+            for row in generator.product_rows():
+                batch.append(row)
+                if len(batch) >= BATCH_ROWS:
+                    counts['product'] += await _copy(conn, 'product', batch)
+                    batch = []
+            if batch:
+                counts['product'] += await _copy(conn, 'product', batch)
+
+            counts.update(await _copy_mixed(conn, generator.order_rows(), ('order', 'line')))
+            counts.update(await _copy_mixed(conn, generator.shipment_rows(), ('shipment', 'request')))
+            await conn.execute(RECOUNT_SQL)
+
+        await conn.execute('ANALYZE "Product", "Order", order_line_items, "Shipment", shipment_requests')
+    finally:
+        await conn.close()
+
+    counts['seconds'] = round(time.perf_counter() - started, 1)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplies every count below")
+    parser.add_argument('--products', type=int, default=20_000)
+    parser.add_argument('--orders', type=int, default=10_000)
+    parser.add_argument('--lines-per-order', type=int, default=3, help="Average")
+    parser.add_argument('--shipments', type=int, default=100)
+    parser.add_argument('--requests-per-shipment', type=int, default=50)
+    parser.add_argument('--reset', action='store_true', help="TRUNCATE products, orders and shipments first")
+    args = parser.parse_args()
+
+    generator = Generator(
+        seed=args.seed,
+        products=int(args.products * args.scale),
+        orders=int(args.orders * args.scale),
+        lines_per_order=args.lines_per_order,
+        shipments=int(args.shipments * args.scale),
+        requests_per_shipment=args.requests_per_shipment,
+    )
+    counts = asyncio.run(load(generator, args.reset))
+    print(f"📦 Loaded {counts['product']} products, {counts['order']} orders / {counts['line']} line items, "
+          f"{counts['shipment']} shipments / {counts['request']} requests in {counts['seconds']}s")
+
+if __name__ == '__main__':
+    main()
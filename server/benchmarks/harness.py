@@ -0,0 +1,246 @@
+"""
+Endpoint benchmark harness.
+
+Drives the FastAPI app in-process over httpx's ASGI transport (no network, no
+uvicorn) against whatever DATABASE_URL points at - typically a database filled
+by benchmarks.generate - and reports per endpoint: p50/p95/p99 latency,
+throughput and queries per request. Results are saved as JSON; pass --compare
+with an earlier file to print the change.
+
+    python -m benchmarks.harness --requests 200 --concurrency 8 --out results.json
+    python -m benchmarks.harness --endpoint orders_list --compare results.json
+
+Write scenarios (order_create, shipment_receive) change the data; run them on a
+benchmark database.
+"""
+import os
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+import httpx
+from app.db import instrumentation, pg
+from app.db.session import db_client
+from app.main import app
+from app.services.catalog_cache import catalog_cache
+
+FETCH_SAMPLE_SQL = '''
+SELECT id, sku FROM "Product" WHERE quantity_in_stock > 10 ORDER BY id LIMIT 500
+'''
+
+
+class Scenario:
+    """One endpoint. prepare() runs outside the timing; request() is what gets measured."""
+    name = ''
+    writes = False
+
+    async def setup(self, client: httpx.AsyncClient, rng: random.Random):
+        self.rng = rng
+
+    async def prepare(self, client: httpx.AsyncClient):
+        return None
+
+    async def request(self, client: httpx.AsyncClient, prepared) -> httpx.Response:
+        raise NotImplementedError
+
+
+class Get(Scenario):
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+
+    async def request(self, client, prepared):
+        return await client.get(self.path)
+
+
+class SearchProducts(Scenario):
+    name = 'products_search'
+    terms = ['wis', 'sensor', 'lora gate', 'B0001', 'enclosre', 'RAK12', 'kit']
+
+    async def request(self, client, prepared):
+        return await client.get('/api/products', params={'search': self.rng.choice(self.terms)})
+
+
+class CreateOrder(Scenario):
+    name = 'order_create'
+    writes = True
+
+    async def setup(self, client, rng):
+        await super().setup(client, rng)
+        self.products = [r['id'] for r in await db_client.query_raw(FETCH_SAMPLE_SQL)]
+
+    async def request(self, client, prepared):
+        lines = [{'product_id': pid, 'quantity': 1} for pid in self.rng.sample(self.products, 3)]
+        return await client.post('/api/orders', json={
+            'customer_name': 'Benchmark', 'source': 'Local', 'line_items': lines
+        })
+
+
+class ReceiveShipment(Scenario):
+    """Builds an ORDERED shipment with pre-orders per iteration, then times RECEIVED."""
+    name = 'shipment_receive'
+    writes = True
+    lines = 50
+
+    async def setup(self, client, rng):
+        await super().setup(client, rng)
+        self.products = [r['id'] for r in await db_client.query_raw(FETCH_SAMPLE_SQL)]
+
+    async def prepare(self, client):
+        res = await client.post('/api/shipments', json={'name': 'Benchmark receive'})
+        shipment_id = res.json()['id']
+        items = [{'product_id': pid, 'quantity': 2} for pid in self.rng.sample(self.products, self.lines)]
+        await client.post(f'/api/shipments/{shipment_id}/requests/batch', json={'items': items[:40]})
+        await client.post(f'/api/shipments/{shipment_id}/requests/batch',
+                          json={'customer_name': 'Benchmark pre-order', 'items': items[40:]})
+        await client.put(f'/api/shipments/{shipment_id}/status', json={'status': 'ORDERED'})
+        return shipment_id
+
+    async def request(self, client, shipment_id):
+        return await client.put(f'/api/shipments/{shipment_id}/status', json={'status': 'RECEIVED'})
+
+
+SCENARIOS = [
+    Get('orders_list', '/api/orders?limit=100'),
+    Get('orders_waiting', '/api/orders?status=AWAITING_STOCK&limit=100'),
+    Get('inventory_list', '/api/inventory?limit=100'),
+    Get('products_list', '/api/products?limit=100'),
+    SearchProducts(),
+    Get('dashboard_stats', '/api/dashboard/stats'),
+    Get('dashboard_low_stock', '/api/dashboard/low-stock'),
+    Get('shipments_list', '/api/shipments?limit=100'),
+    CreateOrder(),
+    ReceiveShipment(),
+]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int, warmup: int, seed: int) -> dict:
+    await scenario.setup(client, random.Random(f"{seed}:{scenario.name}"))
+    for _ in range(warmup):
+        await scenario.request(client, await scenario.prepare(client))
+
+    latencies: list[float] = []
+    queries: list[int] = []
+    repeats: list[int] = []
+    errors = 0
+    remaining = iter(range(requests))
+    busy = 0.0
+
+    async def worker():
+        nonlocal errors, busy
+        for _ in remaining:
+            prepared = await scenario.prepare(client)
+            with instrumentation.track_queries() as stats:
+                started = time.perf_counter()
+                res = await scenario.request(client, prepared)
+                elapsed = time.perf_counter() - started
+            busy += elapsed
+            latencies.append(elapsed * 1000)
+            queries.append(stats.count)
+            repeats.append(stats.max_repeats)
+            if res.status_code >= 400:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(_percentile(latencies, 0.50), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+        'p99_ms': round(_percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        # Requests per second of measured time (prepare steps excluded)
+        'throughput_rps': round(len(latencies) * concurrency / busy, 1) if busy else 0.0,
+        'queries_per_request': round(statistics.fmean(queries), 2),
+        'max_queries': max(queries),
+        # Most times one query shape ran in a single request; > 1 usually means a per-row loop
+        'max_shape_repeats': max(repeats),
+    }
+
+def _meta(args) -> dict:
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        rev = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_rev': rev,
+        'python': platform.python_version(),
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'seed': args.seed,
+        'env': {k: os.getenv(k) for k in ('FAST_READ_ENDPOINTS', 'FAST_SERIALIZATION', 'DASHBOARD_STATS_MODE')},
+    }
+
+async def run(args) -> dict:
+    instrumentation.install()
+    await db_client.connect()
+    await pg.open_pool()
+    await catalog_cache.warm(db_client)
+
+    selected = [s for s in SCENARIOS if not args.endpoint or s.name in args.endpoint]
+    if args.read_only:
+        selected = [s for s in selected if not s.writes]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for scenario in selected:
+                results[scenario.name] = await run_scenario(
+                    client, scenario, args.requests, args.concurrency, args.warmup, args.seed
+                )
+                r = results[scenario.name]
+                print(f"{scenario.name:<22} p50 {r['p50_ms']:>9} ms  p95 {r['p95_ms']:>9} ms  p99 {r['p99_ms']:>9} ms  "
+                      f"{r['throughput_rps']:>8} req/s  {r['queries_per_request']:>6} q/req  {r['errors']} err")
+    finally:
+        await pg.close_pool()
+        await db_client.disconnect()
+
+    return {'meta': _meta(args), 'endpoints': results}
+
+def compare(current: dict, previous: dict):
+    print(f"\n{'endpoint':<22}{'p50':>10}{'p95':>10}{'q/req':>10}   (change vs {previous['meta'].get('git_rev')})")
+    for name, r in current['endpoints'].items():
+        old = previous['endpoints'].get(name)
+        if not old:
+            continue
+        def pct(key):
+            return f"{100 * (r[key] - old[key]) / old[key]:+.0f}%" if old[key] else 'n/a'
+        print(f"{name:<22}{pct('p50_ms'):>10}{pct('p95_ms'):>10}{r['queries_per_request'] - old['queries_per_request']:>+10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help="Per endpoint")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--endpoint', action='append', choices=[s.name for s in SCENARIOS], help="Repeatable; default: all")
+    parser.add_argument('--read-only', action='store_true', help="Skip scenarios that write")
+    parser.add_argument('--out', help="Write results JSON here")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
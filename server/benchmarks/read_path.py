@@ -0,0 +1,111 @@
+"""
+Prisma vs asyncpg fast read path, per endpoint.
+
+Calls each service function the way its route does (including response model
+validation and JSON encoding) and reports wall latency and process CPU per call.
+Needs DATABASE_URL and a populated database.
+
+    python -m benchmarks.read_path --iterations 200 --json read_path.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+from pydantic import TypeAdapter
+from app.db import pg
+from app.db.session import db_client
+from app.api.dashboard import service as dashboard
+from app.api.dashboard.schemas import DashboardStats, LowStockItem
+from app.api.inventory import service as inventory
+from app.api.inventory.schemas import InventoryItem
+from app.api.orders import service as orders
+from app.api.orders.schemas import Order
+from app.api.products import service as products
+from app.api.products.schemas import Product
+
+def _page(result):
+    return result[0] if isinstance(result, tuple) else result
+
+# name -> (FAST_READ_ENDPOINTS entry, call, response model)
+CASES = {
+    'inventory_list': ('inventory', lambda db: inventory.get_all_inventory_items(db, None, None, 100), List[InventoryItem]),
+    'inventory_search': ('inventory', lambda db: inventory.get_all_inventory_items(db, 'rak', None, 100), List[InventoryItem]),
+    'products_list': ('products', lambda db: products.get_all(db, None, None, 100), List[Product]),
+    'dashboard_stats': ('dashboard', lambda db: dashboard.get_stats(db, 'aggregate'), DashboardStats),
+    'dashboard_low_stock': ('dashboard', lambda db: dashboard.get_low_stock_items(db), List[LowStockItem]),
+    'orders_list': ('orders', lambda db: orders.get_all(db, None, None, 100), List[Order]),
+}
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+async def _measure(call, adapter: TypeAdapter, iterations: int, warmup: int) -> dict:
+    async def once():
+        data = _page(await call(db_client))
+        adapter.dump_json(adapter.validate_python(data, from_attributes=True), by_alias=True)
+
+    for _ in range(warmup):
+        await once()
+
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await once()
+        latencies.append((time.perf_counter() - started) * 1000)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'cpu_ms_per_call': round(cpu * 1000 / iterations, 3),
+        'calls_per_s': round(iterations / wall, 1),
+    }
+
+async def run(iterations: int, warmup: int, cases: list[str]) -> dict:
+    await db_client.connect()
+    await pg.open_pool(force=True)
+    results = {}
+    try:
+        for name in cases:
+            endpoint, call, model = CASES[name]
+            adapter = TypeAdapter(model)
+            pg.FAST_READ_ENDPOINTS.discard(endpoint)
+            prisma = await _measure(call, adapter, iterations, warmup)
+            pg.FAST_READ_ENDPOINTS.add(endpoint)
+            fast = await _measure(call, adapter, iterations, warmup)
+            pg.FAST_READ_ENDPOINTS.discard(endpoint)
+            results[name] = {'prisma': prisma, 'asyncpg': fast}
+    finally:
+        await pg.close_pool()
+        await db_client.disconnect()
+    return results
+
+def _print(results: dict):
+    print(f"{'case':<22}{'path':<9}{'p50 ms':>9}{'p95 ms':>9}{'cpu ms':>9}{'calls/s':>10}")
+    for name, paths in results.items():
+        for path, r in paths.items():
+            print(f"{name:<22}{path:<9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['cpu_ms_per_call']:>9}{r['calls_per_s']:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help="Repeatable; default: all")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.iterations, args.warmup, args.case or list(CASES)))
+    _print(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
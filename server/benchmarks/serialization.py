@@ -0,0 +1,105 @@
+"""
+Response serialization cost: FastAPI's response_model path vs app.api.serialization.
+
+Serves the same synthetic orders (Prisma-shaped objects with nested line items)
+through two routes of a throwaway app over an in-process ASGI transport, checks the
+bodies match and reports latency and process CPU per request. No database needed.
+
+    python -m benchmarks.serialization --orders 2000 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from types import SimpleNamespace
+from typing import List
+import httpx
+from fastapi import FastAPI
+from pydantic import TypeAdapter
+from app.api import serialization
+from app.api.orders.schemas import Order
+
+def make_orders(count: int, lines_per_order: int = 4) -> list:
+    statuses = ['AWAITING_STOCK', 'READY_TO_SHIP', 'COMPLETED']
+    sources = ['Local', 'Amazon', 'PreOrder']
+    return [
+        SimpleNamespace(
+            id=f"order{i:08d}",
+            customerName=f"Customer {i}",
+            source=sources[i % 3],
+            status=statuses[i % 3],
+            lineItems=[
+                SimpleNamespace(
+                    quantity=(i + j) % 7 + 1,
+                    product=SimpleNamespace(name=f"RAK Module {i % 500}-{j} | Variant", sku=f"{100000 + (i + j) % 9000}")
+                )
+                for j in range(lines_per_order)
+            ],
+        )
+        for i in range(count)
+    ]
+
+def build_app(orders: list) -> FastAPI:
+    app = FastAPI()
+    adapter = TypeAdapter(List[Order])
+    serialization.FAST_SERIALIZATION = True
+
+    @app.get("/default", response_model=List[Order])
+    async def default_route():
+        return orders
+
+    @app.get("/fast", response_model=List[Order])
+    async def fast_route():
+        return serialization.serialize(adapter, orders)
+
+    return app
+
+async def _measure(client: httpx.AsyncClient, path: str, requests: int) -> tuple[dict, bytes]:
+    body = (await client.get(path)).content # Warm up
+    latencies = []
+    cpu_start = time.process_time()
+    for _ in range(requests):
+        started = time.perf_counter()
+        res = await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        res.raise_for_status()
+    cpu = time.process_time() - cpu_start
+    return {
+        'p50_ms': round(statistics.median(latencies), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'cpu_ms_per_request': round(cpu * 1000 / requests, 3),
+        'bytes': len(body),
+    }, body
+
+async def run(orders: int, requests: int) -> dict:
+    app = build_app(make_orders(orders))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        default, default_body = await _measure(client, "/default", requests)
+        fast, fast_body = await _measure(client, "/fast", requests)
+
+    if json.loads(default_body) != json.loads(fast_body):
+        raise SystemExit("Fast path produced a different body")
+    return {
+        'orders': orders,
+        'default': default,
+        'fast': fast,
+        'cpu_saving_pct': round(100 * (1 - fast['cpu_ms_per_request'] / default['cpu_ms_per_request']), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.orders, args.requests))
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
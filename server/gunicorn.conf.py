@@ -0,0 +1,10 @@
+# Loaded automatically by gunicorn when started from this directory
+# (e.g. gunicorn app.main:app -k uvicorn.workers.UvicornWorker).
+import os
+
+def child_exit(server, worker):
+    # With PROMETHEUS_MULTIPROC_DIR set (app/services/metrics.py), drop the exited
+    # worker's 'live' gauge files so /metrics stops counting it.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
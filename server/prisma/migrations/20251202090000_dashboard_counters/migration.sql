@@ -0,0 +1,129 @@
+-- CreateTable
+CREATE TABLE "dashboard_counters" (
+    "name" TEXT NOT NULL,
+    "value" BIGINT NOT NULL DEFAULT 0,
+
+    CONSTRAINT "dashboard_counters_pkey" PRIMARY KEY ("name")
+);
+
+-- Low-stock range used by the dashboard (0 < quantity <= 5).
+-- NOTE: The bound must match LOW_STOCK_THRESHOLD in app/api/dashboard/service.py
+CREATE INDEX "Product_low_stock_idx" ON "Product"("quantity_in_stock")
+    WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= 5;
+
+-- Seed the counters from the current data.
+INSERT INTO "dashboard_counters" ("name", "value")
+SELECT 'total_skus', COUNT(*) FROM "Product" WHERE "quantity_in_stock" > 0
+UNION ALL
+SELECT 'total_units', COALESCE(SUM("quantity_in_stock"), 0) FROM "Product"
+UNION ALL
+SELECT 'low_stock_count', COUNT(*) FROM "Product" WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= 5
+UNION ALL
+SELECT 'pending_shipments', COUNT(*) FROM "Shipment" WHERE "status" IN ('PLANNING', 'ORDERED')
+UNION ALL
+SELECT 'orders_ready', COUNT(*) FROM "Order" WHERE "status" = 'READY_TO_SHIP'
+UNION ALL
+SELECT 'orders_waiting', COUNT(*) FROM "Order" WHERE "status" = 'AWAITING_STOCK';
+
+-- Applies a set of deltas, skipping the write entirely when nothing changed
+-- (e.g. a product rename) so unrelated writes never touch the counter rows.
+CREATE FUNCTION "dashboard_counters_apply"(deltas JSONB) RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE "dashboard_counters" c
+    SET "value" = c."value" + d.value::BIGINT
+    FROM jsonb_each_text(deltas) d
+    WHERE c."name" = d.key AND d.value::BIGINT <> 0;
+END;
+$$;
+
+-- Statement-level triggers with transition tables: one counter update per
+-- statement, no matter how many rows it touched.
+CREATE FUNCTION "dashboard_counters_product"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    skus BIGINT := 0;
+    units BIGINT := 0;
+    low BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT skus + COUNT(*) FILTER (WHERE "quantity_in_stock" > 0),
+               units + COALESCE(SUM("quantity_in_stock"), 0),
+               low + COUNT(*) FILTER (WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= 5)
+        INTO skus, units, low
+        FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT skus - COUNT(*) FILTER (WHERE "quantity_in_stock" > 0),
+               units - COALESCE(SUM("quantity_in_stock"), 0),
+               low - COUNT(*) FILTER (WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= 5)
+        INTO skus, units, low
+        FROM old_rows;
+    END IF;
+    PERFORM "dashboard_counters_apply"(jsonb_build_object(
+        'total_skus', skus, 'total_units', units, 'low_stock_count', low
+    ));
+    RETURN NULL;
+END;
+$$;
+
+CREATE FUNCTION "dashboard_counters_shipment"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    pending BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT pending + COUNT(*) FILTER (WHERE "status" IN ('PLANNING', 'ORDERED'))
+        INTO pending FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT pending - COUNT(*) FILTER (WHERE "status" IN ('PLANNING', 'ORDERED'))
+        INTO pending FROM old_rows;
+    END IF;
+    PERFORM "dashboard_counters_apply"(jsonb_build_object('pending_shipments', pending));
+    RETURN NULL;
+END;
+$$;
+
+CREATE FUNCTION "dashboard_counters_order"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    ready BIGINT := 0;
+    waiting BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT ready + COUNT(*) FILTER (WHERE "status" = 'READY_TO_SHIP'),
+               waiting + COUNT(*) FILTER (WHERE "status" = 'AWAITING_STOCK')
+        INTO ready, waiting FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT ready - COUNT(*) FILTER (WHERE "status" = 'READY_TO_SHIP'),
+               waiting - COUNT(*) FILTER (WHERE "status" = 'AWAITING_STOCK')
+        INTO ready, waiting FROM old_rows;
+    END IF;
+    PERFORM "dashboard_counters_apply"(jsonb_build_object('orders_ready', ready, 'orders_waiting', waiting));
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables only allow one event per trigger, hence three triggers per table.
+CREATE TRIGGER "Product_counters_ins" AFTER INSERT ON "Product"
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_product"();
+CREATE TRIGGER "Product_counters_upd" AFTER UPDATE ON "Product"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_product"();
+CREATE TRIGGER "Product_counters_del" AFTER DELETE ON "Product"
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_product"();
+
+CREATE TRIGGER "Shipment_counters_ins" AFTER INSERT ON "Shipment"
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_shipment"();
+CREATE TRIGGER "Shipment_counters_upd" AFTER UPDATE ON "Shipment"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_shipment"();
+CREATE TRIGGER "Shipment_counters_del" AFTER DELETE ON "Shipment"
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_shipment"();
+
+CREATE TRIGGER "Order_counters_ins" AFTER INSERT ON "Order"
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_order"();
+CREATE TRIGGER "Order_counters_upd" AFTER UPDATE ON "Order"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_order"();
+CREATE TRIGGER "Order_counters_del" AFTER DELETE ON "Order"
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION "dashboard_counters_order"();
@@ -0,0 +1,15 @@
+-- CreateIndex
+CREATE INDEX "Product_name_id_idx" ON "Product"("name", "id");
+
+-- CreateIndex
+CREATE INDEX "Shipment_created_at_id_idx" ON "Shipment"("created_at", "id");
+
+-- CreateIndex
+CREATE INDEX "Order_created_at_id_idx" ON "Order"("created_at", "id");
+
+-- CreateIndex
+CREATE INDEX "Order_status_created_at_id_idx" ON "Order"("status", "created_at", "id");
+
+-- Inventory page only lists in-stock products (a small slice of the catalog).
+-- Partial index, not expressible in schema.prisma.
+CREATE INDEX "Product_in_stock_name_id_idx" ON "Product"("name", "id") WHERE "quantity_in_stock" > 0;
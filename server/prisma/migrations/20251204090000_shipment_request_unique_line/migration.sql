@@ -0,0 +1,30 @@
+-- Normalize blank customer names to NULL (general restock).
+UPDATE "shipment_requests" SET "customer_name" = NULL WHERE btrim("customer_name") = '';
+
+-- Merge existing duplicate lines into the oldest id before adding the unique key.
+WITH ranked AS (
+    SELECT "id",
+           SUM("quantity") OVER w AS total,
+           ROW_NUMBER() OVER (w ORDER BY "id") AS rn
+    FROM "shipment_requests"
+    WINDOW w AS (PARTITION BY "shipmentId", "productId", COALESCE("customer_name", ''))
+)
+UPDATE "shipment_requests" sr
+SET "quantity" = ranked.total
+FROM ranked
+WHERE sr."id" = ranked."id" AND ranked.rn = 1;
+
+WITH ranked AS (
+    SELECT "id",
+           ROW_NUMBER() OVER (PARTITION BY "shipmentId", "productId", COALESCE("customer_name", '') ORDER BY "id") AS rn
+    FROM "shipment_requests"
+)
+DELETE FROM "shipment_requests" sr
+USING ranked
+WHERE sr."id" = ranked."id" AND ranked.rn > 1;
+
+-- One line per (shipment, product, customer); NULL customer counts as one value.
+-- Expression index, not expressible in schema.prisma. Used by ON CONFLICT in
+-- app/api/shipments/service.py (UPSERT_REQUESTS_SQL).
+CREATE UNIQUE INDEX "shipment_requests_line_key"
+    ON "shipment_requests"("shipmentId", "productId", (COALESCE("customer_name", '')));
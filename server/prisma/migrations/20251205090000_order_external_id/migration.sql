@@ -0,0 +1,23 @@
+-- AlterTable
+ALTER TABLE "Order" ADD COLUMN "external_order_id" TEXT,
+ADD COLUMN "external_source" "OrderSource";
+
+-- Backfill Amazon imports from the "Buyer (Amz: <AmazonOrderId>)" customer name.
+-- If an order was imported twice, only the oldest copy gets the id.
+WITH parsed AS (
+    SELECT "id",
+           substring("customer_name" FROM '\(Amz: ([^)]+)\)$') AS amazon_id,
+           ROW_NUMBER() OVER (
+               PARTITION BY substring("customer_name" FROM '\(Amz: ([^)]+)\)$')
+               ORDER BY "created_at", "id"
+           ) AS rn
+    FROM "Order"
+    WHERE "source" = 'Amazon' AND "customer_name" ~ '\(Amz: [^)]+\)$'
+)
+UPDATE "Order" o
+SET "external_source" = 'Amazon', "external_order_id" = parsed.amazon_id
+FROM parsed
+WHERE o."id" = parsed."id" AND parsed.rn = 1;
+
+-- CreateIndex
+CREATE UNIQUE INDEX "Order_external_source_external_order_id_key" ON "Order"("external_source", "external_order_id");
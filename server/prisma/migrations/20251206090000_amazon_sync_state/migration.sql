@@ -0,0 +1,14 @@
+-- CreateTable
+CREATE TABLE "amazon_sync_state" (
+    "marketplace" TEXT NOT NULL,
+    "last_updated_after" TIMESTAMP(3),
+    "last_run_at" TIMESTAMP(3),
+    "last_duration_ms" INTEGER,
+    "last_pages" INTEGER NOT NULL DEFAULT 0,
+    "last_fetched" INTEGER NOT NULL DEFAULT 0,
+    "last_imported" INTEGER NOT NULL DEFAULT 0,
+    "last_error" TEXT,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "amazon_sync_state_pkey" PRIMARY KEY ("marketplace")
+);
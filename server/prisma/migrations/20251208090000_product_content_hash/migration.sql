@@ -0,0 +1,6 @@
+-- AlterTable
+ALTER TABLE "Product" ADD COLUMN "content_hash" TEXT;
+
+-- Existing rows get the hash the catalog importer would compute, so the first
+-- re-import only touches products whose name actually changed.
+UPDATE "Product" SET "content_hash" = md5("name");
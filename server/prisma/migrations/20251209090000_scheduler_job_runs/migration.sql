@@ -0,0 +1,19 @@
+-- CreateEnum
+CREATE TYPE "JobRunStatus" AS ENUM ('RUNNING', 'SUCCEEDED', 'FAILED');
+
+-- CreateTable
+CREATE TABLE "scheduler_job_runs" (
+    "id" TEXT NOT NULL,
+    "job" TEXT NOT NULL,
+    "worker" TEXT NOT NULL,
+    "status" "JobRunStatus" NOT NULL DEFAULT 'RUNNING',
+    "error" TEXT,
+    "started_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "finished_at" TIMESTAMP(3),
+    "duration_ms" INTEGER,
+
+    CONSTRAINT "scheduler_job_runs_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "scheduler_job_runs_job_started_at_idx" ON "scheduler_job_runs"("job", "started_at");
@@ -0,0 +1,33 @@
+-- CreateTable
+CREATE TABLE "resource_versions" (
+    "name" TEXT NOT NULL,
+    "version" BIGINT NOT NULL DEFAULT 0,
+
+    CONSTRAINT "resource_versions_pkey" PRIMARY KEY ("name")
+);
+
+INSERT INTO "resource_versions" ("name") VALUES ('products'), ('orders'), ('shipments');
+
+-- One bump per write statement (not per row). The row update commits (and becomes
+-- visible) together with the data change, so a reader never pairs a new version
+-- with old data.
+CREATE FUNCTION "resource_versions_bump"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE "resource_versions" SET "version" = "version" + 1 WHERE "name" = TG_ARGV[0];
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER "Product_version" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Product"
+    FOR EACH STATEMENT EXECUTE FUNCTION "resource_versions_bump"('products');
+
+CREATE TRIGGER "Order_version" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Order"
+    FOR EACH STATEMENT EXECUTE FUNCTION "resource_versions_bump"('orders');
+CREATE TRIGGER "order_line_items_version" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "order_line_items"
+    FOR EACH STATEMENT EXECUTE FUNCTION "resource_versions_bump"('orders');
+
+CREATE TRIGGER "Shipment_version" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Shipment"
+    FOR EACH STATEMENT EXECUTE FUNCTION "resource_versions_bump"('shipments');
+CREATE TRIGGER "shipment_requests_version" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "shipment_requests"
+    FOR EACH STATEMENT EXECUTE FUNCTION "resource_versions_bump"('shipments');
@@ -0,0 +1,74 @@
+-- Compact change events for GET /api/events (app/services/events.py), sent with
+-- pg_notify on channel 'stockhub_events'. Statement-level triggers with transition
+-- tables: one notification per statement, delivered only if the transaction commits.
+--   {"type": "stock", "items": [[product_id, quantity], ...]}
+--   {"type": "order", "items": [[order_id, status], ...]}
+-- Statements touching more than 100 rows send {"type": "<type>_bulk", "count": n}
+-- instead (NOTIFY payloads are capped at 8000 bytes); clients refetch on those.
+
+CREATE FUNCTION "change_events_notify"(event_type TEXT, items JSONB, item_count INT) RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF item_count = 0 THEN
+        RETURN;
+    ELSIF item_count > 100 THEN
+        PERFORM pg_notify('stockhub_events', json_build_object('type', event_type || '_bulk', 'count', item_count)::text);
+    ELSE
+        PERFORM pg_notify('stockhub_events', json_build_object('type', event_type, 'items', items)::text);
+    END IF;
+END;
+$$;
+
+CREATE FUNCTION "change_events_product"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    items JSONB;
+    item_count INT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."quantity_in_stock")), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n;
+    ELSE
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."quantity_in_stock")), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE n."quantity_in_stock" IS DISTINCT FROM o."quantity_in_stock";
+    END IF;
+    PERFORM "change_events_notify"('stock', items, item_count);
+    RETURN NULL;
+END;
+$$;
+
+CREATE FUNCTION "change_events_order"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    items JSONB;
+    item_count INT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."status")), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n;
+    ELSE
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."status")), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE n."status" IS DISTINCT FROM o."status";
+    END IF;
+    PERFORM "change_events_notify"('order', items, item_count);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER "Product_events_ins" AFTER INSERT ON "Product"
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "change_events_product"();
+CREATE TRIGGER "Product_events_upd" AFTER UPDATE ON "Product"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "change_events_product"();
+
+CREATE TRIGGER "Order_events_ins" AFTER INSERT ON "Order"
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "change_events_order"();
+CREATE TRIGGER "Order_events_upd" AFTER UPDATE ON "Order"
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION "change_events_order"();
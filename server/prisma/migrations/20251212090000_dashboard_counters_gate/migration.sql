@@ -0,0 +1,90 @@
+-- The low-stock bound (0 < quantity <= N), defined once. Used by the partial index,
+-- the counter trigger and the dashboard queries in app/api/dashboard/service.py.
+-- IMMUTABLE SQL functions are inlined to a constant, so the planner still matches
+-- queries against the partial index. To change N: replace the function, then
+-- REINDEX INDEX "Product_low_stock_idx" and SELECT "dashboard_counters_recount"().
+CREATE FUNCTION "low_stock_threshold"() RETURNS INT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS 'SELECT 5';
+
+DROP INDEX "Product_low_stock_idx";
+CREATE INDEX "Product_low_stock_idx" ON "Product"("quantity_in_stock")
+    WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= "low_stock_threshold"();
+
+CREATE OR REPLACE FUNCTION "dashboard_counters_product"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    skus BIGINT := 0;
+    units BIGINT := 0;
+    low BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT skus + COUNT(*) FILTER (WHERE "quantity_in_stock" > 0),
+               units + COALESCE(SUM("quantity_in_stock"), 0),
+               low + COUNT(*) FILTER (WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= "low_stock_threshold"())
+        INTO skus, units, low
+        FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT skus - COUNT(*) FILTER (WHERE "quantity_in_stock" > 0),
+               units - COALESCE(SUM("quantity_in_stock"), 0),
+               low - COUNT(*) FILTER (WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= "low_stock_threshold"())
+        INTO skus, units, low
+        FROM old_rows;
+    END IF;
+    PERFORM "dashboard_counters_apply"(jsonb_build_object(
+        'total_skus', skus, 'total_units', units, 'low_stock_count', low
+    ));
+    RETURN NULL;
+END;
+$$;
+
+-- Rebuilds every counter from the live tables.
+CREATE FUNCTION "dashboard_counters_recount"() RETURNS VOID
+LANGUAGE sql AS $$
+UPDATE "dashboard_counters" c
+SET "value" = v.value
+FROM (
+    SELECT 'total_skus' AS name, COUNT(*) FILTER (WHERE "quantity_in_stock" > 0) AS value FROM "Product"
+    UNION ALL SELECT 'total_units', COALESCE(SUM("quantity_in_stock"), 0) FROM "Product"
+    UNION ALL SELECT 'low_stock_count', COUNT(*) FILTER (WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= "low_stock_threshold"()) FROM "Product"
+    UNION ALL SELECT 'pending_shipments', COUNT(*) FILTER (WHERE "status" IN ('PLANNING', 'ORDERED')) FROM "Shipment"
+    UNION ALL SELECT 'orders_ready', COUNT(*) FILTER (WHERE "status" = 'READY_TO_SHIP') FROM "Order"
+    UNION ALL SELECT 'orders_waiting', COUNT(*) FILTER (WHERE "status" = 'AWAITING_STOCK') FROM "Order"
+) v
+WHERE c."name" = v.name;
+$$;
+
+CREATE FUNCTION "dashboard_counters_enabled"() RETURNS BOOLEAN
+LANGUAGE sql STABLE AS $$
+SELECT EXISTS (
+    SELECT 1 FROM pg_trigger
+    WHERE tgrelid = '"Product"'::regclass AND tgname = 'Product_counters_ins' AND tgenabled <> 'D'
+);
+$$;
+
+-- The counter triggers cost every Product/Order/Shipment write a hot-row update,
+-- so they only run while DASHBOARD_STATS_MODE=counters (the app calls this at startup).
+-- Enabling locks the three tables against writers (ALTER TABLE takes SHARE ROW
+-- EXCLUSIVE until commit), so the recount and the triggers can't miss a write.
+CREATE FUNCTION "dashboard_counters_enable"(enabled BOOLEAN) RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    action TEXT := CASE WHEN enabled THEN 'ENABLE' ELSE 'DISABLE' END;
+    tbl TEXT;
+BEGIN
+    IF "dashboard_counters_enabled"() = enabled THEN
+        RETURN;
+    END IF;
+    FOREACH tbl IN ARRAY ARRAY['Product', 'Shipment', 'Order'] LOOP
+        EXECUTE format('ALTER TABLE %I %s TRIGGER %I', tbl, action, tbl || '_counters_ins');
+        EXECUTE format('ALTER TABLE %I %s TRIGGER %I', tbl, action, tbl || '_counters_upd');
+        EXECUTE format('ALTER TABLE %I %s TRIGGER %I', tbl, action, tbl || '_counters_del');
+    END LOOP;
+    IF enabled THEN
+        PERFORM "dashboard_counters_recount"();
+    END IF;
+END;
+$$;
+
+-- Off by default (DASHBOARD_STATS_MODE defaults to 'aggregate').
+SELECT "dashboard_counters_enable"(false);
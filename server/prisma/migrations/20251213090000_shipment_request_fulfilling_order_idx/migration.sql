@@ -0,0 +1,3 @@
+-- Auto-allocation skips Pre-Orders whose shipment hasn't arrived
+-- (NOT EXISTS lookup by fulfilling_order_id in app/api/orders/allocation.py).
+CREATE INDEX "shipment_requests_fulfilling_order_id_idx" ON "shipment_requests"("fulfilling_order_id");
@@ -0,0 +1,15 @@
+-- CreateTable
+CREATE TABLE "amazon_sync_retries" (
+    "marketplace" TEXT NOT NULL,
+    "amazon_order_id" TEXT NOT NULL,
+    "order" JSONB NOT NULL,
+    "reason" TEXT NOT NULL,
+    "attempts" INTEGER NOT NULL DEFAULT 1,
+    "first_failed_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "last_attempt_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "amazon_sync_retries_pkey" PRIMARY KEY ("marketplace", "amazon_order_id")
+);
+
+-- CreateIndex
+CREATE INDEX "amazon_sync_retries_marketplace_first_failed_at_idx" ON "amazon_sync_retries"("marketplace", "first_failed_at");
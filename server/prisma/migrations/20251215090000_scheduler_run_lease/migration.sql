@@ -0,0 +1,4 @@
+-- A RUNNING run is owned by its worker until lease_expires_at; the worker extends it
+-- while the job runs (app/services/scheduler.py). Only runs whose lease has lapsed
+-- are marked abandoned, so a dropped lock connection can't start a second copy.
+ALTER TABLE "scheduler_job_runs" ADD COLUMN "lease_expires_at" TIMESTAMP(3);
@@ -0,0 +1,21 @@
+-- One row per resource made every writing transaction queue on the same row lock
+-- until commit. Spread each resource over 16 slots: a statement bumps the slot of
+-- its backend (pg_backend_pid() % 16) and readers sum the slots. The sum still only
+-- grows and still commits together with the data change.
+ALTER TABLE "resource_versions" ADD COLUMN "slot" SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE "resource_versions" DROP CONSTRAINT "resource_versions_pkey";
+ALTER TABLE "resource_versions" ADD CONSTRAINT "resource_versions_pkey" PRIMARY KEY ("name", "slot");
+
+INSERT INTO "resource_versions" ("name", "slot")
+SELECT r.name, s.slot
+FROM (VALUES ('products'), ('orders'), ('shipments')) AS r(name)
+CROSS JOIN generate_series(1, 15) AS s(slot);
+
+CREATE OR REPLACE FUNCTION "resource_versions_bump"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE "resource_versions" SET "version" = "version" + 1
+    WHERE "name" = TG_ARGV[0] AND "slot" = pg_backend_pid() % 16;
+    RETURN NULL;
+END;
+$$;
@@ -0,0 +1,124 @@
+-- The counter triggers were switched with ALTER TABLE ... ENABLE/DISABLE TRIGGER at
+-- app startup, which needs table ownership and an exclusive lock on the busiest tables
+-- on every deploy. Instead the triggers stay enabled and return straight away unless
+-- the single row of dashboard_counters_settings says otherwise. Switch it with
+--     python -m app.db.dashboard_counters on|off
+CREATE TABLE "dashboard_counters_settings" (
+    "id" BOOLEAN NOT NULL DEFAULT TRUE,
+    "enabled" BOOLEAN NOT NULL DEFAULT FALSE,
+
+    CONSTRAINT "dashboard_counters_settings_pkey" PRIMARY KEY ("id"),
+    CONSTRAINT "dashboard_counters_settings_single_row" CHECK ("id")
+);
+
+-- Keep the current state (the old check looks at the triggers themselves).
+INSERT INTO "dashboard_counters_settings" ("enabled") VALUES ("dashboard_counters_enabled"());
+
+ALTER TABLE "Product" ENABLE TRIGGER "Product_counters_ins";
+ALTER TABLE "Product" ENABLE TRIGGER "Product_counters_upd";
+ALTER TABLE "Product" ENABLE TRIGGER "Product_counters_del";
+ALTER TABLE "Shipment" ENABLE TRIGGER "Shipment_counters_ins";
+ALTER TABLE "Shipment" ENABLE TRIGGER "Shipment_counters_upd";
+ALTER TABLE "Shipment" ENABLE TRIGGER "Shipment_counters_del";
+ALTER TABLE "Order" ENABLE TRIGGER "Order_counters_ins";
+ALTER TABLE "Order" ENABLE TRIGGER "Order_counters_upd";
+ALTER TABLE "Order" ENABLE TRIGGER "Order_counters_del";
+
+CREATE OR REPLACE FUNCTION "dashboard_counters_enabled"() RETURNS BOOLEAN
+LANGUAGE sql STABLE AS $$
+SELECT "enabled" FROM "dashboard_counters_settings";
+$$;
+
+CREATE OR REPLACE FUNCTION "dashboard_counters_product"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    skus BIGINT := 0;
+    units BIGINT := 0;
+    low BIGINT := 0;
+BEGIN
+    IF NOT "dashboard_counters_enabled"() THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT skus + COUNT(*) FILTER (WHERE "quantity_in_stock" > 0),
+               units + COALESCE(SUM("quantity_in_stock"), 0),
+               low + COUNT(*) FILTER (WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= "low_stock_threshold"())
+        INTO skus, units, low
+        FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT skus - COUNT(*) FILTER (WHERE "quantity_in_stock" > 0),
+               units - COALESCE(SUM("quantity_in_stock"), 0),
+               low - COUNT(*) FILTER (WHERE "quantity_in_stock" > 0 AND "quantity_in_stock" <= "low_stock_threshold"())
+        INTO skus, units, low
+        FROM old_rows;
+    END IF;
+    PERFORM "dashboard_counters_apply"(jsonb_build_object(
+        'total_skus', skus, 'total_units', units, 'low_stock_count', low
+    ));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION "dashboard_counters_shipment"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    pending BIGINT := 0;
+BEGIN
+    IF NOT "dashboard_counters_enabled"() THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT pending + COUNT(*) FILTER (WHERE "status" IN ('PLANNING', 'ORDERED'))
+        INTO pending FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT pending - COUNT(*) FILTER (WHERE "status" IN ('PLANNING', 'ORDERED'))
+        INTO pending FROM old_rows;
+    END IF;
+    PERFORM "dashboard_counters_apply"(jsonb_build_object('pending_shipments', pending));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION "dashboard_counters_order"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    ready BIGINT := 0;
+    waiting BIGINT := 0;
+BEGIN
+    IF NOT "dashboard_counters_enabled"() THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT ready + COUNT(*) FILTER (WHERE "status" = 'READY_TO_SHIP'),
+               waiting + COUNT(*) FILTER (WHERE "status" = 'AWAITING_STOCK')
+        INTO ready, waiting FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT ready - COUNT(*) FILTER (WHERE "status" = 'READY_TO_SHIP'),
+               waiting - COUNT(*) FILTER (WHERE "status" = 'AWAITING_STOCK')
+        INTO ready, waiting FROM old_rows;
+    END IF;
+    PERFORM "dashboard_counters_apply"(jsonb_build_object('orders_ready', ready, 'orders_waiting', waiting));
+    RETURN NULL;
+END;
+$$;
+
+-- Turning the counters on blocks writers to the three tables (SHARE lock, waiting for
+-- in-flight writes) until it commits, so the recount can't miss a write the triggers
+-- skipped. A no-op when already in the requested state.
+CREATE OR REPLACE FUNCTION "dashboard_counters_enable"(enabled BOOLEAN) RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF enabled THEN
+        LOCK TABLE "Product", "Shipment", "Order" IN SHARE MODE;
+    END IF;
+    UPDATE "dashboard_counters_settings" s
+    SET "enabled" = dashboard_counters_enable.enabled
+    WHERE s."enabled" <> dashboard_counters_enable.enabled;
+    IF FOUND AND enabled THEN
+        PERFORM "dashboard_counters_recount"();
+    END IF;
+END;
+$$;
@@ -0,0 +1,7 @@
+-- Every run claims its wall-clock slot, floor(epoch / interval), when it starts
+-- (app/services/scheduler.py). The unique index lets only one worker claim a slot, so
+-- a job runs at most once per period however the workers' timers drift. Abandoned runs
+-- give their slot back; rows from before this migration have none.
+ALTER TABLE "scheduler_job_runs" ADD COLUMN "slot" BIGINT;
+
+CREATE UNIQUE INDEX "scheduler_job_runs_job_slot_key" ON "scheduler_job_runs"("job", "slot");
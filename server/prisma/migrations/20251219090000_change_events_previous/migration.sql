@@ -0,0 +1,48 @@
+-- Change events also carry the value a row had before the statement (NULL for new
+-- rows), so clients can patch totals from an event alone (app/services/events.py):
+--   {"type": "stock", "items": [[product_id, quantity, previous_quantity], ...]}
+--   {"type": "order", "items": [[order_id, status, previous_status], ...]}
+
+CREATE OR REPLACE FUNCTION "change_events_product"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    items JSONB;
+    item_count INT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."quantity_in_stock", NULL)), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n;
+    ELSE
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."quantity_in_stock", o."quantity_in_stock")), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE n."quantity_in_stock" IS DISTINCT FROM o."quantity_in_stock";
+    END IF;
+    PERFORM "change_events_notify"('stock', items, item_count);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION "change_events_order"() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    items JSONB;
+    item_count INT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."status", NULL)), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n;
+    ELSE
+        SELECT jsonb_agg(jsonb_build_array(n.id, n."status", o."status")), COUNT(*)
+        INTO items, item_count
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE n."status" IS DISTINCT FROM o."status";
+    END IF;
+    PERFORM "change_events_notify"('order', items, item_count);
+    RETURN NULL;
+END;
+$$;
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+import pytest
+from app.api.orders.allocation import AllocationPolicy, WaitingOrder, plan_allocation
+
+T0 = datetime(2025, 12, 1)
+
+def _orders():
+    """Oldest first: a big order that can't be filled, then two small ones."""
+    return [
+        WaitingOrder('big', 'Local', T0, {'p1': 10}),
+        WaitingOrder('small', 'Local', T0 + timedelta(minutes=1), {'p1': 2}),
+        WaitingOrder('other', 'Amazon', T0 + timedelta(minutes=2), {'p2': 1}),
+    ]
+
+def test_fifo_keeps_the_blocked_orders_place():
+    allocated, decrements = plan_allocation(_orders(), {'p1': 5, 'p2': 1}, AllocationPolicy.FIFO)
+    assert allocated == ['other']
+    assert decrements == {'p2': 1}
+
+def test_skip_ahead_serves_younger_orders_that_fit_without_splitting():
+    allocated, decrements = plan_allocation(_orders(), {'p1': 5, 'p2': 1}, AllocationPolicy.SKIP_AHEAD)
+    assert allocated == ['small', 'other']
+    assert decrements == {'p1': 2, 'p2': 1}
+
+@pytest.mark.parametrize('policy', list(AllocationPolicy))
+def test_no_policy_allocates_more_than_is_in_stock(policy):
+    allocated, decrements = plan_allocation(_orders(), {'p1': 1}, policy)
+    assert allocated == [] and decrements == {}
@@ -0,0 +1,120 @@
+import datetime
+import pytest
+from prisma.enums import OrderSource
+from app.services import amazon_sync, sp_api_client
+from app.services.sp_api_client import FAKE_ACCESS_TOKEN, RATE_LIMITS, TokenBucket
+from app.testing.fake_sp_api import FakeSpApi
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def fake_sp_api(monkeypatch):
+    """The real OrdersGateway (thread pool, rate limits, retries) against a local fake."""
+    with FakeSpApi() as fake:
+        monkeypatch.setattr(sp_api_client, 'FAKE_ENDPOINT', fake.endpoint)
+        monkeypatch.setattr(amazon_sync, 'MARKETPLACES', ['IN'])
+        # Fresh buckets: full bursts, and locks bound to this test's event loop
+        monkeypatch.setattr(sp_api_client, '_buckets', {
+            op: TokenBucket(rate, burst) for op, (rate, burst) in RATE_LIMITS.items()
+        })
+        yield fake
+
+async def _amazon_order_ids(db) -> set[str]:
+    orders = await db.order.find_many(where={'externalSource': OrderSource.Amazon})
+    return {o.externalOrderId for o in orders}
+
+async def test_sync_pages_through_orders_via_the_sp_api_client(db, make_product, fake_sp_api):
+    await make_product(quantity=10, sku="SKU-1")
+    await make_product(quantity=10, sku="SKU-2")
+    for n in range(3):
+        fake_sp_api.add_order(f"111-{n}", [("SKU-1", 1), ("SKU-2", 2)])
+
+    await amazon_sync.sync_amazon_orders()
+
+    assert await _amazon_order_ids(db) == {"111-0", "111-1", "111-2"}
+    assert fake_sp_api.count("getOrders") == 2 # NextToken followed
+    assert fake_sp_api.access_tokens == {FAKE_ACCESS_TOKEN}
+
+async def test_throttled_calls_are_retried(db, make_product, fake_sp_api):
+    await make_product(quantity=10, sku="SKU-1")
+    fake_sp_api.add_order("111-0", [("SKU-1", 1)])
+    fake_sp_api.throttle("getOrders", 1)
+    fake_sp_api.throttle("getOrderItems", 1)
+
+    await amazon_sync.sync_amazon_orders()
+
+    assert await _amazon_order_ids(db) == {"111-0"}
+    assert fake_sp_api.count("getOrders", 429) == 1
+    assert fake_sp_api.count("getOrderItems", 429) == 1
+
+async def test_rerun_does_not_import_twice(db, make_product, fake_sp_api):
+    await make_product(quantity=10, sku="SKU-1")
+    fake_sp_api.add_order("111-0", [("SKU-1", 1)])
+
+    await amazon_sync.sync_amazon_orders()
+    await db.amazonsyncstate.update(
+        where={'marketplace': 'IN'},
+        data={'lastUpdatedAfter': None} # Force a full rescan
+    )
+    await amazon_sync.sync_amazon_orders()
+
+    assert await db.order.count(where={'externalSource': OrderSource.Amazon}) == 1
+
+async def test_unknown_marketplace_does_not_stop_the_others(db, make_product, fake_sp_api, monkeypatch):
+    monkeypatch.setattr(amazon_sync, 'MARKETPLACES', ['IN', 'NOPE'])
+    await make_product(quantity=10, sku="SKU-1")
+    fake_sp_api.add_order("111-0", [("SKU-1", 1)])
+
+    with pytest.raises(RuntimeError, match="NOPE"):
+        await amazon_sync.sync_amazon_orders()
+
+    assert await _amazon_order_ids(db) == {"111-0"}
+    assert not (await db.amazonsyncstate.find_unique(where={'marketplace': 'IN'})).lastError
+    broken = await db.amazonsyncstate.find_unique(where={'marketplace': 'NOPE'})
+    assert broken.lastError
+
+async def test_order_with_unknown_sku_is_retried_after_the_watermark_moved(db, make_product, fake_sp_api):
+    ten_minutes_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=10)
+    fake_sp_api.add_order("111-0", [("SKU-NEW", 1)], last_update=ten_minutes_ago)
+
+    await amazon_sync.sync_amazon_orders()
+    state = await db.amazonsyncstate.find_unique(where={'marketplace': 'IN'})
+    assert state.lastError is None # Queued for retry, not a failed run
+    assert state.lastUpdatedAfter.replace(tzinfo=datetime.timezone.utc) > ten_minutes_ago # Moved past the order
+    assert await db.amazonsyncretry.count() == 1
+
+    # The SKU gets added; the order is no longer in the listing window but is retried
+    await make_product(quantity=10, sku="SKU-NEW")
+    await amazon_sync.sync_amazon_orders()
+
+    assert await _amazon_order_ids(db) == {"111-0"}
+    assert await db.amazonsyncretry.count() == 0
+
+async def test_permanently_failing_order_does_not_pin_the_watermark(db, make_product, fake_sp_api):
+    await make_product(quantity=10, sku="SKU-1")
+    fake_sp_api.add_order("111-0", [("SKU-1", 1)])
+    fake_sp_api.add_order("111-1", [("SKU-1", 1)])
+    fake_sp_api.fail_items("111-1")
+
+    await amazon_sync.sync_amazon_orders()
+    first = await db.amazonsyncstate.find_unique(where={'marketplace': 'IN'})
+    await amazon_sync.sync_amazon_orders()
+    second = await db.amazonsyncstate.find_unique(where={'marketplace': 'IN'})
+
+    assert await _amazon_order_ids(db) == {"111-0"}
+    assert second.lastUpdatedAfter > first.lastUpdatedAfter
+    retry = await db.amazonsyncretry.find_first(where={'amazonOrderId': '111-1'})
+    assert retry.attempts == 2
+
+async def test_sync_queries_grow_only_with_the_orders_it_creates(db, make_product, fake_sp_api, query_budget):
+    await make_product(quantity=100, sku="SKU-1")
+    await make_product(quantity=100, sku="SKU-2")
+    for n in range(6): # 3 pages
+        fake_sp_api.add_order(f"111-{n}", [("SKU-1", 1), ("SKU-2", 2)])
+
+    # orders.create is 4 queries per order; everything else is per page or per run.
+    # A per-line-item query would repeat 12 times.
+    with query_budget(max_queries=4 * 6 + 12, max_repeats=6):
+        await amazon_sync.sync_amazon_orders()
+
+    assert len(await _amazon_order_ids(db)) == 6
@@ -0,0 +1,85 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from prisma.enums import OrderSource, OrderStatus
+from app.api import conditional
+from app.api.conditional import ORDERS, PRODUCTS, get_versions
+from app.api.inventory.stock_import import ImportMode, import_stock
+from app.api.orders import service as orders
+from app.api.orders.allocation import allocate_all
+from app.api.orders.schemas import OrderCreate, OrderLineItemCreate
+from app.db.catalog_import import import_catalog
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def fresh_versions(monkeypatch):
+    """Every read goes to resource_versions: no TTL, nothing left over from other tests."""
+    monkeypatch.setattr(conditional, 'VERSION_TTL_SECONDS', 0)
+    monkeypatch.setattr(conditional, '_versions', {})
+    monkeypatch.setattr(conditional, '_read_at', 0.0)
+
+@pytest.fixture
+async def client(db):
+    # No lifespan: the db fixture already connected the app's client
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+async def _version(db, resource: str) -> int:
+    return (await get_versions(db, (resource,)))[resource]
+
+async def test_matching_etag_is_answered_before_the_endpoint_queries(client, make_product, query_budget):
+    await make_product(quantity=3)
+    first = await client.get("/api/inventory")
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    # Only the versions read: the inventory query never runs
+    with query_budget(max_queries=1) as stats:
+        cached = await client.get("/api/inventory", headers={'If-None-Match': etag})
+    assert stats.count == 1
+    assert cached.status_code == 304 and cached.headers['ETag'] == etag
+
+    await make_product(quantity=1)
+    changed = await client.get("/api/inventory", headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert len(changed.json()) == 2
+
+async def test_stock_import_copy_bumps_products(db, make_product, stock_of):
+    product = await make_product(quantity=0)
+    before = await _version(db, PRODUCTS)
+
+    async def upload():
+        yield f"sku,quantity\n{product.sku},7\n".encode()
+    result = await import_stock(upload(), ImportMode.SET)
+
+    assert result['updated'] == 1 and await stock_of(product.id) == 7
+    assert await _version(db, PRODUCTS) > before
+
+async def test_catalog_import_bumps_products(db, make_product, tmp_path):
+    product = await make_product()
+    before = await _version(db, PRODUCTS)
+
+    catalog = tmp_path / "products_export.csv"
+    catalog.write_text(f"Title,SKU\nRenamed,{product.sku}\n", encoding='utf-8')
+    await import_catalog(catalog)
+
+    assert (await db.product.find_unique(where={'id': product.id})).name == "Renamed"
+    assert await _version(db, PRODUCTS) > before
+
+async def test_allocation_bumps_products_and_orders(db, make_product):
+    product = await make_product(quantity=0)
+    order = await orders.create(db, OrderCreate(
+        customer_name="Alice",
+        source=OrderSource.Local,
+        line_items=[OrderLineItemCreate(product_id=product.id, quantity=2)]
+    ))
+    assert order.status == OrderStatus.AWAITING_STOCK
+    await db.execute_raw('UPDATE "Product" SET quantity_in_stock = 2 WHERE id = $1', product.id)
+    before = await get_versions(db, (PRODUCTS, ORDERS))
+
+    result = await allocate_all(db)
+
+    assert order.id in result['order_ids']
+    after = await get_versions(db, (PRODUCTS, ORDERS))
+    assert after[PRODUCTS] > before[PRODUCTS] and after[ORDERS] > before[ORDERS]
@@ -0,0 +1,109 @@
+import datetime
+import pytest
+from prisma import Json
+from app.services import notifications
+from app.services.notifications import NotificationDispatcher
+from app.testing.fake_whatsapp import FakeWhatsApp
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def whatsapp_env(monkeypatch):
+    for key in ("WHATSAPP_TOKEN", "WHATSAPP_PHONE_ID", "WHATSAPP_RECIPIENT"):
+        monkeypatch.setenv(key, "test")
+
+async def _enqueue(db, count: int):
+    for n in range(count):
+        payload = {'order_id': f"order-{n}", 'customer_name': f"Customer {n}",
+                   'items': [{'sku': 'SKU-1', 'name': 'Test', 'quantity': 1}]}
+        await db.notificationoutbox.create(data={'kind': notifications.ORDER_CREATED, 'payload': Json(payload)})
+
+async def test_failed_digest_part_only_requeues_its_own_orders(db, whatsapp_env, monkeypatch):
+    monkeypatch.setattr(notifications, 'MAX_MESSAGE_CHARS', 200) # Roughly one order per digest message
+    await _enqueue(db, 5)
+
+    posted = []
+    async def post(body):
+        if len(posted) == 2:
+            raise RuntimeError("WhatsApp API 500")
+        posted.append(body)
+
+    dispatcher = NotificationDispatcher()
+    monkeypatch.setattr(dispatcher, '_post', post)
+    await dispatcher.drain(db)
+
+    rows = await db.notificationoutbox.find_many()
+    sent = [r for r in rows if r.status == 'SENT']
+    pending = [r for r in rows if r.status == 'PENDING']
+    assert len(posted) == 2
+    assert len(sent) == sum(body.count("Order ID:") for body in posted)
+    assert len(sent) + len(pending) == 5
+    assert all(r.lastError == "WhatsApp API 500" for r in pending)
+
+@pytest.fixture
+def fake_whatsapp(whatsapp_env, monkeypatch):
+    with FakeWhatsApp() as fake:
+        monkeypatch.setattr(notifications, 'WHATSAPP_API_URL', fake.endpoint)
+        yield fake
+
+@pytest.fixture
+async def dispatcher(db, fake_whatsapp, monkeypatch):
+    """A started dispatcher (real pooled aiohttp session, real _post) against the fake."""
+    monkeypatch.setattr(notifications, 'POLL_SECONDS', 3600) # Tests drain by hand
+    dispatcher = NotificationDispatcher()
+    await dispatcher.start(db)
+    yield dispatcher
+    await dispatcher.stop()
+
+async def test_messages_are_posted_over_one_pooled_connection(db, dispatcher, fake_whatsapp):
+    await _enqueue(db, notifications.DIGEST_THRESHOLD) # One message per order
+
+    assert await dispatcher.drain(db) == notifications.DIGEST_THRESHOLD
+
+    fake = fake_whatsapp
+    assert len(fake.messages) == notifications.DIGEST_THRESHOLD
+    assert fake.connections == 1
+    assert fake.tokens == {"test"}
+    assert all(m['to'] == "test" and m['type'] == "text" for m in fake.messages)
+    rows = await db.notificationoutbox.find_many()
+    assert {r.status for r in rows} == {'SENT'}
+
+async def test_http_error_is_retried_after_backoff(db, dispatcher, fake_whatsapp):
+    await _enqueue(db, 1)
+    fake_whatsapp.fail(500)
+
+    before = datetime.datetime.now(datetime.timezone.utc)
+    await dispatcher.drain(db)
+
+    row = await db.notificationoutbox.find_first()
+    assert row.status == 'PENDING'
+    assert row.attempts == 1
+    assert row.lastError.startswith("WhatsApp API 500")
+    assert row.nextAttemptAt >= before + datetime.timedelta(seconds=9) # 2^1 * 5s
+
+    assert await dispatcher.drain(db) == 0 # Not due yet
+    assert fake_whatsapp.messages == []
+
+    await db.execute_raw("UPDATE notification_outbox SET next_attempt_at = timezone('utc', now())")
+    await dispatcher.drain(db)
+
+    row = await db.notificationoutbox.find_first()
+    assert row.status == 'SENT'
+    assert row.attempts == 2
+    assert row.lastError is None
+    assert len(fake_whatsapp.messages) == 1
+
+async def test_message_fails_after_max_attempts(db, dispatcher, fake_whatsapp, monkeypatch):
+    monkeypatch.setattr(notifications, 'MAX_ATTEMPTS', 2)
+    await _enqueue(db, 1)
+    fake_whatsapp.fail(503, times=2)
+
+    await dispatcher.drain(db)
+    await db.execute_raw("UPDATE notification_outbox SET next_attempt_at = timezone('utc', now())")
+    await dispatcher.drain(db)
+
+    row = await db.notificationoutbox.find_first()
+    assert row.status == 'FAILED'
+    assert row.attempts == 2
+    assert row.lastError.startswith("WhatsApp API 503")
+    assert fake_whatsapp.messages == []
@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.api.pagination import decode_created_cursor, encode_cursor
+
+UTC_NOON = datetime(2025, 12, 1, 12, 0, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize('created_at', [
+    UTC_NOON,                                              # Prisma rows
+    UTC_NOON.replace(tzinfo=None),                         # Older naive cursors
+    UTC_NOON.astimezone(timezone(timedelta(hours=5, minutes=30))),
+])
+def test_created_cursor_decodes_to_aware_utc(created_at):
+    decoded, row_id = decode_created_cursor(encode_cursor(created_at, "o1"))
+    assert decoded == UTC_NOON and decoded.tzinfo == timezone.utc
+    assert row_id == "o1"
+
+def test_created_cursor_rejects_a_bad_timestamp():
+    with pytest.raises(ValueError):
+        decode_created_cursor(encode_cursor("yesterday", "o1"))
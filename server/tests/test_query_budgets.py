@@ -0,0 +1,84 @@
+import pytest
+from prisma.enums import OrderSource, OrderStatus, ShipmentStatus
+from app.api.orders import service as orders
+from app.api.orders.schemas import OrderCreate, OrderLineItemCreate
+from app.api.shipments import service as shipments
+from app.api.shipments.schemas import ShipmentCreate, ShipmentRequestBatchCreate, ShipmentRequestBatchItem
+
+pytestmark = pytest.mark.anyio
+
+# Each path is run with enough rows that a per-row query would blow its budget
+# (20 line items against budgets of 3-9), so the budgets hold for any size.
+
+LINES = 20
+
+@pytest.fixture
+def make_products(make_product):
+    async def make(n: int, quantity: int = 0):
+        return [await make_product(quantity=quantity) for _ in range(n)]
+    return make
+
+def _order(products, customer_name: str = "Alice") -> OrderCreate:
+    return OrderCreate(
+        customer_name=customer_name,
+        source=OrderSource.Local,
+        line_items=[OrderLineItemCreate(product_id=p.id, quantity=1) for p in products]
+    )
+
+def _batch(products, customer_name: str | None = None) -> ShipmentRequestBatchCreate:
+    return ShipmentRequestBatchCreate(
+        customer_name=customer_name,
+        items=[ShipmentRequestBatchItem(product_id=p.id, quantity=2) for p in products]
+    )
+
+async def test_create_order(db, make_products, query_budget):
+    products = await make_products(LINES, quantity=5)
+
+    # Reservation, order insert, line-item create_many, outbox insert
+    with query_budget(max_queries=4, max_repeats=1):
+        order = await orders.create(db, _order(products))
+
+    assert order.status == OrderStatus.READY_TO_SHIP and len(order.lineItems) == LINES
+
+async def test_allocate_order(db, make_products, query_budget):
+    products = await make_products(LINES)
+    order = await orders.create(db, _order(products))
+    await db.product.update_many(where={'id': {'in': [p.id for p in products]}}, data={'quantityInStock': 5})
+
+    # Lock order, lock stock, one decrement, status update
+    with query_budget(max_queries=4, max_repeats=1):
+        allocated = await orders.allocate_order(db, order.id)
+
+    assert allocated.status == OrderStatus.READY_TO_SHIP
+
+async def test_add_batch_requests(db, make_products, query_budget):
+    products = await make_products(LINES)
+    shipment = await shipments.create(db, ShipmentCreate(name="Batch"))
+
+    # Status check, one upsert, reload
+    with query_budget(max_queries=3, max_repeats=1):
+        detail = await shipments.add_batch_requests(db, shipment.id, _batch(products))
+
+    assert len(detail.requests) == LINES
+
+async def test_update_status_ordered_then_received(db, make_products, query_budget):
+    products = await make_products(LINES)
+    shipment = await shipments.create(db, ShipmentCreate(name="Pre-Orders"))
+    half = LINES // 2
+    await shipments.add_batch_requests(db, shipment.id, _batch(products[:half], customer_name="Alice"))
+    await shipments.add_batch_requests(db, shipment.id, _batch(products[half:], customer_name="Bob"))
+    await shipments.add_batch_requests(db, shipment.id, _batch(products))       # Restock lines
+    waiting = await orders.create(db, _order(products, customer_name="Carol")) # Served by allocate_all
+
+    # Load, flip, order + line-item create_many, link requests
+    with query_budget(max_queries=5, max_repeats=1):
+        await shipments.update_status(db, shipment.id, ShipmentStatus.ORDERED)
+
+    # Load, flip, waiting Pre-Orders, stock deltas, Pre-Order status;
+    # then allocate_all: waiting orders, lock stock, decrement, status (same shape as above)
+    with query_budget(max_queries=9, max_repeats=2):
+        await shipments.update_status(db, shipment.id, ShipmentStatus.RECEIVED)
+
+    pre_orders = await db.order.find_many(where={'source': OrderSource.PreOrder})
+    assert len(pre_orders) == 2 and all(o.status == OrderStatus.READY_TO_SHIP for o in pre_orders)
+    assert (await orders.get_by_id(db, waiting.id)).status == OrderStatus.READY_TO_SHIP
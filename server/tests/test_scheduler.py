@@ -0,0 +1,66 @@
+import pytest
+from app.db.ids import new_id
+from app.services.scheduler import JobScheduler, ScheduledJob
+
+pytestmark = pytest.mark.anyio
+
+RUNNING_SQL = '''
+INSERT INTO scheduler_job_runs (id, job, worker, status, started_at, lease_expires_at)
+VALUES ($1, $2, 'other:1', 'RUNNING', timezone('utc', now()) - interval '1 hour',
+        timezone('utc', now()) + make_interval(secs => $3))
+'''
+
+@pytest.fixture
+async def scheduler(db):
+    scheduler = JobScheduler()
+    yield scheduler
+    await scheduler.stop()
+
+def _job(calls: list, interval_seconds: float = 60, min_gap_seconds: float = 30) -> ScheduledJob:
+    async def func():
+        calls.append(1)
+    return ScheduledJob(name='test_job', func=func, interval_seconds=interval_seconds,
+                        jitter_seconds=0, min_gap_seconds=min_gap_seconds)
+
+async def test_run_with_a_live_lease_is_not_abandoned_or_repeated(db, scheduler):
+    # Its worker lost the lock connection but is still running the job
+    run_id = new_id()
+    await db.execute_raw(RUNNING_SQL, run_id, 'test_job', 60)
+    calls = []
+    job = _job(calls)
+
+    await scheduler._run(job)
+
+    assert calls == [] and job.skipped_recent == 1
+    assert (await db.schedulerjobrun.find_unique(where={'id': run_id})).status == 'RUNNING'
+
+async def test_run_with_an_expired_lease_is_abandoned(db, scheduler):
+    run_id = new_id()
+    await db.execute_raw(RUNNING_SQL, run_id, 'test_job', -1)
+    calls = []
+    job = _job(calls)
+
+    await scheduler._run(job)
+
+    assert calls == [1] and job.lock_lost == 0
+    abandoned = await db.schedulerjobrun.find_unique(where={'id': run_id})
+    assert abandoned.status == 'FAILED' and abandoned.error.startswith('Abandoned')
+    runs = await db.schedulerjobrun.find_many(where={'job': 'test_job', 'status': 'SUCCEEDED'})
+    assert len(runs) == 1 and runs[0].leaseExpiresAt is not None
+
+async def test_two_workers_firing_in_the_same_period_record_one_run(db, scheduler):
+    # No min_gap: only the period's slot keeps the second worker out, as when a
+    # startup run and another worker's timer land in the same period
+    other = JobScheduler()
+    calls = []
+    first, second = _job(calls, 10 ** 6, 0), _job(calls, 10 ** 6, 0)
+    try:
+        await scheduler._run(first)
+        await other._run(second)
+    finally:
+        await other.stop()
+
+    assert calls == [1]
+    assert first.runs == 1 and second.skipped_recent == 1
+    runs = await db.schedulerjobrun.find_many(where={'job': 'test_job'})
+    assert len(runs) == 1 and runs[0].status == 'SUCCEEDED'
@@ -0,0 +1,81 @@
+import pytest
+from prisma.enums import OrderSource, OrderStatus, ShipmentStatus
+from app.api.orders import service as orders
+from app.api.orders.allocation import allocate_all
+from app.api.shipments import service as shipments
+from app.api.shipments.schemas import ShipmentCreate, ShipmentRequestCreate
+
+pytestmark = pytest.mark.anyio
+
+async def _ordered_pre_order(db, product, quantity: int):
+    """A shipment in ORDERED status with one Pre-Order line. Returns (shipment, pre_order)."""
+    shipment = await shipments.create(db, ShipmentCreate(name="Test shipment"))
+    await shipments.add_request_to_shipment(
+        db, shipment.id,
+        ShipmentRequestCreate(customer_name="Alice", product_id=product.id, quantity=quantity)
+    )
+    await shipments.update_status(db, shipment.id, ShipmentStatus.ORDERED)
+    pre_order = await db.order.find_first(where={'source': OrderSource.PreOrder})
+    return shipment, pre_order
+
+async def test_auto_allocation_skips_pre_orders_of_pending_shipments(db, make_product, stock_of):
+    product = await make_product(quantity=0)
+    shipment, pre_order = await _ordered_pre_order(db, product, 5)
+
+    # Stock arrives through another channel before the shipment does
+    await db.product.update(where={'id': product.id}, data={'quantityInStock': 5})
+    result = await allocate_all(db)
+    assert pre_order.id not in result['order_ids']
+    assert await stock_of(product.id) == 5
+
+    # The shipment serves its own Pre-Order; the other 5 units stay in stock
+    await shipments.update_status(db, shipment.id, ShipmentStatus.RECEIVED)
+    assert (await orders.get_by_id(db, pre_order.id)).status == OrderStatus.READY_TO_SHIP
+    assert await stock_of(product.id) == 5
+
+async def test_receive_after_pre_order_was_allocated_adds_the_units_to_stock(db, make_product, stock_of):
+    product = await make_product(quantity=5)
+    shipment, pre_order = await _ordered_pre_order(db, product, 5)
+
+    # Served from stock while the shipment is still on its way
+    await orders.allocate_order(db, pre_order.id)
+    assert await stock_of(product.id) == 0
+
+    await shipments.update_status(db, shipment.id, ShipmentStatus.RECEIVED)
+    assert (await orders.get_by_id(db, pre_order.id)).status == OrderStatus.READY_TO_SHIP
+    assert await stock_of(product.id) == 5
+
+async def test_receive_of_a_completed_pre_order_adds_the_units_to_stock(db, make_product, stock_of):
+    product = await make_product(quantity=5)
+    shipment, pre_order = await _ordered_pre_order(db, product, 5)
+    await orders.allocate_order(db, pre_order.id)
+    await orders.complete_order(db, pre_order.id)
+
+    await shipments.update_status(db, shipment.id, ShipmentStatus.RECEIVED)
+    assert (await orders.get_by_id(db, pre_order.id)).status == OrderStatus.COMPLETED
+    assert await stock_of(product.id) == 5
+
+async def test_receive_reserves_units_for_a_waiting_pre_order(db, make_product, stock_of):
+    product = await make_product(quantity=0)
+    shipment, pre_order = await _ordered_pre_order(db, product, 3)
+
+    await shipments.update_status(db, shipment.id, ShipmentStatus.RECEIVED)
+    assert (await orders.get_by_id(db, pre_order.id)).status == OrderStatus.READY_TO_SHIP
+    assert await stock_of(product.id) == 0
+
+async def test_cached_invoice_of_received_shipment_follows_product_renames(db, make_product):
+    product = await make_product(quantity=0)
+    shipment, _ = await _ordered_pre_order(db, product, 2)
+    await shipments.update_status(db, shipment.id, ShipmentStatus.RECEIVED)
+
+    async def invoice_csv() -> bytes:
+        chunks, _ = await shipments.generate_invoice(db, shipment.id, 'csv')
+        return b''.join(chunks)
+
+    assert product.name.encode() in await invoice_csv()
+    # Same as the catalog import's merge: a new name and a new "updatedAt"
+    await db.execute_raw(
+        'UPDATE "Product" SET name = $2, "updatedAt" = timezone(\'utc\', now()) WHERE id = $1',
+        product.id, "Renamed product"
+    )
+    assert b"Renamed product" in await invoice_csv()
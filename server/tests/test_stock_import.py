@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from app.api.inventory.stock_import import ImportMode, import_stock
+from app.db import pg
+
+pytestmark = pytest.mark.anyio
+
+async def _upload(*lines: str):
+    for line in lines:
+        yield f"{line}\n".encode()
+
+async def test_delta_is_applied_to_stock_changed_by_a_concurrent_order(db, make_product, stock_of):
+    product = await make_product(quantity=10)
+
+    # An order decrement holds the row while the import runs
+    conn = await pg.connect()
+    try:
+        tx = conn.transaction()
+        await tx.start()
+        await conn.execute('UPDATE "Product" SET quantity_in_stock = quantity_in_stock - 3 WHERE id = $1', product.id)
+        running = asyncio.create_task(import_stock(_upload("sku,quantity", f"{product.sku},5"), ImportMode.DELTA))
+        await asyncio.sleep(0.2)
+        await tx.commit()
+        result = await running
+    finally:
+        await conn.close()
+
+    assert result['updated'] == 1
+    assert await stock_of(product.id) == 12
+
+async def test_delta_below_zero_is_rejected_and_the_rest_applied(db, make_product, stock_of):
+    short = await make_product(quantity=2)
+    plenty = await make_product(quantity=10)
+
+    result = await import_stock(
+        _upload(f"{short.sku},-5", f"{plenty.sku},-4", "NO-SUCH-SKU,1", f"{plenty.sku},x"),
+        ImportMode.DELTA
+    )
+
+    assert result['received'] == 4 and result['staged'] == 3 and result['updated'] == 1
+    assert [(r['line'], r['reason']) for r in result['rejects']] == [
+        (1, "Not enough stock for a delta of -5"),
+        (3, "Unknown SKU"),
+        (4, "Bad quantity: 'x'"),
+    ]
+    assert await stock_of(short.id) == 2
+    assert await stock_of(plenty.id) == 6
+
+async def test_set_last_line_wins_and_tab_in_sku_is_escaped(db, make_product, stock_of):
+    product = await make_product(quantity=1, sku="TAB\tSKU")
+
+    result = await import_stock(
+        _upload('{"sku": "TAB\\tSKU", "quantity": 4}', '{"sku": "TAB\\tSKU", "quantity": 7}'),
+        ImportMode.SET, ndjson=True
+    )
+
+    assert result['updated'] == 1 and result['rejected'] == 0
+    assert await stock_of(product.id) == 7